@@ -1,6 +1,9 @@
 # server/app/__init__.py
 
+import os
 import time
+_IMPORT_START = time.perf_counter()
+
 import logging
 import threading
 from flask import Flask, jsonify, request, g
@@ -8,32 +11,73 @@ from flask_cors import CORS
 from .config import get_config, _parse_db_config
 from .extensions import db, migrate, redis_client
 from .database import db_manager
+from .replicas import replica_router
+from .health import health_sampler
+from .json_provider import JSONProvider
+
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_START
 
 logger = logging.getLogger(__name__)
 
+# Set by gunicorn.conf.py when the master builds the app once and forks
+PRELOADED = os.environ.get('SAVLINK_PRELOAD') == '1'
+# false: the schema is managed by `flask migrate`; boot only connects
+MIGRATE_ON_BOOT = os.environ.get('DB_MIGRATE_ON_BOOT', 'true').lower() == 'true'
+
 
 def create_app(config_class=None):
+    started = time.perf_counter()
     if config_class is None:
         config_class = get_config()
 
     app = Flask(__name__)
+    app.json = JSONProvider(app)
     app.config.from_object(config_class)
     config_class.init_app(app)
-
-    _init_extensions(app)
-    _register_hooks(app)
-    _register_health(app)
-    _init_database(app)
-    _init_firebase(app)
-    _register_blueprints(app)
-    _register_errors(app)
+    if app.config.get('TRUSTED_PROXIES'):
+        # remote_addr becomes the address the trusted proxy saw; anything a
+        # client adds to X-Forwarded-For itself is ignored
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXIES'])
+
+    profile = [('imports', _IMPORT_SECONDS), ('config', time.perf_counter() - started)]
+    for name, step in (
+        ('extensions', _init_extensions),
+        ('hooks', _register_hooks),
+        ('health', _register_health),
+        ('database', _init_database),
+        ('firebase', _init_firebase),
+        ('blueprints', _register_blueprints),
+        ('errors', _register_errors),
+        ('cli', _register_cli),
+        ('workers', _start_workers),
+    ):
+        phase_start = time.perf_counter()
+        step(app)
+        profile.append((name, time.perf_counter() - phase_start))
+    app.extensions['startup_profile'] = profile
 
     _log_startup_banner(app)
     return app
 
 
+def reinit_after_fork(app):
+    """
+    gunicorn post_fork hook when the app is preloaded. The worker inherits
+    the master's engines and Redis pool, so their connections are dropped
+    (without closing the parent's sockets), and threads, which don't
+    survive fork, are started here instead of in create_app.
+    """
+    start = time.perf_counter()
+    with app.app_context():
+        db.engine.dispose(close=False)
+    replica_router.dispose(close=False)
+    redis_client.reset_after_fork()
+    _start_workers(app, forked=True)
+    logger.info("[BOOT] Worker %d ready in %.1fms", os.getpid(), (time.perf_counter() - start) * 1000)
+
+
 def _log_startup_banner(app):
-    import os
     from datetime import datetime, timezone
 
     env = app.config.get('FLASK_ENV', 'development')
@@ -56,6 +100,8 @@ def _log_startup_banner(app):
     engine_opts = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
     pool_size = engine_opts.get('pool_size', '?')
     max_overflow = engine_opts.get('max_overflow', '?')
+    if app.config.get('DB_POOL_ADAPTIVE'):
+        max_overflow = f"{max_overflow} (adaptive, budget {app.config.get('DB_POOL_BUDGET')})"
 
     now = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')
 
@@ -80,7 +126,8 @@ def _log_startup_banner(app):
     logger.info("    port          %s", port)
     logger.info("    debug         %s", "on" if debug else "off")
     logger.info("    cors          %d origins", cors_count)
-    logger.info("    blueprints    13")
+    logger.info("    blueprints    14")
+    logger.info("    boot          %s", "preload (fork)" if PRELOADED else "per worker")
     logger.info("")
     logger.info("  ── Services ───────────────────────────────────")
     logger.info("")
@@ -88,6 +135,13 @@ def _log_startup_banner(app):
         icon = "✓" if healthy else "✗"
         logger.info("    %s  %-12s  %s", icon, name, value)
     logger.info("")
+    logger.info("  ── Startup ────────────────────────────────────")
+    logger.info("")
+    profile = app.extensions.get('startup_profile', [])
+    for phase, seconds in profile:
+        logger.info("    %-12s  %7.1fms", phase, seconds * 1000)
+    logger.info("    %-12s  %7.1fms", "total", sum(s for _, s in profile) * 1000)
+    logger.info("")
     logger.info("  ── Status ─────────────────────────────────────")
     logger.info("")
     logger.info("    %s  %s", "●" if all_ok else "◐", "All systems operational" if all_ok else "Degraded mode")
@@ -103,6 +157,7 @@ def _init_extensions(app):
     db.init_app(app)
     migrate.init_app(app, db)
     db_manager.init_app(app)
+    replica_router.init_app(app)
 
     cors_origins = app.config.get('CORS_ORIGINS', [])
     logger.info("[CORS] Allowed origins: %d configured", len(cors_origins))
@@ -116,7 +171,38 @@ def _init_extensions(app):
          max_age=86400)
 
 
+SECURITY_HEADERS = {
+    'Cross-Origin-Opener-Policy': 'same-origin-allow-popups',
+    'Cross-Origin-Embedder-Policy': 'unsafe-none',
+    'X-Content-Type-Options': 'nosniff',
+    'X-Frame-Options': 'SAMEORIGIN',
+    'Referrer-Policy': 'strict-origin-when-cross-origin',
+}
+
+
+def apply_response_headers(headers, path: str):
+    """Security, Vary and Cache-Control headers; shared with the ASGI app."""
+    for name, value in SECURITY_HEADERS.items():
+        headers[name] = value
+
+    vary = set(filter(None, headers.get('Vary', '').split(', '))) | {'Origin'}
+    headers['Vary'] = ', '.join(vary)
+
+    if path.startswith('/api/'):
+        headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+    elif path.startswith('/r/'):
+        headers['Cache-Control'] = 'public, max-age=300'
+
+
 def _register_hooks(app):
+    # First registered, last to run: compresses the final body
+    from .middleware import conditional
+    conditional.init_app(app)
+    from .middleware import query_stats
+    query_stats.init_app(app)
+    from . import metrics
+    metrics.init_app(app)
+
     @app.before_request
     def _before():
         g.request_start_time = time.time()
@@ -128,22 +214,12 @@ def _register_hooks(app):
             if dur > 5:
                 logger.warning("[SLOW] %s %s took %.2fs", request.method, request.path, dur)
 
-        resp.headers['Cross-Origin-Opener-Policy'] = 'same-origin-allow-popups'
-        resp.headers['Cross-Origin-Embedder-Policy'] = 'unsafe-none'
-        resp.headers['X-Content-Type-Options'] = 'nosniff'
-        resp.headers['X-Frame-Options'] = 'SAMEORIGIN'
-        resp.headers['Referrer-Policy'] = 'strict-origin-when-cross-origin'
-
-        vary = set(filter(None, resp.headers.get('Vary', '').split(', '))) | {'Origin'}
-        resp.headers['Vary'] = ', '.join(vary)
-
-        if request.path.startswith('/api/'):
-            resp.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        elif request.path.startswith('/r/'):
-            resp.headers['Cache-Control'] = 'public, max-age=300'
-
+        apply_response_headers(resp.headers, request.path)
         return resp
 
+    from .middleware import admission
+    admission.init_app(app)
+
     @app.teardown_appcontext
     def _teardown(exception=None):
         try:
@@ -163,45 +239,79 @@ def _register_health(app):
     def _ping():
         return 'pong', 200
 
+    # Served from the health sampler's last results; no I/O per request
     @app.route('/health')
     def _health():
-        return jsonify(status='healthy', service='api.savlink', ts=time.time())
+        snap = health_sampler.snapshot()
+        return jsonify(status=snap['status'], service='api.savlink', ts=time.time(),
+                       checked_at=snap['checked_at'])
 
     @app.route('/health/full')
     def _health_full():
-        checks = {'database': db_manager.check_health()}
+        from .middleware.admission import admission
+        snap = health_sampler.snapshot()
+        checks = dict(snap['checks'])
         checks['pool'] = db_manager.get_pool_status()
-        if redis_client.available:
-            checks['redis'] = {'healthy': redis_client.ping()}
-        status = 'healthy' if checks['database'].get('healthy') else 'degraded'
-        return jsonify(status=status, checks=checks)
+        checks['admission'] = admission.stats()
+        return jsonify(status=snap['status'], checked_at=snap['checked_at'], checks=checks)
+
+    @app.route('/health/ready')
+    def _health_ready():
+        result = health_sampler.readiness(db.engine)
+        return jsonify(result), 200 if result['ready'] else 503
 
 
 def _init_database(app):
     def _task():
         with app.app_context():
-            result = db_manager.initialize_with_retry()
+            result = db_manager.initialize_with_retry(migrate=MIGRATE_ON_BOOT)
             if result['success']:
                 logger.info("[DB] Initialized successfully — %d tables", result.get('tables_count', 0))
             else:
                 logger.error("[DB] Initialization failed: %s", result.get('error'))
 
-    if app.config.get('FLASK_ENV') == 'production':
+    if PRELOADED:
+        # Once, in the master, before any worker forks; nothing to inherit
+        _task()
+        with app.app_context():
+            db.engine.dispose()
+        replica_router.dispose()
+    elif app.config.get('FLASK_ENV') == 'production':
         threading.Thread(target=_task, daemon=True).start()
     else:
         _task()
 
 
+def _register_cli(app):
+    from .cli import register_commands
+    register_commands(app)
+
+
+def _start_workers(app, forked: bool = False):
+    if PRELOADED and not forked:
+        return  # the master's threads wouldn't survive fork; see reinit_after_fork
+    health_sampler.start(app)
+    from .metadata import refresher as metadata_refresher
+    if metadata_refresher.ENABLED:
+        metadata_refresher.refresher.start(app)
+    if app.config.get('DB_POOL_ADAPTIVE'):
+        from .pool import pool_tuner
+        pool_tuner.start(app)
+
+
 def _init_firebase(app):
-    if not app.config.get('FIREBASE_CONFIG_JSON'):
+    config_json = app.config.get('FIREBASE_CONFIG_JSON')
+    if not config_json:
         logger.warning("[AUTH] Firebase config not set — authentication disabled")
         return
+    # The Admin SDK is only needed for revocation checks and the fallback
+    # verifier, so it is imported and initialized on first use
     try:
-        from .auth.firebase import initialize_firebase
-        initialize_firebase()
-        logger.info("[AUTH] Firebase initialized")
-    except Exception as e:
-        logger.error("[AUTH] Firebase initialization failed: %s", e)
+        import json
+        json.loads(config_json)
+        logger.info("[AUTH] Firebase configured (SDK loads on first use)")
+    except ValueError as e:
+        logger.error("[AUTH] Firebase config is not valid JSON: %s", e)
 
 
 def _register_blueprints(app):
@@ -218,6 +328,7 @@ def _register_blueprints(app):
     from .activity import activity_bp
     from .trash import trash_bp
     from .users import users_bp
+    from .admin import admin_bp
 
     app.register_blueprint(auth_bp,       url_prefix='/api/auth')
     app.register_blueprint(links_bp,      url_prefix='/api/links')
@@ -232,8 +343,9 @@ def _register_blueprints(app):
     app.register_blueprint(activity_bp,   url_prefix='/api/activity')
     app.register_blueprint(trash_bp,      url_prefix='/api/trash')
     app.register_blueprint(users_bp,      url_prefix='/api/user')
+    app.register_blueprint(admin_bp,      url_prefix='/api/admin')
 
-    logger.info("[ROUTES] Registered %d blueprints", 13)
+    logger.info("[ROUTES] Registered %d blueprints", 14)
 
 
 def _register_errors(app):
@@ -3,6 +3,7 @@
 from flask import request
 from app.activity import activity_bp
 from app.auth.middleware import require_auth
+from app.replicas import read_replica
 from app.auth.utils import get_current_user_id as uid
 from app.responses import success_response, error_response
 from app.activity import service
@@ -10,6 +11,7 @@ from app.activity import service
 
 @activity_bp.route('', methods=['GET'])
 @require_auth
+@read_replica
 def get_activity():
     try:
         limit = min(max(1, int(request.args.get('limit', 30))), 100)
@@ -24,6 +26,7 @@ def get_activity():
 
 @activity_bp.route('/feed', methods=['GET'])
 @require_auth
+@read_replica
 def feed():
     data = service.get_activity_feed(uid())
     return success_response({'feed': data})
@@ -31,6 +34,7 @@ def feed():
 
 @activity_bp.route('/stats', methods=['GET'])
 @require_auth
+@read_replica
 def activity_stats():
     try:
         days = min(max(1, int(request.args.get('days', 30))), 365)
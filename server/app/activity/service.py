@@ -10,6 +10,7 @@ from app.extensions import db
 from app.models.activity_log import ActivityLog
 from app.cache.redis_layer import cache
 from app.cache import keys as K
+from app.metrics import ACTIVITY_QUEUE_DEPTH, ACTIVITY_DROPPED
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +47,7 @@ def _start_writer():
                 except Exception:
                     break
 
+            ACTIVITY_QUEUE_DEPTH.set(_write_queue.qsize())
             if batch:
                 _flush_batch(batch)
 
@@ -107,7 +109,9 @@ def log_activity(user_id: str, action: str, entity_type: str,
 
     try:
         _write_queue.put_nowait(item)
+        ACTIVITY_QUEUE_DEPTH.set(_write_queue.qsize())
     except Full:
+        ACTIVITY_DROPPED.inc()
         logger.warning("Activity queue full — dropping log for %s", action)
 
 
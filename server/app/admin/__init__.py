@@ -0,0 +1,4 @@
+# server/app/admin/__init__.py
+from flask import Blueprint
+admin_bp = Blueprint('admin', __name__)
+from . import routes  # noqa: E402, F401
@@ -0,0 +1,53 @@
+# server/app/admin/routes.py
+from flask import request
+from app.admin import admin_bp
+from app.auth.middleware import require_admin
+from app.responses import success_response
+from app.middleware.query_stats import query_stats
+from app.pool import pool_telemetry, pool_tuner
+from app.database import db_manager
+from app.metadata.domains import domain_controller
+
+
+@admin_bp.route('/metrics/queries', methods=['GET'])
+@require_admin
+def query_metrics():
+    try:
+        top = max(1, min(int(request.args.get('top', 50)), 500))
+    except ValueError:
+        top = 50
+    return success_response(query_stats.snapshot(top))
+
+
+@admin_bp.route('/metrics/queries/reset', methods=['POST'])
+@require_admin
+def reset_query_metrics():
+    query_stats.reset()
+    return success_response(message='Query metrics reset')
+
+
+@admin_bp.route('/metrics/pool', methods=['GET'])
+@require_admin
+def pool_metrics():
+    return success_response({
+        'pool': db_manager.get_pool_status(),
+        'tuner': pool_tuner.stats(),
+        **pool_telemetry.snapshot(),
+    })
+
+
+@admin_bp.route('/metrics/pool/reset', methods=['POST'])
+@require_admin
+def reset_pool_metrics():
+    pool_telemetry.reset()
+    return success_response(message='Pool metrics reset')
+
+
+@admin_bp.route('/metrics/domains', methods=['GET'])
+@require_admin
+def domain_metrics():
+    try:
+        limit = max(1, min(int(request.args.get('limit', 50)), 200))
+    except ValueError:
+        limit = 50
+    return success_response({'domains': domain_controller.stats(limit)})
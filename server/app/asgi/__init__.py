@@ -0,0 +1,93 @@
+# server/app/asgi/__init__.py
+
+import os
+import logging
+from contextlib import asynccontextmanager
+
+from starlette.routing import Match
+
+logger = logging.getLogger(__name__)
+
+# Threads running the Flask app for every route without an async handler
+WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', '8'))
+
+
+class Dispatcher:
+    """
+    Sends requests for the async routes (and their CORS preflights) to the
+    FastAPI app and everything else to the Flask app, so one process serves
+    the whole API. Each side keeps its own CORS handling.
+    """
+
+    def __init__(self, native, fallback):
+        self.native = native
+        self.fallback = fallback
+
+    def _is_native(self, scope) -> bool:
+        for route in self.native.router.routes:
+            match, _ = route.matches(scope)
+            if match != Match.NONE:  # PARTIAL: path matches, method doesn't (OPTIONS)
+                return True
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan' or (scope['type'] == 'http' and self._is_native(scope)):
+            await self.native(scope, receive, send)
+        else:
+            await self.fallback(scope, receive, send)
+
+
+def create_asgi_app(flask_app=None):
+    """
+    ASGI entry point (see asgi.py): redirect, metadata and search served by
+    async handlers over asyncpg, redis.asyncio and httpx; the rest of the
+    Flask app mounted behind them on a thread pool.
+    """
+    from a2wsgi import WSGIMiddleware
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.middleware.gzip import GZipMiddleware
+
+    from app import create_app
+    from app.asgi.resources import resources
+    from app.asgi.routes import routers
+
+    flask_app = flask_app or create_app()
+    from werkzeug.middleware.proxy_fix import ProxyFix
+    if isinstance(flask_app.wsgi_app, ProxyFix):
+        # uvicorn resolves the client address (--forwarded-allow-ips); a
+        # second pass would trust X-Forwarded-For from any peer
+        flask_app.wsgi_app = flask_app.wsgi_app.app
+
+    @asynccontextmanager
+    async def lifespan(app):
+        await resources.open(flask_app)
+        try:
+            yield
+        finally:
+            await resources.close()
+
+    native = FastAPI(lifespan=lifespan, docs_url=None, redoc_url=None, openapi_url=None)
+    native.state.flask_app = flask_app
+    for router in routers:
+        native.include_router(router)
+
+    from app.middleware import conditional
+    if conditional.ENABLED:
+        native.add_middleware(GZipMiddleware, minimum_size=conditional.MIN_BYTES,
+                              compresslevel=conditional.GZIP_LEVEL)
+
+    # Same policy as flask-cors in create_app
+    native.add_middleware(
+        CORSMiddleware,
+        allow_origins=flask_app.config.get('CORS_ORIGINS', []),
+        allow_credentials=True,
+        allow_headers=['Content-Type', 'Authorization', 'X-Requested-With', 'Accept', 'Origin'],
+        allow_methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS', 'PATCH'],
+        expose_headers=['Content-Type', 'Authorization'],
+        max_age=86400,
+    )
+
+    logger.info("[ASGI] %d async routes, Flask on %d threads for the rest",
+                sum(len(r.routes) for r in routers), WSGI_THREADS)
+    return Dispatcher(native, WSGIMiddleware(flask_app, workers=WSGI_THREADS))
@@ -0,0 +1,185 @@
+# server/app/asgi/resources.py
+
+import os
+import time
+import uuid
+import logging
+from typing import Optional, Dict, Any
+
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.config import _parse_db_config
+
+logger = logging.getLogger(__name__)
+
+# Outbound fetches are the slow requests this mode exists for; each one
+# only costs a socket, so the cap is high.
+HTTP_MAX_CONNECTIONS = int(os.environ.get('ASGI_HTTP_CONNECTIONS', '1000'))
+REDIS_MAX_CONNECTIONS = int(os.environ.get('ASGI_REDIS_CONNECTIONS', '100'))
+# asyncpg pool when the app wasn't built with SERVER_MODE=asgi
+FALLBACK_POOL = {'pool_size': 2, 'max_overflow': 2}
+
+
+class AsyncRedis:
+    """
+    redis.asyncio twin of app.extensions.RedisClient for the ASGI app:
+    the same command methods, with errors logged and returned as None.
+    """
+
+    def __init__(self):
+        self._client: Optional[aioredis.Redis] = None
+        self._available = False
+        self.on_command = None
+
+    async def connect(self, url: Optional[str]):
+        if not url:
+            return
+        is_prod = os.environ.get('FLASK_ENV') == 'production'
+        kw = dict(
+            decode_responses=True,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            timeout=3,  # wait for a free connection instead of raising
+            socket_connect_timeout=5 if is_prod else 10,
+            socket_timeout=3 if is_prod else 5,
+            retry_on_timeout=True,
+            health_check_interval=30,
+        )
+        if url.startswith('rediss://'):
+            kw['ssl_cert_reqs'] = None
+        try:
+            pool = aioredis.BlockingConnectionPool.from_url(url, **kw)
+            self._client = aioredis.Redis(connection_pool=pool)
+            await self._client.ping()
+            self._available = True
+            logger.info("[ASGI] Async Redis connected (max_connections=%d)", REDIS_MAX_CONNECTIONS)
+        except Exception as e:
+            logger.warning("[ASGI] Async Redis unavailable: %s", e)
+            self._available = False
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._available = False
+
+    @property
+    def available(self) -> bool:
+        return self._available and self._client is not None
+
+    async def _exec(self, name: str, *args):
+        if not self.available:
+            return None
+        start = time.perf_counter()
+        error = False
+        try:
+            return await getattr(self._client, name)(*args)
+        except RedisError as e:
+            error = True
+            logger.warning("Redis error: %s", e)
+            return None
+        finally:
+            if self.on_command is not None:
+                self.on_command(name, time.perf_counter() - start, error)
+
+    async def get(self, key):
+        return await self._exec('get', key)
+
+    async def setex(self, key, ttl, value):
+        return await self._exec('setex', key, ttl, value)
+
+    async def delete(self, *keys):
+        return await self._exec('delete', *keys)
+
+    async def exists(self, key):
+        return await self._exec('exists', key)
+
+    async def incr(self, key):
+        return await self._exec('incr', key)
+
+    async def expire(self, key, ttl):
+        return await self._exec('expire', key, ttl)
+
+
+def async_engine_options(uri: str, options: Dict[str, Any], pool: Optional[Dict[str, int]] = None):
+    """
+    (url, engine kwargs) for asyncpg from the primary's psycopg2 URL and
+    SQLALCHEMY_ENGINE_OPTIONS. libpq connect args are translated. Pool
+    sizing comes from `pool` (Config.ASYNC_ENGINE_POOL, carved out of the
+    sync pool), or a small pool of its own when the app wasn't configured
+    for ASGI mode; requests beyond it wait without holding a thread.
+    """
+    url = make_url(uri).set(drivername='postgresql+asyncpg')
+    query = dict(url.query)
+    sslmode = query.pop('sslmode', None)
+    url = url.set(query=query)
+
+    libpq = options.get('connect_args', {})
+    server_settings = {'application_name': libpq.get('application_name', 'savlink') + '-asgi'}
+    for part in libpq.get('options', '').split('-c'):
+        if '=' in part:
+            name, value = part.strip().split('=', 1)
+            server_settings[name] = value
+    connect_args = {
+        'timeout': libpq.get('connect_timeout', 10),
+        'server_settings': server_settings,
+    }
+    ssl = sslmode or libpq.get('sslmode')
+    if ssl and ssl not in ('disable', 'allow', 'prefer') and not str(query.get('host', '')).startswith('/'):
+        connect_args['ssl'] = ssl
+
+    db_info = _parse_db_config(uri)
+    if db_info['pooler'] and db_info['pool_mode'] == 'transaction':
+        # PgBouncer/Supavisor transaction mode can't keep prepared statements
+        connect_args['statement_cache_size'] = 0
+        connect_args['prepared_statement_name_func'] = lambda: f'__asyncpg_{uuid.uuid4()}__'
+
+    kwargs = {k: options[k] for k in ('pool_recycle', 'pool_pre_ping', 'pool_timeout') if k in options}
+    kwargs.update(pool or FALLBACK_POOL)
+    kwargs['connect_args'] = connect_args
+    return url, kwargs
+
+
+class Resources:
+    """Per-process async clients, opened and closed by the ASGI lifespan."""
+
+    def __init__(self):
+        self.engine = None
+        self.sessionmaker: Optional[async_sessionmaker] = None
+        self.redis = AsyncRedis()
+        self.http = None
+
+    async def open(self, flask_app):
+        import httpx
+        from app.metrics import observe_redis
+
+        url, kwargs = async_engine_options(
+            flask_app.config['SQLALCHEMY_DATABASE_URI'],
+            flask_app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+            flask_app.config.get('ASYNC_ENGINE_POOL'),
+        )
+        self.engine = create_async_engine(url, **kwargs)
+        self.sessionmaker = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+
+        await self.redis.connect(flask_app.config.get('REDIS_URL'))
+        self.redis.on_command = observe_redis
+
+        from app.metadata.service import TIMEOUT
+        self.http = httpx.AsyncClient(
+            follow_redirects=True, max_redirects=5, timeout=TIMEOUT,
+            limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=100),
+        )
+        logger.info("[ASGI] Async resources ready (db pool %s + %s overflow)",
+                    kwargs.get('pool_size', '?'), kwargs.get('max_overflow', '?'))
+
+    async def close(self):
+        if self.http is not None:
+            await self.http.aclose()
+        await self.redis.close()
+        if self.engine is not None:
+            await self.engine.dispose()
+
+
+resources = Resources()
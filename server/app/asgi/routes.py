@@ -0,0 +1,249 @@
+# server/app/asgi/routes.py
+
+import json
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs
+
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import RedirectResponse
+from fastapi.routing import APIRoute
+
+from app.asgi.resources import resources
+from app.auth.local_cache import auth_cache
+from app.auth.middleware import authenticate
+from app.json_provider import dumps
+from app.metadata.service import extract_metadata_async, batch_extract_async, preview_of
+from app.redirect.routes import client_info, unlock_error, _UNLOCK_ERRORS
+from app.search.service import SearchEngine, parse_search_args
+from app.shortlinks import unlock
+from app.shortlinks.service import ShortLinkManager
+
+logger = logging.getLogger(__name__)
+
+
+class ApiError(Exception):
+    def __init__(self, message: str, status: int = 400, code: Optional[str] = None,
+                 headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.message, self.status, self.code, self.headers = message, status, code, headers
+
+
+def json_response(body: Dict[str, Any], status: int = 200) -> Response:
+    return Response(dumps(body), status_code=status, media_type='application/json')
+
+
+def success(data: Any = None, status: int = 200) -> Response:
+    body = {'success': True}
+    if data is not None:
+        body['data'] = data
+    return json_response(body, status)
+
+
+def error(err: ApiError) -> Response:
+    body = {'success': False, 'error': err.message}
+    if err.code:
+        body['code'] = err.code
+    response = json_response(body, err.status)
+    for name, value in (err.headers or {}).items():
+        response.headers[name] = value
+    return response
+
+
+class FlaskContextRoute(APIRoute):
+    """
+    Runs each handler inside a Flask app context, so the shared services
+    see current_app, g and the page-metadata memo as they do under Flask.
+    Also applies the Flask app's response headers and request metrics.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        blueprint, endpoint = self.tags[0], f'{self.tags[0]}.{self.name}'
+
+        async def wrapped(request: Request) -> Response:
+            from app import apply_response_headers
+            from app.metrics import HTTP_LATENCY
+
+            start = time.time()
+            with request.app.state.flask_app.app_context():
+                try:
+                    response = await handler(request)
+                except ApiError as e:
+                    response = error(e)
+            apply_response_headers(response.headers, request.url.path)
+            HTTP_LATENCY.labels(
+                blueprint, endpoint, request.method, f'{response.status_code // 100}xx',
+            ).observe(time.time() - start)
+            return response
+
+        return wrapped
+
+
+#  Dependencies
+
+async def db_session():
+    async with resources.sessionmaker() as session:
+        yield session
+
+
+def _client_ip(request: Request) -> str:
+    # uvicorn has already applied X-Forwarded-For from FORWARDED_ALLOW_IPS
+    # peers; the raw header is client-controlled
+    return request.client.host if request.client else '0.0.0.0'
+
+
+async def current_user(request: Request) -> Dict[str, Any]:
+    header = request.headers.get('Authorization')
+    if not header:
+        raise ApiError('Authorization header required', 401, 'AUTH_MISSING')
+    if not header.startswith('Bearer '):
+        raise ApiError('Invalid authorization format', 401, 'AUTH_FORMAT')
+
+    token = header[7:].strip()
+    user, _ = auth_cache.get(token)
+    if user:
+        return user
+    # Misses may reach Firebase or the DB through the sync auth stack
+    user, _, err = await asyncio.to_thread(authenticate, token, lambda: _client_ip(request))
+    if err:
+        raise ApiError(*err)
+    return user
+
+
+async def json_body(request: Request) -> Dict[str, Any]:
+    try:
+        body = await request.json()
+    except ValueError:
+        raise ApiError('Bad request', 400)
+    if not isinstance(body, dict):
+        raise ApiError('Bad request', 400)
+    return body
+
+
+#  Redirect
+
+redirect_router = APIRouter(route_class=FlaskContextRoute, tags=['redirect'])
+
+
+@redirect_router.api_route('/r/{slug}', methods=['GET', 'POST'])
+async def handle_redirect(slug: str, request: Request, session=Depends(db_session)):
+    if not slug or len(slug) > 255:
+        raise ApiError('Not found', 404)
+    info = client_info(request.headers, _client_ip(request))
+    info['unlock_token'] = request.cookies.get(unlock.cookie_name(slug))
+    if request.method == 'POST':
+        raw = await request.body()
+        if request.headers.get('Content-Type', '').startswith('application/json'):
+            try:
+                info['password'] = (json.loads(raw or b'{}') or {}).get('password')
+            except (ValueError, AttributeError):
+                pass
+        else:
+            info['password'] = (parse_qs(raw.decode('utf-8', 'replace')).get('password') or [None])[0]
+
+    dest, err = await ShortLinkManager.track_click_async(session, resources.redis, slug, info)
+    if err in _UNLOCK_ERRORS:
+        message, status, retry_after = unlock_error(err)
+        raise ApiError(message, status, err.upper(), {'Retry-After': retry_after} if retry_after else None)
+    if not dest:
+        raise ApiError('Not found', 404)
+
+    response = RedirectResponse(dest, status_code=302)
+    token = info.get('issued_unlock_token')
+    if token:
+        response.set_cookie(
+            unlock.cookie_name(slug), token, max_age=unlock.UNLOCK_TTL, path=request.url.path,
+            secure=not request.app.state.flask_app.debug, httponly=True, samesite='lax',
+        )
+    return response
+
+
+#  Metadata
+
+metadata_router = APIRouter(prefix='/api/metadata', route_class=FlaskContextRoute, tags=['metadata'])
+
+
+def _url_from(body: Dict[str, Any]) -> str:
+    url = (body.get('url') or '').strip() if isinstance(body.get('url'), str) else ''
+    if not url:
+        raise ApiError('URL is required', 400)
+    if not url.startswith(('http://', 'https://')):
+        raise ApiError('Invalid URL', 400)
+    return url
+
+
+@metadata_router.post('/extract')
+async def extract(request: Request, user=Depends(current_user)):
+    body = await json_body(request)
+    url = _url_from(body)
+    try:
+        meta = await extract_metadata_async(url, resources.http, resources.redis,
+                                            force_refresh=body.get('force_refresh', False))
+    except Exception as e:
+        logger.error("Extraction failed for %s: %s", url, e)
+        raise ApiError('Extraction failed', 500)
+    return success({'url': url, 'metadata': meta})
+
+
+@metadata_router.post('/batch')
+async def batch(request: Request, user=Depends(current_user)):
+    body = await json_body(request)
+    urls = body.get('urls')
+    if not urls:
+        raise ApiError('urls[] is required', 400)
+    if not isinstance(urls, list) or len(urls) > 20:
+        raise ApiError('Max 20 URLs per batch', 400)
+    results = await batch_extract_async(urls, resources.http, resources.redis,
+                                        force_refresh=body.get('force_refresh', False))
+    return success({'results': results})
+
+
+@metadata_router.post('/preview')
+async def preview(request: Request, user=Depends(current_user)):
+    url = _url_from(await json_body(request))
+    try:
+        meta = await extract_metadata_async(url, resources.http, resources.redis)
+    except Exception as e:
+        logger.error("Preview failed for %s: %s", url, e)
+        raise ApiError('Preview failed', 500)
+    return success({'preview': preview_of(meta)})
+
+
+#  Search
+
+search_router = APIRouter(prefix='/api/search', route_class=FlaskContextRoute, tags=['search'])
+
+
+@search_router.get('/everything')
+async def search_everything(request: Request, user=Depends(current_user), session=Depends(db_session)):
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        raise ApiError('Search query is required', 400)
+    if len(query) > 500:
+        raise ApiError('Query too long', 400)
+
+    filters, limit = parse_search_args(request.query_params)
+    engine = SearchEngine(user['id'])
+    return success(await engine.search_async(session, resources.redis, query, filters, limit=limit))
+
+
+@search_router.get('/suggestions')
+async def suggestions(request: Request, user=Depends(current_user), session=Depends(db_session)):
+    query = request.query_params.get('q', '').strip()
+    engine = SearchEngine(user['id'])
+
+    if not query or len(query) < 2:
+        return success({'suggestions': await engine.get_history_async(resources.redis, 10)})
+
+    results = await engine.search_async(session, resources.redis, query, {}, limit=10)
+    return success({
+        'suggestions': results['links'][:5],
+        'folders': results['folders'][:3],
+        'tags': results['tags'][:3],
+    })
+
+
+routers = (redirect_router, metadata_router, search_router)
@@ -8,9 +8,9 @@ from app.auth.emergency.email import send_emergency_token_email
 from app.auth.redis import (
     check_emergency_rate_limit,
     track_verification_attempt,
-    create_emergency_session,
     is_redis_available
 )
+from app.auth.sessions import create_emergency_session
 from flask import current_app
 import logging
 
@@ -109,17 +109,13 @@ def verify_emergency_token(email: str, token: str, ip_address: str) -> Optional[
     # Mark token as used
     emergency_token.used_at = datetime.utcnow()
     emergency_token.ip_address = ip_address
+    user.last_login_at = emergency_token.used_at
     db.session.commit()
     
     # Create emergency session
-    session_token = generate_secure_token()
-    session_created = create_emergency_session(
-        session_id=session_token,
-        user_id=user.id,
-        ttl=int(current_app.config['EMERGENCY_SESSION_TTL'].total_seconds())
-    )
+    session_token = create_emergency_session(user)
     
-    if not session_created:
+    if not session_token:
         logger.error(f"Failed to create emergency session for {email}")
         return None
     
@@ -3,13 +3,21 @@
 import json
 import os
 import time
-import firebase_admin
-from firebase_admin import credentials, auth as firebase_auth
 from typing import Optional, Dict, Any
 from app.auth.redis import (
     cache_token_verification,
     get_cached_token_verification,
-    invalidate_token_cache
+    invalidate_token_cache,
+    get_tokens_valid_after,
+    set_tokens_valid_after,
+)
+from app.auth.local_cache import auth_cache
+from app.auth.tokens import (
+    LOCAL_VERIFY,
+    verify_token_locally,
+    ExpiredTokenError,
+    InvalidTokenError,
+    KeysUnavailableError,
 )
 import logging
 
@@ -17,15 +25,28 @@ logger = logging.getLogger(__name__)
 
 _firebase_app = None
 
+# How long a user's revocation state (tokens_valid_after / disabled) from
+# the Admin SDK is trusted before it is re-checked. 0 checks every time.
+REVOCATION_CHECK_INTERVAL = int(os.environ.get('FIREBASE_REVOCATION_CHECK_INTERVAL', '600'))
+
 #  Performance Metrics 
 _metrics = {
     'cache_hits': 0,
     'cache_misses': 0,
     'verifications': 0,
+    'local_verifications': 0,
+    'revocation_checks': 0,
     'errors': 0
 }
 
 
+def _sdk():
+    """firebase_admin and its auth module, imported on first use (~150ms)."""
+    import firebase_admin
+    from firebase_admin import auth
+    return firebase_admin, auth
+
+
 def initialize_firebase():
     """Initialize Firebase Admin SDK (idempotent)."""
     global _firebase_app
@@ -37,9 +58,10 @@ def initialize_firebase():
     if not config_json:
         raise ValueError("FIREBASE_CONFIG_JSON environment variable not set")
     
+    firebase_admin, _ = _sdk()
     try:
         config_dict = json.loads(config_json)
-        cred = credentials.Certificate(config_dict)
+        cred = firebase_admin.credentials.Certificate(config_dict)
         _firebase_app = firebase_admin.initialize_app(cred)
         logger.info("✅ Firebase Admin SDK initialized successfully")
         logger.info(f"Project ID: {config_dict.get('project_id')}")
@@ -60,8 +82,10 @@ def verify_id_token(token: str) -> Optional[Dict[str, Any]]:
     
     Flow:
     1. Check Redis cache (fast path: ~1-5ms)
-    2. If miss, verify with Firebase Admin SDK (~200-500ms)
-    3. Cache result in Redis for 5 minutes
+    2. If miss, verify the JWT locally against cached Google certs, with
+       the SDK consulted for revocation on REVOCATION_CHECK_INTERVAL
+    3. If local keys are unavailable, verify with Firebase Admin SDK (~200-500ms)
+    4. Cache result in Redis for 5 minutes
     
     Returns decoded token data or None if invalid.
     """
@@ -78,8 +102,29 @@ def verify_id_token(token: str) -> Optional[Dict[str, Any]]:
     
     _metrics['cache_misses'] += 1
     logger.debug("Token cache MISS - verifying with Firebase")
-    
+
+    if LOCAL_VERIFY:
+        try:
+            decoded_token = verify_token_locally(token)
+            if _is_revoked(decoded_token):
+                logger.warning("Token revoked: uid=%s", decoded_token['uid'][:8])
+                invalidate_token_cache(token)
+                return None
+            _metrics['local_verifications'] += 1
+            cache_token_verification(token, decoded_token)
+            return decoded_token
+        except ExpiredTokenError as e:
+            logger.warning(f"Token expired: {str(e)[:100]}")
+            invalidate_token_cache(token)
+            return None
+        except InvalidTokenError as e:
+            logger.warning(f"Invalid token: {str(e)[:100]}")
+            return None
+        except KeysUnavailableError as e:
+            logger.warning(f"Local verification unavailable, using SDK: {e}")
+
     #  Step 2: Verify with Firebase 
+    _, firebase_auth = _sdk()
     try:
         initialize_firebase()
         
@@ -122,6 +167,33 @@ def verify_id_token(token: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+def _is_revoked(decoded_token: Dict[str, Any]) -> bool:
+    """Revocation per the SDK's rule: iat before tokens_valid_after, or user disabled."""
+    uid = decoded_token['uid']
+    valid_after = get_tokens_valid_after(uid) if REVOCATION_CHECK_INTERVAL else None
+
+    if valid_after is None:
+        _, firebase_auth = _sdk()
+        try:
+            initialize_firebase()
+            user = firebase_auth.get_user(uid)
+            _metrics['revocation_checks'] += 1
+        except firebase_auth.UserNotFoundError:
+            return True
+        except Exception as e:
+            # Signature and claims already checked; don't lock everyone
+            # out while Firebase is unreachable.
+            logger.warning(f"Revocation check failed for {uid[:8]}: {e}")
+            return False
+        valid_after = -1 if user.disabled else (user.tokens_valid_after_timestamp or 0) / 1000
+        if REVOCATION_CHECK_INTERVAL:
+            set_tokens_valid_after(uid, valid_after, REVOCATION_CHECK_INTERVAL)
+
+    if valid_after < 0:
+        return True
+    return decoded_token.get('iat', 0) < valid_after
+
+
 def extract_user_info(decoded_token: Dict[str, Any]) -> Dict[str, Any]:
     """Extract normalized user info from decoded token (cached or fresh)."""
     firebase_data = decoded_token.get('firebase', {})
@@ -144,5 +216,6 @@ def get_verification_metrics() -> Dict[str, Any]:
     return {
         **_metrics,
         'total_requests': total,
-        'cache_hit_rate': f"{hit_rate:.1f}%"
+        'cache_hit_rate': f"{hit_rate:.1f}%",
+        'local_auth_cache': auth_cache.stats(),
     }
\ No newline at end of file
@@ -0,0 +1,116 @@
+# server/app/auth/local_cache.py
+
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple, Dict, Any, Set
+
+LOCAL_MAX = int(os.environ.get('AUTH_LOCAL_CACHE_SIZE', '5000'))
+LOCAL_TTL = int(os.environ.get('AUTH_LOCAL_CACHE_TTL', '30'))
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()[:20]
+
+
+class AuthCache:
+    """
+    Per-worker LRU of token -> authenticated user, shared by gthread threads.
+
+    Every operation is O(1) under one lock: OrderedDict keeps recency,
+    and a uid -> keys index lets a user's entries be dropped without a scan.
+    An entry never outlives the token's own exp claim.
+    """
+
+    def __init__(self, max_size: int = LOCAL_MAX, ttl: int = LOCAL_TTL):
+        self._max = max_size
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, Tuple[Dict[str, Any], str, float]]' = OrderedDict()
+        self._by_user: Dict[str, Set[str]] = {}
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'invalidations': 0}
+
+    def get(self, token: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        key = token_key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None, None
+            if entry[2] <= now:
+                self._remove(key)
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return None, None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[0], entry[1]
+
+    def set(self, token: str, user: Dict[str, Any], source: str, exp: Optional[float] = None):
+        now = time.time()
+        expires_at = now + self._ttl
+        if exp:
+            expires_at = min(expires_at, exp)
+        if expires_at <= now:
+            return
+
+        key = token_key(token)
+        uid = user.get('id') or user.get('uid')
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (user, source, expires_at)
+            if uid:
+                self._by_user.setdefault(uid, set()).add(key)
+            while len(self._entries) > self._max:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, token: str) -> bool:
+        key = token_key(token)
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            self._stats['invalidations'] += 1
+            return True
+
+    def invalidate_user(self, uid: str) -> int:
+        with self._lock:
+            keys = self._by_user.pop(uid, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            self._stats['invalidations'] += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'size': len(self._entries),
+                'max_size': self._max,
+                'ttl': self._ttl,
+                'hit_rate': round(self._stats['hits'] / lookups, 3) if lookups else 0,
+            }
+
+    def _remove(self, key: str):
+        user, _, _ = self._entries.pop(key)
+        uid = user.get('id') or user.get('uid')
+        keys = self._by_user.get(uid)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[uid]
+
+
+auth_cache = AuthCache()
@@ -1,15 +1,19 @@
 # server/app/auth/provisioning.py
 
-import time
+import threading
+from queue import Queue, Full, Empty
 from datetime import datetime
 from typing import Optional, Dict, Any
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 from app.extensions import db
 from app.models import User
 from app.auth.redis import (
-    get_cached_user_data,
     cache_user_data,
-    invalidate_user_cache
+    invalidate_user_cache,
+    claim_login_update,
 )
 import logging
 
@@ -17,149 +21,201 @@ logger = logging.getLogger(__name__)
 
 # Only update last_login_at every 5 minutes (not every request)
 LOGIN_UPDATE_INTERVAL = 300  # seconds
-_last_login_updates = {}  # {uid: timestamp}
+
+# ═══ Deferred writer — login timestamps and profile backfills off the request path ═══
+_write_queue = Queue(maxsize=2000)
+_writer_lock = threading.Lock()
+_writer_started = False
+
+_DEFERRED_UPDATE = text("""
+    UPDATE users SET
+        last_login_at = COALESCE(:last_login_at, last_login_at),
+        name = COALESCE(name, :name),
+        avatar_url = COALESCE(avatar_url, :avatar_url),
+        email = CASE
+            WHEN :email IS NULL THEN email
+            WHEN EXISTS (SELECT 1 FROM users u WHERE u.email = :email AND u.id <> users.id)
+                THEN email
+            ELSE :email
+        END
+    WHERE id = :uid
+""")
 
 
 def provision_user_cached(user_info: Dict[str, Any]) -> Optional[User]:
     """
-    Provision or update a user with Redis caching.
-    
+    Provision a user on an auth cache miss.
+
     Flow:
-    1. Check Redis for cached user
-    2. If cached, return without DB query (unless stale login timestamp)
-    3. If not cached, query/create in DB
-    4. Cache result in Redis
+    1. Load the row by uid (one query) — existing users return immediately,
+       with login/profile updates handed to the deferred writer
+    2. New users are created with INSERT ... ON CONFLICT DO NOTHING
+    3. If the email already belongs to another uid, merge that account
     """
     uid = user_info.get('uid')
     email = user_info.get('email')
-    
+
     if not uid:
         raise ValueError("Missing uid in user info")
-    
+
     if not email:
         email = f"{uid}@savlink.local"
-    
+
     try:
-        #  Try to get from DB and provision 
-        user = _provision_or_update(uid, email, user_info)
-        
+        user = db.session.get(User, uid)
+        if user:
+            schedule_login_update(user_info, user.to_dict())
+            return user
+
+        user = _create_or_merge(uid, email, user_info)
         if user:
-            # Cache the user data
             cache_user_data(uid, user.to_dict())
-        
         return user
-        
+
     except Exception as e:
         logger.error(f"Provisioning error for {uid}: {e}", exc_info=True)
         db.session.rollback()
-        
+
         # Try to return existing user even on error
         user = User.query.filter_by(id=uid).first()
         if user:
             return user
-        
+
         raise
 
 
-def _provision_or_update(uid: str, email: str, user_info: Dict[str, Any]) -> User:
-    """Core provisioning logic with optimized writes."""
-    
-    # Try finding by UID first (most common case)
-    user = User.query.filter_by(id=uid).first()
-    
-    if user:
-        #  Existing user - minimal update 
-        changed = False
-        
-        # Update name/avatar only if user doesn't have them
-        if user_info.get('name') and not user.name:
-            user.name = user_info['name']
-            changed = True
-        
-        if user_info.get('picture') and not user.avatar_url:
-            user.avatar_url = user_info['picture']
-            changed = True
-        
-        # Handle email change (rare)
-        if email != user.email:
-            existing = User.query.filter_by(email=email).first()
-            if not existing or existing.id == uid:
-                user.email = email
-                changed = True
-            else:
-                logger.warning(f"Email {email} belongs to user {existing.id}, keeping {user.email}")
-        
-        # Throttle last_login_at updates (every 5 min, not every request)
-        now = time.time()
-        last_update = _last_login_updates.get(uid, 0)
-        
-        if now - last_update > LOGIN_UPDATE_INTERVAL:
-            user.last_login_at = datetime.utcnow()
-            _last_login_updates[uid] = now
-            changed = True
-        
-        if changed:
-            db.session.commit()
-            invalidate_user_cache(uid)  # Invalidate stale cache
-        
-        return user
-    
-    #  Check by email (account merging) 
-    existing_email_user = User.query.filter_by(email=email).first()
-    
-    if existing_email_user:
-        logger.info(f"Merging user {email}: {existing_email_user.id} → {uid}")
-        existing_email_user.id = uid
-        existing_email_user.last_login_at = datetime.utcnow()
-        
-        if user_info.get('name') and not existing_email_user.name:
-            existing_email_user.name = user_info['name']
-        if user_info.get('picture') and not existing_email_user.avatar_url:
-            existing_email_user.avatar_url = user_info['picture']
-        
-        try:
-            db.session.commit()
-            _last_login_updates[uid] = time.time()
+def schedule_login_update(user_info: Dict[str, Any], user_data: Dict[str, Any]):
+    """
+    Fast-path companion: queue whatever the verified claims say should change
+    (throttled last_login_at, missing name/avatar, changed email) without
+    touching the database in the request.
+    """
+    uid = user_info.get('uid')
+    if not uid:
+        return
+
+    item = {'uid': uid, 'last_login_at': None, 'name': None, 'avatar_url': None, 'email': None}
+    if user_info.get('name') and not user_data.get('name'):
+        item['name'] = user_info['name']
+    if user_info.get('picture') and not user_data.get('avatar_url'):
+        item['avatar_url'] = user_info['picture']
+    if user_info.get('email') and user_info['email'] != user_data.get('email'):
+        item['email'] = user_info['email']
+
+    profile_changed = item['name'] or item['avatar_url'] or item['email']
+    if claim_login_update(uid, LOGIN_UPDATE_INTERVAL):
+        item['last_login_at'] = datetime.utcnow()
+    elif not profile_changed:
+        return
+
+    try:
+        _start_writer(current_app._get_current_object())
+        _write_queue.put_nowait(item)
+    except RuntimeError:
+        return
+    except Full:
+        logger.warning("Login update queue full — dropping update for %s", uid[:8])
+
+
+def _start_writer(app):
+    global _writer_started
+    if _writer_started:
+        return
+    with _writer_lock:
+        if _writer_started:
+            return
+        _writer_started = True
+
+    def _worker():
+        while True:
+            try:
+                batch = [_write_queue.get(timeout=2)]
+            except Empty:
+                continue
+            while len(batch) < 50:
+                try:
+                    batch.append(_write_queue.get_nowait())
+                except Empty:
+                    break
+            with app.app_context():
+                _flush_updates(batch)
+
+    threading.Thread(target=_worker, daemon=True, name='login-writer').start()
+    logger.info("[AUTH] Deferred login writer started")
+
+
+def _flush_updates(batch):
+    merged: Dict[str, Dict[str, Any]] = {}
+    for item in batch:
+        current = merged.setdefault(item['uid'], dict(item))
+        for k, v in item.items():
+            if v is not None:
+                current[k] = v
+
+    try:
+        db.session.execute(_DEFERRED_UPDATE, list(merged.values()))
+        db.session.commit()
+    except Exception as e:
+        logger.warning("Deferred login update failed: %s", e)
+        db.session.rollback()
+        return
+    finally:
+        db.session.remove()
+
+    for uid, item in merged.items():
+        if item['name'] or item['avatar_url'] or item['email']:
             invalidate_user_cache(uid)
-            return existing_email_user
-        except IntegrityError:
-            db.session.rollback()
-            # If merge fails, try finding by new UID
-            user = User.query.filter_by(id=uid).first()
-            if user:
-                return user
-            raise
-    
-    #  Create new user 
-    user = User(
+
+
+def _create_or_merge(uid: str, email: str, user_info: Dict[str, Any]) -> Optional[User]:
+    now = datetime.utcnow()
+    stmt = insert(User).values(
         id=uid,
         email=email,
         name=user_info.get('name'),
         avatar_url=user_info.get('picture'),
         auth_provider=user_info.get('auth_provider', 'password'),
-        created_at=datetime.utcnow(),
-        last_login_at=datetime.utcnow(),
-        emergency_enabled=False
-    )
-    
+        created_at=now,
+        last_login_at=now,
+        emergency_enabled=False,
+    ).on_conflict_do_nothing()
+    created = db.session.execute(stmt.returning(User.id)).scalar() is not None
+    db.session.commit()
+
+    user = db.session.get(User, uid)
+    if user:
+        if created:
+            claim_login_update(uid, LOGIN_UPDATE_INTERVAL)
+            logger.info(f"Created new user: {uid} ({email})")
+        else:
+            logger.info(f"User {uid} created by concurrent request, returning existing")
+        return user
+
+    #  Email belongs to another uid (account merging) 
+    existing_email_user = User.query.filter_by(email=email).first()
+    if not existing_email_user:
+        raise ValueError(f"Failed to create or find user {uid}")
+
+    logger.info(f"Merging user {email}: {existing_email_user.id} → {uid}")
+    existing_email_user.id = uid
+    existing_email_user.last_login_at = now
+
+    if user_info.get('name') and not existing_email_user.name:
+        existing_email_user.name = user_info['name']
+    if user_info.get('picture') and not existing_email_user.avatar_url:
+        existing_email_user.avatar_url = user_info['picture']
+
     try:
-        db.session.add(user)
         db.session.commit()
-        _last_login_updates[uid] = time.time()
-        logger.info(f"Created new user: {uid} ({email})")
-        return user
+        invalidate_user_cache(uid)
+        return existing_email_user
     except IntegrityError:
         db.session.rollback()
-        # Race condition: user was created by another request
-        user = User.query.filter_by(id=uid).first()
-        if not user:
-            user = User.query.filter_by(email=email).first()
-        
+        # If merge fails, try finding by new UID
+        user = db.session.get(User, uid)
         if user:
-            logger.info(f"User {uid} created by concurrent request, returning existing")
             return user
-        
-        raise ValueError(f"Failed to create or find user {uid}")
+        raise
 
 
 def update_user_profile(user_id: str, updates: Dict[str, Any]) -> Optional[User]:
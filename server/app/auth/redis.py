@@ -5,6 +5,7 @@ import json
 import time
 from typing import Optional, Dict, Any, Tuple
 from app.extensions import redis_client
+from app.middleware.rate_limit import limiter
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,6 +17,8 @@ USER_CACHE       = f"{PREFIX}:user"         # User profile data
 SESSION_CACHE    = f"{PREFIX}:session"      # Emergency sessions
 RATE_LIMIT       = f"{PREFIX}:rate"         # Rate limiting
 PROVISION_LOCK   = f"{PREFIX}:provision"    # Provisioning locks
+REVOCATION       = f"{PREFIX}:revoked"      # tokens_valid_after per uid
+LOGIN_THROTTLE   = f"{PREFIX}:login"        # last_login_at write throttle
 
 #  TTLs (seconds) 
 TOKEN_CACHE_TTL     = 300      # 5 minutes (tokens change hourly)
@@ -56,10 +59,18 @@ def cache_token_verification(token: str, decoded_data: Dict[str, Any]) -> bool:
             'picture': decoded_data.get('picture'),
             'email_verified': decoded_data.get('email_verified', False),
             'provider': decoded_data.get('firebase', {}).get('sign_in_provider', 'password'),
+            'exp': decoded_data.get('exp'),
             'cached_at': time.time()
         }
-        
-        return redis_client.setex(key, TOKEN_CACHE_TTL, json.dumps(cache_data))
+
+        # Never serve a verification past the token's own expiry
+        ttl = TOKEN_CACHE_TTL
+        if cache_data['exp']:
+            ttl = min(ttl, int(cache_data['exp'] - time.time()))
+        if ttl <= 0:
+            return False
+
+        return redis_client.setex(key, ttl, json.dumps(cache_data))
     except Exception as e:
         logger.warning(f"Failed to cache token verification: {e}")
         return False
@@ -97,6 +108,39 @@ def invalidate_token_cache(token: str) -> bool:
     return redis_client.delete(key) > 0
 
 
+#  Revocation State 
+_local_valid_after: Dict[str, Tuple[float, float]] = {}
+
+
+def get_tokens_valid_after(uid: str) -> Optional[float]:
+    """
+    Cached tokens_valid_after (epoch seconds) for a uid, -1 if disabled.
+    None means unknown — the caller must ask the Admin SDK.
+    """
+    if redis_client.available:
+        value = redis_client.get(f"{REVOCATION}:{uid}")
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+        return None
+
+    entry = _local_valid_after.get(uid)
+    if entry and entry[1] > time.time():
+        return entry[0]
+    return None
+
+
+def set_tokens_valid_after(uid: str, valid_after: float, ttl: int) -> bool:
+    if redis_client.available:
+        return redis_client.setex(f"{REVOCATION}:{uid}", ttl, str(valid_after))
+    if len(_local_valid_after) > 10000:
+        _local_valid_after.clear()
+    _local_valid_after[uid] = (valid_after, time.time() + ttl)
+    return True
+
+
 #  User Data Cache 
 def cache_user_data(user_id: str, user_data: Dict[str, Any]) -> bool:
     """
@@ -150,6 +194,9 @@ def get_cached_user_data(user_id: str) -> Optional[Dict[str, Any]]:
 
 def invalidate_user_cache(user_id: str) -> bool:
     """Invalidate user data cache (call on user update)."""
+    from app.auth.local_cache import auth_cache
+    auth_cache.invalidate_user(user_id)
+
     if not redis_client.available:
         return False
 
@@ -165,33 +212,15 @@ def check_rate_limit(
     window: int = RATE_WINDOW
 ) -> Tuple[bool, int, int]:
     """
-    Check rate limit for an identifier.
+    Check rate limit for an identifier via the shared rate-limit engine.
     Returns: (is_allowed, remaining, retry_after_seconds)
     """
-    if not redis_client.available:
-        return True, limit, 0
-
     try:
-        key = f"{RATE_LIMIT}:{category}:{identifier}"
-        
-        count = redis_client.incr(key)
-        
-        if count == 1:
-            redis_client.expire(key, window)
-        
-        if count is None:
-            return True, limit, 0
-        
-        remaining = max(0, limit - count)
-        is_allowed = count <= limit
-        
-        if not is_allowed:
-            ttl = redis_client.ttl(key)
-            retry_after = max(0, ttl if ttl > 0 else window)
-            logger.warning(f"Rate limit exceeded: {category}/{identifier} ({count}/{limit})")
-            return False, 0, retry_after
-        
-        return True, remaining, 0
+        result = limiter.check(f"{RATE_LIMIT}:{category}:{identifier}", limit, window)
+        if not result.allowed:
+            logger.warning(f"Rate limit exceeded: {category}/{identifier} ({limit}/{window}s)")
+            return False, 0, max(1, int(result.retry_after + 0.999))
+        return True, result.remaining, 0
     except Exception as e:
         logger.warning(f"Rate limit check failed: {e}")
         return True, limit, 0
@@ -230,18 +259,25 @@ def check_auth_rate_limit(ip_address: str) -> Tuple[bool, int]:
 
 
 #  Emergency Sessions 
-def create_emergency_session(session_id: str, user_id: str, ttl: int = SESSION_TTL) -> bool:
-    """Store emergency session in Redis."""
+def create_emergency_session(session_id: str, user_id: str, ttl: int = SESSION_TTL,
+                             user: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    Store emergency session in Redis. The serialized user is embedded so
+    verifying the session needs no database query.
+    """
     if not redis_client.available:
         logger.error("Cannot create emergency session - Redis unavailable")
         return False
 
     key = f"{SESSION_CACHE}:{session_id}"
+    now = time.time()
     value = json.dumps({
         'user_id': user_id,
         'auth_source': 'emergency',
-        'created_at': time.time()
-    })
+        'user': user,
+        'created_at': now,
+        'expires_at': now + ttl,
+    }, default=str)
     
     result = redis_client.setex(key, ttl, value)
     return result is not False
@@ -273,6 +309,30 @@ def revoke_emergency_session(session_id: str) -> bool:
     return redis_client.delete(key) > 0
 
 
+#  Login Write Throttle 
+_local_login_claims: Dict[str, float] = {}
+
+
+def claim_login_update(uid: str, interval: int) -> bool:
+    """
+    True if this caller should write last_login_at for uid now. Shared
+    across workers through SET NX; per-process while Redis is down.
+    """
+    if redis_client.available:
+        if redis_client.set(f"{LOGIN_THROTTLE}:{uid}", "1", nx=True, ex=interval):
+            return True
+        if redis_client.available:  # NX refused: another worker already wrote it
+            return False
+
+    now = time.time()
+    if _local_login_claims.get(uid, 0) > now:
+        return False
+    if len(_local_login_claims) > 10000:
+        _local_login_claims.clear()
+    _local_login_claims[uid] = now + interval
+    return True
+
+
 #  Provisioning Lock 
 def acquire_provision_lock(user_id: str) -> bool:
     """
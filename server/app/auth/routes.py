@@ -1,5 +1,6 @@
 # server/app/auth/routes.py
 
+import os
 import time
 from flask import g, request
 from app.auth import auth_bp
@@ -155,7 +156,9 @@ def auth_health():
             'service': 'auth',
             'status': 'healthy',
             'timestamp': time.time(),
-            'firebase': 'configured' if _firebase_app else 'not_configured',
+            'firebase': ('initialized' if _firebase_app
+                         else 'configured' if os.environ.get('FIREBASE_CONFIG_JSON')
+                         else 'not_configured'),
             'redis': is_redis_available(),
         }
         
@@ -170,13 +173,5 @@ def auth_health():
 
 
 def _get_client_ip() -> str:
-    """Extract real client IP."""
-    forwarded = request.headers.get('X-Forwarded-For')
-    if forwarded:
-        return forwarded.split(',')[0].strip()
-    
-    real_ip = request.headers.get('X-Real-IP')
-    if real_ip:
-        return real_ip.strip()
-    
+    """Real client IP (ProxyFix resolves X-Forwarded-For up to TRUSTED_PROXIES hops)."""
     return request.remote_addr or '0.0.0.0'
\ No newline at end of file
@@ -1,6 +1,5 @@
 # server/app/auth/sessions.py
-from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict, Any, Tuple
 from app.models import User
 from app.auth.redis import (
     create_emergency_session as redis_create_session,
@@ -8,25 +7,36 @@ from app.auth.redis import (
     revoke_emergency_session as redis_revoke_session,
     is_redis_available
 )
+from app.auth.local_cache import auth_cache
 from app.utils.crypto import generate_secure_token
 from flask import current_app
 import logging
 
 logger = logging.getLogger(__name__)
 
-def create_emergency_session(user_id: str) -> Optional[str]:
+# Emergency session tokens carry this prefix so require_auth can route them
+# straight to the session store instead of trying Firebase first.
+EMERGENCY_PREFIX = 'emg_'
+
+
+def is_emergency_token(token: str) -> bool:
+    return token.startswith(EMERGENCY_PREFIX)
+
+
+def create_emergency_session(user: User) -> Optional[str]:
     """Create emergency session in Redis"""
     if not is_redis_available():
         logger.error("Cannot create emergency session - Redis unavailable")
         return None
     
-    token = generate_secure_token()
+    token = EMERGENCY_PREFIX + generate_secure_token()
     ttl = int(current_app.config['EMERGENCY_SESSION_TTL'].total_seconds())
     
     success = redis_create_session(
         session_id=token,
-        user_id=user_id,
-        ttl=ttl
+        user_id=user.id,
+        ttl=ttl,
+        user=user.to_dict()
     )
     
     if success:
@@ -34,38 +44,40 @@ def create_emergency_session(user_id: str) -> Optional[str]:
     
     return None
 
-def verify_emergency_session(token: str) -> Optional[User]:
-    """Verify emergency session from Redis"""
+def verify_emergency_session(token: str) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+    """
+    Verify emergency session from Redis.
+    Returns (user_dict, expires_at) or (None, None).
+    """
     if not is_redis_available():
         logger.warning("Cannot verify emergency session - Redis unavailable")
-        return None
+        return None, None
     
     session_data = redis_get_session(token)
     
     if not session_data:
-        return None
+        return None, None
     
     user_id = session_data.get('user_id')
     auth_source = session_data.get('auth_source')
     
     if not user_id or auth_source != 'emergency':
         logger.warning(f"Invalid session data for token")
-        return None
-    
-    user = User.query.filter_by(id=user_id).first()
+        return None, None
     
-    if user:
-        # Update last login
-        user.last_login_at = datetime.utcnow()
-        from app.extensions import db
-        db.session.commit()
+    user = session_data.get('user')
+    if not user:
+        # Sessions created before the user was embedded
+        db_user = User.query.filter_by(id=user_id).first()
+        user = db_user.to_dict() if db_user else None
     
-    return user
+    return user, session_data.get('expires_at')
 
 def revoke_emergency_session(token: str):
     """Revoke emergency session from Redis"""
+    auth_cache.invalidate(token)
     if not is_redis_available():
         logger.warning("Cannot revoke session - Redis unavailable")
         return
     
-    redis_revoke_session(token)
\ No newline at end of file
+    redis_revoke_session(token)
@@ -0,0 +1,196 @@
+# server/app/auth/tokens.py
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+from typing import Dict, Any, Optional
+
+import jwt
+import requests
+from cryptography.x509 import load_pem_x509_certificate
+
+logger = logging.getLogger(__name__)
+
+CERTS_URL = (
+    'https://www.googleapis.com/robot/v1/metadata/x509/'
+    'securetoken@system.gserviceaccount.com'
+)
+ISSUER_PREFIX = 'https://securetoken.google.com/'
+
+LOCAL_VERIFY = os.environ.get('FIREBASE_LOCAL_VERIFY', 'true').lower() == 'true'
+CLOCK_SKEW = 5             # seconds of leeway on exp / iat / auth_time
+DEFAULT_MAX_AGE = 3600     # used when the certs response has no max-age
+MIN_REFETCH = 60           # unknown kid triggers at most one refetch per minute
+FETCH_TIMEOUT = 5
+FETCH_BACKOFF = 30          # after a failed fetch, serve what we have this long before retrying
+
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+class TokenError(Exception):
+    pass
+
+
+class ExpiredTokenError(TokenError):
+    pass
+
+
+class InvalidTokenError(TokenError):
+    pass
+
+
+class KeysUnavailableError(TokenError):
+    """Signing keys could not be loaded; caller should use the SDK instead."""
+
+
+#  Signing keys
+
+class PublicKeyCache:
+    """Google's securetoken signing keys by kid, refreshed per Cache-Control."""
+
+    def __init__(self, url: str = CERTS_URL):
+        self._url = url
+        self._keys: Dict[str, Any] = {}
+        self._expires_at = 0.0
+        self._last_fetch = 0.0
+        self._retry_at = 0.0
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def get(self, kid: str):
+        now = time.time()
+        key = self._keys.get(kid)
+        if key is not None and now < self._expires_at:
+            return key
+
+        with self._lock:
+            key = self._keys.get(kid)
+            stale = time.time() >= self._expires_at
+            if key is not None and not stale:
+                return key
+            # Rotation publishes new kids before use, so an unknown kid on
+            # fresh keys is most likely forged — don't refetch for each one.
+            if stale or time.time() - self._last_fetch >= MIN_REFETCH:
+                self._fetch()
+            return self._keys.get(kid)
+
+    def backing_off(self) -> bool:
+        return time.time() < self._retry_at
+
+    def expires_in(self) -> float:
+        return self._expires_at - time.time()
+
+    def key_count(self) -> int:
+        return len(self._keys)
+
+    def refresh(self):
+        """Refetches ahead of expiry, off the request path (health sampler)."""
+        with self._lock:
+            if not self.backing_off():
+                self._fetch()
+
+    def load(self, certs: Dict[str, str], max_age: float = DEFAULT_MAX_AGE):
+        """Installs kid -> PEM certificate mapping (also used for offline fixtures)."""
+        keys = {
+            kid: load_pem_x509_certificate(pem.encode('utf-8')).public_key()
+            for kid, pem in certs.items()
+        }
+        self._keys = keys
+        self._expires_at = time.time() + max_age
+        self._last_fetch = time.time()
+
+    def _fetch(self):
+        # Called under the lock: while the endpoint is failing, one attempt
+        # per FETCH_BACKOFF instead of a blocking request per verification
+        if self.backing_off():
+            if not self._keys:
+                raise KeysUnavailableError(self.last_error or 'signing certs unavailable')
+            return
+        self._last_fetch = time.time()
+        try:
+            resp = requests.get(self._url, timeout=FETCH_TIMEOUT)
+            resp.raise_for_status()
+            certs = resp.json()
+        except (requests.RequestException, ValueError) as e:
+            logger.warning("[AUTH] Failed to fetch signing certs: %s", e)
+            self.last_error = str(e)[:200]
+            self._retry_at = time.time() + FETCH_BACKOFF
+            if not self._keys:
+                raise KeysUnavailableError(str(e))
+            # Keep serving the stale keys until the next attempt
+            self._expires_at = self._retry_at
+            return
+        self.last_error = None
+
+        m = _MAX_AGE_RE.search(resp.headers.get('Cache-Control', ''))
+        self.load(certs, int(m.group(1)) if m else DEFAULT_MAX_AGE)
+        logger.info("[AUTH] Loaded %d signing certs (max-age %ds)",
+                    len(certs), self._expires_at - time.time())
+
+
+key_cache = PublicKeyCache()
+
+
+#  Verification
+
+def project_id() -> Optional[str]:
+    pid = os.environ.get('FIREBASE_PROJECT_ID')
+    if pid:
+        return pid
+    try:
+        return json.loads(os.environ.get('FIREBASE_CONFIG_JSON') or '{}').get('project_id')
+    except ValueError:
+        return None
+
+
+def verify_token_locally(token: str, project: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Verifies a Firebase ID token in-process: RS256 signature against the
+    cached Google certs, then aud / iss / exp / iat / auth_time / sub.
+    Returns the decoded claims with 'uid' set, like the Admin SDK.
+    """
+    project = project or project_id()
+    if not project:
+        raise KeysUnavailableError('Firebase project id not configured')
+
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.InvalidTokenError as e:
+        raise InvalidTokenError(f'Malformed token: {e}')
+    if header.get('alg') != 'RS256':
+        raise InvalidTokenError('Unexpected signing algorithm')
+    kid = header.get('kid')
+    if not kid:
+        raise InvalidTokenError('Token has no kid')
+
+    key = key_cache.get(kid)
+    if key is None:
+        raise InvalidTokenError('Token signed with an unknown key')
+
+    try:
+        claims = jwt.decode(
+            token, key, algorithms=['RS256'],
+            audience=project, issuer=ISSUER_PREFIX + project,
+            leeway=CLOCK_SKEW,
+            options={'require': ['exp', 'iat', 'aud', 'iss', 'sub']},
+        )
+    except jwt.ExpiredSignatureError:
+        raise ExpiredTokenError('Token expired')
+    except jwt.InvalidTokenError as e:
+        raise InvalidTokenError(str(e))
+
+    now = time.time()
+    sub = claims.get('sub')
+    if not isinstance(sub, str) or not sub or len(sub) > 128:
+        raise InvalidTokenError('Invalid sub claim')
+    auth_time = claims.get('auth_time')
+    if not isinstance(auth_time, (int, float)) or auth_time > now + CLOCK_SKEW:
+        raise InvalidTokenError('Invalid auth_time claim')
+    if claims['iat'] > now + CLOCK_SKEW:
+        raise InvalidTokenError('Token issued in the future')
+
+    claims['uid'] = sub
+    return claims
@@ -1,5 +1,5 @@
 #server/app/cache/__init__.py
 
 from .redis_layer import cache
-from .invalidation import on_link_change, on_folder_change, on_tag_change, on_user_change
+from .invalidation import on_link_change, on_link_edit, on_folder_change, on_tag_change, on_user_change
 from .warmup import warm_user_cache
\ No newline at end of file
@@ -1,12 +1,30 @@
 # server/app/cache/invalidation.py
 
 import logging
+from typing import Optional, List
+from app.extensions import redis_client
 from app.cache.redis_layer import cache
 from app.cache import keys as K
 
 logger = logging.getLogger(__name__)
 
 
+def generation(user_id: str) -> Optional[int]:
+    """
+    The user's cache generation (0 before any change), or None without
+    Redis. Read from Redis on every call: an L1 copy could lag a write
+    made on another worker.
+    """
+    if not redis_client.available:
+        return None
+    raw = redis_client.get(K.USER_GEN.format(user_id))
+    return int(raw) if raw else 0
+
+
+def _bump(user_id: str):
+    cache.incr_counter(K.USER_GEN.format(user_id), ttl=K.TTL_GEN)
+
+
 def on_link_change(user_id: str, link_id: int = None):
     """Call after any link create / update / delete / archive / restore / move."""
     targets = list(K.all_dashboard_keys(user_id)) + [
@@ -14,8 +32,47 @@ def on_link_change(user_id: str, link_id: int = None):
         K.USER_STATS.format(user_id),
     ]
     if link_id:
-        targets.append(K.LINK_DETAIL.format(link_id))
+        targets += [K.LINK_DETAIL.format(link_id), K.LINK_FRAGMENT.format(link_id)]
     cache.drop_many(targets)
+    _bump(user_id)
+
+
+def on_link_edit(user_id: str, link):
+    """
+    Call after an edit that can't change which lists a link is in or the
+    counts around them (title, notes, URL, slug, expiry, password). The
+    edit still bumps updated_at, which orders recent, starred and quick
+    access (and gates recent), and it logs activity that home shows, so
+    those payloads go too. Pinned (ordered by pinned_at), stats and tag
+    counts stay: they hold refs to the link's fragment rather than a copy,
+    which is superseded at the new version rather than deleted.
+    """
+    from app.dashboard import fragments
+    cache.drop_many([
+        K.DASH_HOME.format(user_id),
+        K.DASH_RECENT.format(user_id),
+        K.DASH_STARRED.format(user_id),
+        K.DASH_QUICK.format(user_id),
+        K.DASH_OVERVIEW.format(user_id),
+        K.DASH_ACTIVITY.format(user_id),
+        K.LINK_DETAIL.format(link.id),
+    ])
+    fragments.supersede(link)
+    _bump(user_id)
+
+
+def on_related_change(link_ids: List[int], user_id: Optional[str] = None):
+    """
+    Call when something a link's fragment shows changes without touching
+    the link row, so its version stays the same: a folder or tag rename,
+    or a page metadata refresh (shared by every user's links to the page).
+    """
+    from app.dashboard import fragments
+    if link_ids:
+        cache.drop_many([K.LINK_DETAIL.format(i) for i in link_ids])
+        fragments.invalidate(link_ids)
+    if user_id:
+        _bump(user_id)
 
 
 def on_folder_change(user_id: str):
@@ -28,6 +85,7 @@ def on_folder_change(user_id: str):
         K.DASH_OVERVIEW.format(user_id),
         K.USER_STATS.format(user_id),
     )
+    _bump(user_id)
 
 
 def on_tag_change(user_id: str):
@@ -37,16 +95,21 @@ def on_tag_change(user_id: str):
         K.DASH_STATS.format(user_id),
         K.USER_STATS.format(user_id),
     )
+    _bump(user_id)
 
 
 def on_user_change(user_id: str):
+    from app.auth.redis import invalidate_user_cache
+    invalidate_user_cache(user_id)
     cache.drop(
         K.USER_PREFS.format(user_id),
         K.USER_STATS.format(user_id),
         K.USER_PROFILE.format(user_id),
     )
+    _bump(user_id)
 
 
-def on_bulk_change(user_id: str):
-    """Nuclear option — wipe every key for a user."""
-    cache.drop_many(K.all_user_keys(user_id))
\ No newline at end of file
+def on_bulk_change(user_id: str, link_ids: Optional[List[int]] = None):
+    """Nuclear option — wipe every key for a user (and the fragments of link_ids)."""
+    cache.drop_many(K.all_user_keys(user_id) + [K.LINK_FRAGMENT.format(i) for i in link_ids or ()])
+    _bump(user_id)
\ No newline at end of file
@@ -13,6 +13,8 @@ DASH_ACTIVITY = "sl:dash:{}:activity"
 # Links
 LINK_DETAIL   = "sl:link:{}"              # by link_id
 LINK_VIEW     = "sl:links:{}:{}:{}:{}"    # user:view:sort:cursor
+LINK_FRAGMENT = "sl:frag:link:{}"         # serialized link, by link_id (app.dashboard.fragments)
+LINK_FRAGMENT_BARRIER = "sl:frag:link:{}:b"  # when related data last changed
 
 # Folders
 FOLDER_TREE   = "sl:folders:{}:tree"
@@ -26,6 +28,7 @@ TAG_COUNTS    = "sl:tags:{}:counts"
 USER_PREFS    = "sl:prefs:{}"
 USER_STATS    = "sl:ustats:{}"
 USER_PROFILE  = "sl:uprofile:{}"
+USER_GEN      = "sl:gen:{}"                # bumped by every invalidation; ETags
 
 # TTLs (seconds)
 TTL_DASHBOARD = 60
@@ -35,7 +38,9 @@ TTL_FOLDERS   = 300
 TTL_TAGS      = 300
 TTL_USER      = 600
 TTL_LINK      = 300
+TTL_FRAGMENT  = 120     # bounds staleness of click_count / relative_time, which don't bump updated_at
 TTL_ACTIVITY  = 45
+TTL_GEN       = 86400 * 7
 
 
 def all_dashboard_keys(user_id: str) -> list:
@@ -1,16 +1,18 @@
 # server/app/cache/redis_layer.py
 
-import json
 import time
 import logging
 import hashlib
 from typing import Any, Optional, List
 
 from app.extensions import redis_client
+from app.json_provider import dumps, loads
+from app.metrics import observe_cache
 
 logger = logging.getLogger(__name__)
 
 _local_cache: dict = {}
+_local_raw: dict = {}       # encoded form, for get_raw
 _local_ttls: dict = {}
 LOCAL_MAX = 200
 LOCAL_TTL = 3
@@ -25,32 +27,61 @@ class cache:
     def get(key: str) -> Optional[Any]:
         now = time.time()
         if key in _local_cache and _local_ttls.get(key, 0) > now:
+            observe_cache(key, 'l1_hit')
             return _local_cache[key]
 
         if not redis_client.available:
+            observe_cache(key, 'miss')
             return None
         try:
             raw = redis_client.get(key)
             if raw is None:
+                observe_cache(key, 'miss')
                 return None
-            data = json.loads(raw)
-            _l1_set(key, data)
+            data = loads(raw)
+            _l1_set(key, data, raw.encode())
+            observe_cache(key, 'l2_hit')
             return data
-        except (json.JSONDecodeError, TypeError):
+        except (ValueError, TypeError):
             return None
         except Exception as e:
             logger.warning("cache.get(%s) error: %s", key, e)
             return None
 
+    @staticmethod
+    def get_raw(key: str) -> Optional[bytes]:
+        """
+        The cached JSON as stored, never decoded: for responses that pass
+        it straight through (app.json_provider.Encoded).
+        """
+        now = time.time()
+        if key in _local_raw and _local_ttls.get(key, 0) > now:
+            observe_cache(key, 'l1_hit')
+            return _local_raw[key]
+
+        if not redis_client.available:
+            observe_cache(key, 'miss')
+            return None
+        raw = redis_client.get(key)
+        if raw is None:
+            observe_cache(key, 'miss')
+            return None
+        raw = raw.encode()
+        _l1_trim()
+        _local_cache.pop(key, None)   # decoded lazily by get() if asked
+        _local_raw[key] = raw
+        _local_ttls[key] = now + LOCAL_TTL
+        observe_cache(key, 'l2_hit')
+        return raw
+
     @staticmethod
     def put(key: str, data: Any, ttl: int = 300) -> bool:
-        _l1_set(key, data)
+        raw = dumps(data)
+        _l1_set(key, data, raw)
         if not redis_client.available:
             return False
         try:
-            return redis_client.setex(
-                key, ttl, json.dumps(data, default=str)
-            ) is not False
+            return redis_client.setex(key, ttl, raw) is not False
         except Exception as e:
             logger.warning("cache.put(%s) error: %s", key, e)
             return False
@@ -59,6 +90,7 @@ class cache:
     def drop(*keys: str):
         for k in keys:
             _local_cache.pop(k, None)
+            _local_raw.pop(k, None)
             _local_ttls.pop(k, None)
         if not redis_client.available:
             return
@@ -143,11 +175,20 @@ class cache:
         return redis_client.available
 
 
-def _l1_set(key: str, data: Any):
-    if len(_local_cache) > LOCAL_MAX:
+def _l1_trim():
+    if len(_local_ttls) > LOCAL_MAX:
         oldest = sorted(_local_ttls, key=_local_ttls.get)[:LOCAL_MAX // 4]
         for k in oldest:
             _local_cache.pop(k, None)
+            _local_raw.pop(k, None)
             _local_ttls.pop(k, None)
+
+
+def _l1_set(key: str, data: Any, raw: Optional[bytes] = None):
+    _l1_trim()
     _local_cache[key] = data
+    if raw is not None:
+        _local_raw[key] = raw
+    else:
+        _local_raw.pop(key, None)
     _local_ttls[key] = time.time() + LOCAL_TTL
\ No newline at end of file
@@ -0,0 +1,44 @@
+# server/app/cli.py
+
+import click
+
+
+def register_commands(app):
+    @app.cli.command('metadata-refresh')
+    @click.option('--once', is_flag=True, help='Run a single pass and exit.')
+    @click.option('--budget', type=int, default=None, help='Max fetches per minute.')
+    def metadata_refresh(once, budget):
+        """Refresh stale page metadata (standalone worker)."""
+        from app.metadata.refresher import refresher, refresh_due, BUDGET_PER_MINUTE
+
+        budget = budget or BUDGET_PER_MINUTE
+        if once:
+            click.echo(refresh_due(budget))
+            return
+        click.echo(f"Metadata refresher running at {budget} fetches/min")
+        try:
+            refresher.run_forever(app, budget)
+        except KeyboardInterrupt:
+            refresher.stop()
+
+    @app.cli.command('migrate')
+    @click.option('--dry-run', is_flag=True, help='List pending migrations without applying them.')
+    def migrate_schema(dry_run):
+        """Create tables and apply pending migrations (run once per deploy)."""
+        from app.database import db_manager
+
+        if dry_run:
+            from app.migrations import run_migrations
+            click.echo(run_migrations(dry_run=True))
+            return
+        result = db_manager.initialize_with_retry(migrate=True)
+        if not result['success']:
+            raise click.ClickException(result.get('error', 'Database unavailable'))
+        if 'message' in result:
+            click.echo(result['message'])  # already migrated during app startup
+            return
+        migrations = result.get('migrations') or {}
+        if migrations.get('status') == 'error':
+            raise click.ClickException(f"Migrations failed: {migrations.get('error')}")
+        click.echo(f"{result.get('tables_count', 0)} tables, "
+                   f"{migrations.get('migrations_run', 0)} migration(s) applied")
@@ -29,6 +29,28 @@ def _build_cors():
     return list(dict.fromkeys(d for d in defaults + extra if d))
 
 
+def _build_rate_limit_policies():
+    """
+    Rate-limit policies as 'limit/window_seconds'. Keys are limiter policy
+    names or endpoint names (e.g. 'folders.create') for per-route overrides.
+    RATE_LIMIT_POLICIES (JSON object) is merged over the defaults.
+    """
+    policies = {
+        'api': '120/60',
+        'write': '30/60',
+        'auth': '10/60',
+        'search': '30/60',
+        'metadata': '20/60',
+    }
+    raw = os.environ.get('RATE_LIMIT_POLICIES')
+    if raw:
+        try:
+            policies.update(json.loads(raw))
+        except (ValueError, TypeError) as e:
+            logger.error("Invalid RATE_LIMIT_POLICIES JSON: %s", e)
+    return policies
+
+
 def _parse_db_config(uri: str) -> dict:
     if not uri:
         return {'provider': 'none', 'pooler': False, 'pool_mode': 'session', 'port': 5432}
@@ -53,14 +75,23 @@ def _parse_db_config(uri: str) -> dict:
     }
 
 
+def _connection_budget(db_info: dict) -> int:
+    """Connections all workers together may open (MAX_DB_CONNECTIONS)."""
+    if db_info['pooler']:
+        default = '20' if db_info['pool_mode'] == 'transaction' else '15'
+    else:
+        default = '60'
+    return int(os.environ.get('MAX_DB_CONNECTIONS', default))
+
+
 def _build_engine_options(db_uri: str, is_prod: bool) -> dict:
     db_info = _parse_db_config(db_uri)
+    max_conns = _connection_budget(db_info)
     worker_count = int(os.environ.get('WEB_CONCURRENCY', '2'))
     thread_count = int(os.environ.get('GUNICORN_THREADS', '2'))
     concurrent_slots = worker_count * thread_count
 
     if db_info['pooler'] and db_info['pool_mode'] == 'transaction':
-        max_conns = int(os.environ.get('MAX_DB_CONNECTIONS', '20'))
         pool_per_worker = max(2, min(5, max_conns // worker_count))
         overflow = max(2, pool_per_worker)
 
@@ -86,7 +117,6 @@ def _build_engine_options(db_uri: str, is_prod: bool) -> dict:
         }
 
     elif db_info['pooler'] and db_info['pool_mode'] == 'session':
-        max_conns = int(os.environ.get('MAX_DB_CONNECTIONS', '15'))
         pool_per_worker = max(1, min(3, max_conns // concurrent_slots))
         overflow = max(1, min(2, pool_per_worker))
 
@@ -114,7 +144,6 @@ def _build_engine_options(db_uri: str, is_prod: bool) -> dict:
         }
 
     else:
-        max_conns = int(os.environ.get('MAX_DB_CONNECTIONS', '60'))
         pool_per_worker = max(2, max_conns // worker_count)
         overflow = max(3, pool_per_worker // 2)
 
@@ -143,6 +172,20 @@ def _build_engine_options(db_uri: str, is_prod: bool) -> dict:
         }
 
 
+def _split_async_pool(options: dict, share: float) -> dict:
+    """
+    Carves the asyncpg engine's pool (ASGI mode) out of the sync engine's
+    per-worker sizing in place, so the two together open no more than the
+    worker's share of MAX_DB_CONNECTIONS. Returns the async pool's sizing.
+    """
+    size, overflow = options.get('pool_size', 5), options.get('max_overflow', 10)
+    async_size = max(1, min(size - 1, round(size * share)))
+    async_overflow = min(overflow, round(overflow * share))
+    options['pool_size'] = max(1, size - async_size)     # 0 would mean unbounded
+    options['max_overflow'] = overflow - async_overflow
+    return {'pool_size': async_size, 'max_overflow': async_overflow}
+
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY')
     if not SECRET_KEY:
@@ -163,11 +206,34 @@ class Config:
     SQLALCHEMY_ENGINE_OPTIONS = _build_engine_options(
         SQLALCHEMY_DATABASE_URI, _is_prod
     )
+    # Adaptive pool sizing (app.pool): overflow follows observed wait and
+    # utilization, with every worker's connections sharing one budget
+    DB_POOL_ADAPTIVE = os.environ.get('DB_POOL_ADAPTIVE', 'false').lower() == 'true'
+    DB_POOL_BUDGET = int(os.environ.get('DB_POOL_BUDGET', _connection_budget(_db_info)))
+    # SERVER_MODE=asgi (start.sh, asgi.py): the async routes' asyncpg engine
+    # shares each worker's connections with the mounted Flask app's pool
+    ASGI_MODE = os.environ.get('SERVER_MODE') == 'asgi'
+    ASYNC_ENGINE_POOL = None
+    if ASGI_MODE:
+        ASYNC_ENGINE_POOL = _split_async_pool(
+            SQLALCHEMY_ENGINE_OPTIONS, float(os.environ.get('ASGI_DB_POOL_SHARE', '0.5')),
+        )
+        DB_POOL_BUDGET -= int(os.environ.get('WEB_CONCURRENCY', '2')) * sum(ASYNC_ENGINE_POOL.values())
+
+    # Optional read replicas for @read_replica views (comma-separated URLs)
+    DATABASE_REPLICA_URLS = [
+        u.strip().replace('postgres://', 'postgresql://', 1)
+        for u in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if u.strip()
+    ]
+    REPLICA_MAX_LAG = float(os.environ.get('REPLICA_MAX_LAG', '5'))
+    READ_YOUR_WRITES_WINDOW = int(os.environ.get('READ_YOUR_WRITES_WINDOW', '5'))
 
     FIREBASE_CONFIG_JSON = os.environ.get('FIREBASE_CONFIG_JSON')
     BASE_URL = os.environ.get('BASE_URL')
     API_URL = os.environ.get('API_URL', '')
     REDIS_URL = os.environ.get('REDIS_URL')
+    # Reverse proxies in front of the app; their X-Forwarded-For hops are trusted
+    TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', '1'))
 
     BREVO_API_KEY = os.environ.get('BREVO_API_KEY')
     EMAIL_FROM_ADDRESS = os.environ.get('EMAIL_FROM_ADDRESS', 'noreply@savlink.com')
@@ -183,11 +249,15 @@ class Config:
 
     CORS_ORIGINS = _build_cors()
     CACHE_WARMUP_ENABLED = os.environ.get('CACHE_WARMUP_ENABLED', 'false').lower() == 'true'
+    RATE_LIMIT_POLICIES = _build_rate_limit_policies()
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    ADMIN_UIDS = frozenset(u.strip() for u in os.environ.get('ADMIN_UIDS', '').split(',') if u.strip())
 
     @classmethod
     def init_app(cls, app):
         app.config['CORS_ORIGINS'] = cls.CORS_ORIGINS
         app.config['CACHE_WARMUP_ENABLED'] = cls.CACHE_WARMUP_ENABLED
+        app.config['RATE_LIMIT_POLICIES'] = cls.RATE_LIMIT_POLICIES
 
         if cls.FIREBASE_CONFIG_JSON:
             try:
@@ -0,0 +1,203 @@
+# server/app/dashboard/fragments.py
+
+import re
+import time
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import g, has_app_context, appcontext_pushed
+
+from app.extensions import redis_client
+from app.cache import keys as K
+from app.json_provider import dumps
+from app.dashboard.serializers import serialize_links
+
+logger = logging.getLogger(__name__)
+
+# In a cached payload, {"$link": id, "v": updated_at} stands for that
+# link's fragment at that version or newer. User text can't produce these
+# bytes: its quotes are escaped.
+REF = '$link'
+_REF_RE = re.compile(rb'\{"\$link":(\d+)(?:,"v":"([^"]*)")?\}')
+
+Fragment = Tuple[str, bytes]    # (version, encoded serialize_link output)
+
+# Versions are fixed-width ISO timestamps, so they order as strings. A write
+# never replaces a newer version: a reader that loaded the row before an
+# edit committed (or from a lagging replica) can't put the old fragment back.
+# Changes that leave the version alone (folder or tag rename, page metadata
+# refresh) set a barrier instead, and writes from app contexts that started
+# before it are dropped. KEYS are (fragment, barrier) pairs.
+_STORE_LUA = """
+local since = tonumber(ARGV[2])
+for i = 1, #KEYS, 2 do
+  local version, body = ARGV[i + 2], ARGV[i + 3]
+  local barrier = redis.call('GET', KEYS[i + 1])
+  local current = redis.call('GET', KEYS[i])
+  if not (barrier and tonumber(barrier) > since)
+     and (not current or string.match(current, '^[^|]*') <= version) then
+    redis.call('SET', KEYS[i], version .. '|' .. body, 'EX', ARGV[1])
+  end
+end
+return 0
+"""
+
+_BARRIER_LUA = """
+for i = 1, #KEYS, 2 do
+  redis.call('SET', KEYS[i + 1], ARGV[2], 'EX', ARGV[1])
+  redis.call('DEL', KEYS[i])
+end
+return 0
+"""
+
+
+def version(link) -> str:
+    return link.updated_at.isoformat(timespec='microseconds') if link.updated_at else ''
+
+
+def ref(link) -> Dict[str, object]:
+    return {REF: link.id, 'v': version(link)}
+
+
+def _stamp(sender, **kwargs):
+    g._fragments_since = time.time()
+
+
+# Before any row this context loads, so barriers set after it apply
+appcontext_pushed.connect(_stamp)
+
+
+def _since() -> float:
+    return g.get('_fragments_since', 0.0) if has_app_context() else 0.0
+
+
+def _keys(link_id: int) -> List[str]:
+    return [K.LINK_FRAGMENT.format(link_id), K.LINK_FRAGMENT_BARRIER.format(link_id)]
+
+
+def _memo() -> Optional[Dict[int, Fragment]]:
+    if not has_app_context():
+        return None
+    memo = getattr(g, '_link_fragments', None)
+    if memo is None:
+        memo = g._link_fragments = {}
+    return memo
+
+
+#  Store
+
+def _read(ids: Iterable[int]) -> Dict[int, Fragment]:
+    memo = _memo() or {}
+    found = {i: memo[i] for i in ids if i in memo}
+    need = [i for i in ids if i not in found]
+    if not need:
+        return found
+    values = redis_client.mget([K.LINK_FRAGMENT.format(i) for i in need]) or []
+    for i, value in zip(need, values):
+        v, _, raw = value.partition('|') if value else ('', '', '')
+        if raw:     # an edit marker has no body
+            found[i] = (v, raw.encode())
+    return found
+
+
+def _write(keys: List[str], args: List) -> None:
+    redis_client.eval(_STORE_LUA, keys, [K.TTL_FRAGMENT, _since()] + args)
+
+
+def store(links) -> List[bytes]:
+    """Serializes links (Link or LinkRow) and caches each fragment under its id."""
+    if not links:
+        return []
+    memo = _memo()
+    out, keys, args = [], [], []
+    for link, data in zip(links, serialize_links(links)):
+        v, raw = version(link), dumps(data)
+        out.append(raw)
+        keys += _keys(link.id)
+        args += [v, raw]
+        if memo is not None:
+            memo[link.id] = (v, raw)
+    _write(keys, args)
+    return out
+
+
+def supersede(link) -> None:
+    """
+    Call after an edit commits, in place of deleting the fragment: leaves a
+    marker at the new version so older fragments can't be stored over it.
+    """
+    memo = _memo()
+    if memo is not None:
+        memo.pop(link.id, None)
+    _write(_keys(link.id), [version(link), ''])
+
+
+def invalidate(link_ids: Iterable[int]) -> None:
+    """
+    Drops fragments whose related data changed without a new version, and
+    keeps readers that started before now from storing them again.
+    """
+    memo = _memo()
+    keys = []
+    for i in link_ids:
+        keys += _keys(i)
+        if memo is not None:
+            memo.pop(i, None)
+    if keys:
+        redis_client.eval(_BARRIER_LUA, keys, [K.TTL_FRAGMENT, time.time()])
+
+
+#  Reads
+
+def render(links) -> List[bytes]:
+    """
+    Fragments for links already loaded: a cached one is used when its
+    version matches the link's updated_at, the rest are serialized and
+    stored. One MGET for the page.
+    """
+    cached = _read([l.id for l in links])
+    out, stale = [], []
+    for link in links:
+        hit = cached.get(link.id)
+        if hit and hit[0] == version(link):
+            out.append(hit[1])
+        else:
+            out.append(None)
+            stale.append(link)
+    fresh = iter(store(stale))
+    return [raw if raw is not None else next(fresh) for raw in out]
+
+
+def refs(links) -> List[Dict[str, object]]:
+    """For aggregate payloads: ensures each link's fragment is cached and returns refs to them."""
+    render(links)
+    return [ref(l) for l in links]
+
+
+def hydrate(wanted: Dict[int, str]) -> Dict[int, bytes]:
+    """
+    Fragments by link id, each at least the version its ref names. Those
+    not cached, or cached at an older version, are loaded with one list
+    query.
+    """
+    found = {i: raw for i, (v, raw) in _read(list(wanted)).items() if v >= wanted[i]}
+    missing = wanted.keys() - found.keys()
+    if missing:
+        from app.models import Link
+        from app.links.queries import list_query, fetch_rows
+        rows = fetch_rows(list_query(Link.id.in_(missing), Link.soft_deleted == False))
+        found.update(zip([r.id for r in rows], store(rows)))
+    return found
+
+
+def splice(raw: bytes) -> bytes:
+    """An encoded payload with its link refs replaced by the links' fragments."""
+    wanted = {}
+    for i, v in _REF_RE.findall(raw):
+        wanted[int(i)] = max(wanted.get(int(i), ''), v.decode())
+    if not wanted:
+        return raw
+    frags = hydrate(wanted)
+    # A link deleted since the payload was cached renders as null until the
+    # payload itself is invalidated
+    return _REF_RE.sub(lambda m: frags.get(int(m.group(1)), b'null'), raw)
@@ -2,10 +2,14 @@
 from flask import request, g
 from app.dashboard import dashboard_bp
 from app.auth.middleware import require_auth
+from app.replicas import read_replica
 from app.responses import success_response, error_response
 from app.dashboard import views
-from app.dashboard.serializers import serialize_link
+from app.dashboard import fragments
+from app.json_provider import Encoded, dumps
 from app.cache import warm_user_cache
+from app.cache import keys as K
+from app.middleware.conditional import conditional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,6 +33,7 @@ def _int(val, default, lo=1, hi=100):
 
 @dashboard_bp.route('/links', methods=['GET'])
 @require_auth
+@read_replica
 def get_links():
     try:
         uid = _uid()
@@ -46,7 +51,8 @@ def get_links():
         links, next_cursor, meta = views.resolve_view(
             uid, view, search, cursor, limit, sort, order, **filters
         )
-        return success_response({'links': [serialize_link(l) for l in links], 'meta': meta})
+        body = b'{"links":[' + b','.join(fragments.render(links)) + b'],"meta":' + dumps(meta) + b'}'
+        return success_response(Encoded(body))
     except Exception as e:
         logger.error("GET /links error: %s", e, exc_info=True)
         return error_response('Failed to load links', 500)
@@ -54,11 +60,12 @@ def get_links():
 
 @dashboard_bp.route('/recent', methods=['GET'])
 @require_auth
+@read_replica
 def recent():
     try:
         uid = _uid()
         limit = _int(request.args.get('limit'), 20)
-        data = views.get_recent_items(uid, limit)
+        data = views.encoded(K.DASH_RECENT.format(uid), lambda: views.get_recent_items(uid, limit))
         return success_response(data)
     except Exception as e:
         logger.error("GET /recent error: %s", e, exc_info=True)
@@ -67,10 +74,11 @@ def recent():
 
 @dashboard_bp.route('/pinned', methods=['GET'])
 @require_auth
+@read_replica
 def pinned():
     try:
         uid = _uid()
-        data = views.get_pinned_items(uid)
+        data = views.encoded(K.DASH_PINNED.format(uid), lambda: views.get_pinned_items(uid))
         return success_response(data)
     except Exception as e:
         logger.error("GET /pinned error: %s", e, exc_info=True)
@@ -79,11 +87,12 @@ def pinned():
 
 @dashboard_bp.route('/starred', methods=['GET'])
 @require_auth
+@read_replica
 def starred():
     try:
         uid = _uid()
         limit = _int(request.args.get('limit'), 30)
-        data = views.get_starred_items(uid, limit)
+        data = views.encoded(K.DASH_STARRED.format(uid), lambda: views.get_starred_items(uid, limit))
         return success_response(data)
     except Exception as e:
         logger.error("GET /starred error: %s", e, exc_info=True)
@@ -92,12 +101,14 @@ def starred():
 
 @dashboard_bp.route('/overview', methods=['GET'])
 @require_auth
+@conditional(K.TTL_DASHBOARD)
+@read_replica
 def overview():
     """Single call that returns everything the frontend needs on load."""
     try:
         uid = _uid()
         warm_user_cache(uid)
-        data = views.get_overview(uid)
+        data = views.encoded(K.DASH_OVERVIEW.format(uid), lambda: views.get_overview(uid))
         return success_response(data)
     except Exception as e:
         logger.error("GET /overview error: %s", e, exc_info=True)
@@ -108,9 +119,12 @@ def overview():
 
 @dashboard_bp.route('/stats', methods=['GET'])
 @require_auth
+@conditional(K.TTL_STATS)
+@read_replica
 def stats():
     try:
-        return success_response({'stats': views.get_stats(_uid())})
+        uid = _uid()
+        return success_response(views.encoded(K.DASH_STATS.format(uid), lambda: views.get_stats(uid)).under('stats'))
     except Exception as e:
         logger.error("GET /stats error: %s", e, exc_info=True)
         return error_response('Failed to load stats', 500)
@@ -118,6 +132,8 @@ def stats():
 
 @dashboard_bp.route('/structure', methods=['GET'])
 @require_auth
+@conditional(K.TTL_FOLDERS)
+@read_replica
 def structure():
     try:
         from app.folders.service import get_folder_tree
@@ -129,11 +145,12 @@ def structure():
 
 @dashboard_bp.route('/home', methods=['GET'])
 @require_auth
+@read_replica
 def home():
     try:
         uid = _uid()
         warm_user_cache(uid)
-        return success_response(views.get_home_data(uid))
+        return success_response(views.encoded(K.DASH_HOME.format(uid), lambda: views.get_home_data(uid)))
     except Exception as e:
         logger.error("GET /home error: %s", e, exc_info=True)
         return error_response('Failed to load dashboard', 500)
@@ -141,9 +158,11 @@ def home():
 
 @dashboard_bp.route('/home/quick-access', methods=['GET'])
 @require_auth
+@read_replica
 def quick_access():
     try:
-        return success_response({'items': views.get_quick_access(_uid())})
+        uid = _uid()
+        return success_response(views.encoded(K.DASH_QUICK.format(uid), lambda: views.get_quick_access(uid)).under('items'))
     except Exception as e:
         logger.error("GET /home/quick-access error: %s", e, exc_info=True)
         return error_response('Failed to load quick access', 500)
@@ -1,13 +1,52 @@
 # server/app/dashboard/serializers.py
-from app.utils.url import extract_domain, get_short_link_url, build_favicon_url
+import os
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Dict, Any
+
+from app.utils.url import extract_domain, get_short_link_url, get_base_url, favicon_for_domain
 from app.utils.time import relative_time
+from app.metadata.store import page_metadata_for
+from app.links.queries import LinkRow
+
+DOMAIN_MEMO_SIZE = int(os.environ.get('SERIALIZER_DOMAIN_MEMO', '4096'))
+
+
+@lru_cache(maxsize=DOMAIN_MEMO_SIZE)
+def _parsed_domain(url: str) -> str:
+    return extract_domain(url)
+
+
+def _url_domain(link) -> str:
+    # Stored on write (Link._sync_url_hash); parsed only for rows not yet backfilled
+    return link.domain or _parsed_domain(link.original_url or '')
+
+
+def _related(link):
+    """(page metadata, folder name, tag names, password protected) for a Link or LinkRow."""
+    if isinstance(link, LinkRow):
+        return link.page, link.folder_name, link.tag_names, link.password_protected
+    return (page_metadata_for(link), link.folder.name if link.folder else None,
+            [t.name for t in (link.tags or [])], bool(link.password_hash))
+
+
+def serialize_links(links) -> List[Dict[str, Any]]:
+    """
+    serialize_link for a page of links (Link or LinkRow), with the clock
+    and base URL read once for the page rather than once per link.
+    """
+    now, base = datetime.utcnow(), get_base_url()
+    return [_serialize(link, now, base) for link in links]
 
 
 def serialize_link(link):
-    meta = link.metadata_ or {}
-    page = meta.get('page_metadata', {})
-    domain = page.get('domain') or extract_domain(link.original_url)
-    favicon = page.get('favicon') or build_favicon_url(link.original_url)
+    return _serialize(link, datetime.utcnow(), get_base_url())
+
+
+def _serialize(link, now: datetime, base: str) -> Dict[str, Any]:
+    page, folder_name, tags, protected = _related(link)
+    url_domain = _url_domain(link)
+    domain = page.get('domain') or url_domain
 
     return {
         'id': link.id,
@@ -18,9 +57,9 @@ def serialize_link(link):
         'description': page.get('description'),
         'link_type': link.link_type,
         'slug': link.slug,
-        'short_url': get_short_link_url(link.slug) if link.slug else None,
+        'short_url': get_short_link_url(link.slug, base) if link.slug else None,
         'domain': domain,
-        'favicon': favicon,
+        'favicon': page.get('favicon') or favicon_for_domain(url_domain),
         'favicons': page.get('favicons', []),
         'image': page.get('image'),
         'site_name': page.get('site_name'),
@@ -33,13 +72,13 @@ def serialize_link(link):
         'expires_at': _iso(link.expires_at),
         'created_at': _iso(link.created_at),
         'updated_at': _iso(link.updated_at),
-        'relative_time': relative_time(link.created_at),
+        'relative_time': relative_time(link.created_at, now),
         'click_count': link.click_count or 0,
         'folder_id': link.folder_id,
-        'folder_name': link.folder.name if link.folder else None,
-        'tags': [t.name for t in (link.tags or [])],
-        'is_public': not bool(link.password_hash),
-        'password_protected': bool(link.password_hash),
+        'folder_name': folder_name,
+        'tags': tags,
+        'is_public': not protected,
+        'password_protected': protected,
         'content_type': page.get('content_type'),
         'reading_time': page.get('reading_time_minutes'),
         'word_count': page.get('word_count'),
@@ -49,16 +88,16 @@ def serialize_link(link):
 
 
 def serialize_link_minimal(link):
-    meta = link.metadata_ or {}
-    page = meta.get('page_metadata', {})
-    domain = page.get('domain') or extract_domain(link.original_url)
+    page, _, tags, _ = _related(link)
+    url_domain = _url_domain(link)
+    domain = page.get('domain') or url_domain
 
     return {
         'id': link.id,
         'original_url': link.original_url,
         'title': link.title or page.get('title') or domain,
         'domain': domain,
-        'favicon': page.get('favicon') or build_favicon_url(link.original_url),
+        'favicon': page.get('favicon') or favicon_for_domain(url_domain),
         'link_type': link.link_type,
         'slug': link.slug,
         'short_url': get_short_link_url(link.slug) if link.slug else None,
@@ -67,7 +106,7 @@ def serialize_link_minimal(link):
         'click_count': link.click_count or 0,
         'created_at': _iso(link.created_at),
         'relative_time': relative_time(link.created_at),
-        'tags': [t.name for t in (link.tags or [])],
+        'tags': tags,
     }
 
 
@@ -4,12 +4,13 @@ import logging
 from datetime import datetime, timedelta
 from typing import Optional, Tuple, List, Dict, Any
 from sqlalchemy import or_, func, desc, asc
-from sqlalchemy.orm import joinedload
 from app.models import Link, Folder, LinkTag, Tag
 from app.extensions import db
-from app.dashboard.serializers import serialize_link
+from app.dashboard import fragments
+from app.links.queries import list_query, fetch_rows
 from app.cache.redis_layer import cache
 from app.cache import keys as K
+from app.json_provider import Encoded, dumps
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +57,20 @@ def resolve_view(user_id, view='all', search=None, cursor=None, limit=20,
     return links, next_cursor, meta
 
 
+def encoded(key: str, build) -> Encoded:
+    """
+    A cached view payload as stored, for success_response to pass through
+    without a decode/encode round trip. On a miss, build() computes it
+    (and caches it under `key`, which leaves the encoded copy in L1).
+    Link refs in the payload are spliced in from the fragment cache.
+    """
+    raw = cache.get_raw(key)
+    if raw is None:
+        data = build()
+        raw = cache.get_raw(key) or dumps(data)
+    return Encoded(fragments.splice(raw))
+
+
 def get_recent_items(user_id: str, limit: int = 20) -> Dict[str, Any]:
     key = K.DASH_RECENT.format(user_id)
     cached = cache.get(key)
@@ -63,9 +78,8 @@ def get_recent_items(user_id: str, limit: int = 20) -> Dict[str, Any]:
         return cached
 
     week_ago = datetime.utcnow() - timedelta(days=7)
-    links = (
-        Link.query.options(joinedload(Link.folder))
-        .filter(
+    links = fetch_rows(
+        list_query(
             Link.user_id == user_id,
             Link.soft_deleted == False,
             Link.archived_at.is_(None),
@@ -73,7 +87,6 @@ def get_recent_items(user_id: str, limit: int = 20) -> Dict[str, Any]:
         )
         .order_by(desc(Link.updated_at))
         .limit(limit)
-        .all()
     )
     folders = (
         Folder.query.filter(
@@ -88,7 +101,7 @@ def get_recent_items(user_id: str, limit: int = 20) -> Dict[str, Any]:
     from app.folders.service import serialize_folder
 
     data = {
-        'recent_links': [serialize_link(l) for l in links],
+        'recent_links': fragments.refs(links),
         'recent_folders': [serialize_folder(f, counts=True) for f in folders],
         'period': '7d'
     }
@@ -102,9 +115,8 @@ def get_pinned_items(user_id: str) -> Dict[str, Any]:
     if cached:
         return cached
 
-    links = (
-        Link.query.options(joinedload(Link.folder))
-        .filter(
+    links = fetch_rows(
+        list_query(
             Link.user_id == user_id,
             Link.soft_deleted == False,
             Link.archived_at.is_(None),
@@ -112,7 +124,6 @@ def get_pinned_items(user_id: str) -> Dict[str, Any]:
         )
         .order_by(desc(Link.pinned_at), desc(Link.created_at))
         .limit(50)
-        .all()
     )
     folders = (
         Folder.query.filter(
@@ -126,7 +137,7 @@ def get_pinned_items(user_id: str) -> Dict[str, Any]:
     from app.folders.service import serialize_folder
 
     data = {
-        'pinned_links': [serialize_link(l) for l in links],
+        'pinned_links': fragments.refs(links),
         'pinned_folders': [serialize_folder(f, counts=True) for f in folders],
         'total_pinned': len(links) + len(folders)
     }
@@ -140,9 +151,8 @@ def get_starred_items(user_id: str, limit: int = 30) -> Dict[str, Any]:
     if cached:
         return cached
 
-    links = (
-        Link.query.options(joinedload(Link.folder))
-        .filter(
+    links = fetch_rows(
+        list_query(
             Link.user_id == user_id,
             Link.soft_deleted == False,
             Link.archived_at.is_(None),
@@ -150,10 +160,9 @@ def get_starred_items(user_id: str, limit: int = 30) -> Dict[str, Any]:
         )
         .order_by(desc(Link.updated_at))
         .limit(limit)
-        .all()
     )
     data = {
-        'starred_links': [serialize_link(l) for l in links],
+        'starred_links': fragments.refs(links),
         'total_starred': len(links)
     }
     cache.put(key, data, K.TTL_DASHBOARD)
@@ -262,12 +271,10 @@ def get_home_data(user_id: str) -> Dict[str, Any]:
     if cached:
         return cached
 
-    recent = (
-        Link.query.options(joinedload(Link.folder))
-        .filter(Link.user_id == user_id, Link.soft_deleted == False, Link.archived_at.is_(None))
+    recent = fetch_rows(
+        list_query(Link.user_id == user_id, Link.soft_deleted == False, Link.archived_at.is_(None))
         .order_by(desc(Link.created_at))
         .limit(10)
-        .all()
     )
 
     week_ago = datetime.utcnow() - timedelta(days=7)
@@ -293,7 +300,7 @@ def get_home_data(user_id: str) -> Dict[str, Any]:
     activities = _get_recent_activity(user_id, limit=10)
 
     data = {
-        'recent_links': [serialize_link(l) for l in recent],
+        'recent_links': fragments.refs(recent),
         'quick_access': get_quick_access(user_id),
         'folders': [_serialize_folder_preview(f) for f in folders],
         'activities': activities,
@@ -412,9 +419,8 @@ def get_quick_access(user_id: str, limit: int = 8) -> List[Dict[str, Any]]:
         return cached
 
     items = []
-    links = (
-        Link.query.options(joinedload(Link.folder))
-        .filter(
+    links = fetch_rows(
+        list_query(
             Link.user_id == user_id,
             Link.soft_deleted == False,
             Link.archived_at.is_(None),
@@ -422,10 +428,9 @@ def get_quick_access(user_id: str, limit: int = 8) -> List[Dict[str, Any]]:
         )
         .order_by(desc(Link.pinned), desc(Link.frequently_used), desc(Link.starred), desc(Link.updated_at))
         .limit(limit)
-        .all()
     )
-    for link in links:
-        items.append({'type': 'link', 'item': serialize_link(link)})
+    for r in fragments.refs(links):
+        items.append({'type': 'link', 'item': r})
 
     folders = (
         Folder.query.filter(
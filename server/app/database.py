@@ -12,9 +12,9 @@ logger = logging.getLogger(__name__)
 class DatabaseManager:
     def __init__(self):
         self.app = None
-        self._health = {'healthy': False, 'last_check': 0}
         self._lock = threading.Lock()
         self._ready = False
+        self._migrated = False
         self._pool_stats_interval = 60
         self._last_pool_log = 0
 
@@ -64,12 +64,17 @@ class DatabaseManager:
         except Exception:
             pass
 
-    def initialize_with_retry(self):
-        if self._ready:
+    def initialize_with_retry(self, migrate: bool = True):
+        """
+        Connects (with retries) and, when `migrate` is set, creates tables
+        and applies pending migrations. Workers started after a separate
+        `flask migrate` step (or a preloaded master) pass migrate=False.
+        """
+        if self._ready and (self._migrated or not migrate):
             return {'success': True, 'message': 'Already initialized'}
 
         with self._lock:
-            if self._ready:
+            if self._ready and (self._migrated or not migrate):
                 return {'success': True, 'message': 'Already initialized'}
 
             from app.extensions import db
@@ -85,19 +90,21 @@ class DatabaseManager:
                             conn.execute(text("SELECT 1"))
 
                         from app import models  # noqa: F401
-                        db.create_all()
-
-                        self._run_migrations()
+                        migrations = None
+                        if migrate:
+                            db.create_all()
+                            migrations = self._run_migrations()
+                            self._migrated = True
 
                         tables = db.inspect(db.engine).get_table_names()
                         self._ready = True
-                        self._health = {'healthy': True, 'last_check': time.time()}
                         self._log_pool_stats(db.engine)
 
                         return {
                             'success': True,
                             'tables_count': len(tables),
                             'tables': tables,
+                            'migrations': migrations,
                         }
 
                 except OperationalError as e:
@@ -138,38 +145,16 @@ class DatabaseManager:
                 logger.info("No pending migrations")
             else:
                 logger.warning("Migration result: %s", result)
+            return result
 
         except Exception as e:
             logger.warning("Migrations failed (non-fatal): %s", e)
-
-    def check_health(self):
-        now = time.time()
-        if now - self._health.get('last_check', 0) < 30:
-            return self._health
-        try:
-            from app.extensions import db
-            t = time.time()
-            with db.engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
-
-            pool = db.engine.pool
-            self._health = {
-                'healthy': True,
-                'response_time_ms': round((time.time() - t) * 1000, 2),
-                'last_check': now,
-                'pool': {
-                    'size': pool.size(),
-                    'checked_out': pool.checkedout(),
-                    'overflow': pool.overflow(),
-                },
-            }
-        except Exception as e:
-            self._health = {'healthy': False, 'error': str(e), 'last_check': now}
-        return self._health
+            return {'status': 'error', 'error': str(e)}
 
     def get_pool_status(self):
         try:
             from app.extensions import db
+            from app.pool import pool_tuner
             pool = db.engine.pool
             return {
                 'size': pool.size(),
@@ -177,6 +162,7 @@ class DatabaseManager:
                 'overflow': pool.overflow(),
                 'max_overflow': pool._max_overflow,
                 'checkedin': pool.checkedin(),
+                'adaptive': pool_tuner.stats(),
             }
         except Exception:
             return {'error': 'Unable to read pool status'}
@@ -3,36 +3,40 @@
 import io
 import csv
 import json
-from flask import request, send_file
+from flask import request, Response
 from app.export import export_bp
 from app.auth.middleware import require_auth
+from app.replicas import read_replica
 from app.auth.utils import get_current_user_id as uid
 from app.responses import success_response, error_response
 from app.export import service
 
 
+def _download(body: str, mimetype: str, filename: str) -> Response:
+    # Built in memory anyway; a plain Response (unlike send_file's
+    # passthrough stream) gets the ETag and compression layer
+    return Response(body, mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+
 @export_bp.route('/links/json', methods=['GET'])
 @require_auth
+@read_replica
 def export_json():
     data = service.export_links(uid(), fmt='json')
-    return send_file(
-        io.BytesIO(json.dumps(data, indent=2, default=str).encode()),
-        mimetype='application/json', as_attachment=True, download_name='savlink-export.json',
-    )
+    return _download(json.dumps(data, indent=2, default=str), 'application/json', 'savlink-export.json')
 
 
 @export_bp.route('/links/csv', methods=['GET'])
 @require_auth
+@read_replica
 def export_csv():
     rows = service.export_links(uid(), fmt='csv')
     output = io.StringIO()
     writer = csv.DictWriter(output, fieldnames=rows[0].keys() if rows else [])
     writer.writeheader()
     writer.writerows(rows)
-    return send_file(
-        io.BytesIO(output.getvalue().encode()),
-        mimetype='text/csv', as_attachment=True, download_name='savlink-export.csv',
-    )
+    return _download(output.getvalue(), 'text/csv', 'savlink-export.csv')
 
 
 @export_bp.route('/links/import', methods=['POST'])
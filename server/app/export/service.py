@@ -6,7 +6,8 @@ import logging
 from typing import Dict, Any, List
 from app.models import Link, Folder, Tag, LinkTag
 from app.extensions import db
-from app.utils.url import extract_domain
+from app.cache.invalidation import on_link_change
+from app.utils.url import extract_domain, url_hash
 
 logger = logging.getLogger(__name__)
 
@@ -81,17 +82,28 @@ def _import_bookmarks_html(user_id: str, content: str) -> Dict[str, Any]:
 
 def _create_links_from_import(user_id: str, items: List[Dict]) -> Dict[str, Any]:
     created, skipped, errors = 0, 0, 0
-
-    for item in items[:1000]:
+    items = items[:1000]
+
+    # One lookup for every canonical URL in the file instead of one per row
+    hashes = {url_hash(i.get('url', '').strip()) for i in items if i.get('url', '').strip()}
+    seen = {
+        h for (h,) in db.session.query(Link.url_hash).filter(
+            Link.user_id == user_id, Link.soft_deleted == False,
+            Link.url_hash.in_(hashes),
+        ).all()
+    } if hashes else set()
+
+    for item in items:
         url = item.get('url', '').strip()
         if not url:
             skipped += 1
             continue
 
-        existing = Link.query.filter_by(user_id=user_id, original_url=url, soft_deleted=False).first()
-        if existing:
+        h = url_hash(url)
+        if h in seen:
             skipped += 1
             continue
+        seen.add(h)
 
         try:
             link = Link(
@@ -106,4 +118,6 @@ def _create_links_from_import(user_id: str, items: List[Dict]) -> Dict[str, Any]
             errors += 1
 
     db.session.commit()
-    return {'created': created, 'skipped': skipped, 'errors': errors, 'total': len(items)}
\ No newline at end of file
+    if created:
+        on_link_change(user_id)
+    return {'created': created, 'skipped': skipped, 'errors': errors, 'total': len(items)}
@@ -7,10 +7,11 @@ import redis as _redis
 
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from app.replicas import RoutingSession
 
 logger = logging.getLogger(__name__)
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 
 
@@ -20,6 +21,7 @@ class RedisClient:
         self._available = False
         self._last_error = None
         self._last_reconnect = 0
+        self.on_command = None      # (command, seconds, error) hook, set by app.metrics
         self._initialize()
 
     def _initialize(self):
@@ -60,6 +62,14 @@ class RedisClient:
         self._initialize()
         return self._available
 
+    def reset_after_fork(self):
+        """
+        Forgets connections inherited from a preloaded master. reset() drops
+        them without closing: the sockets are shared with the parent.
+        """
+        if self._client is not None:
+            self._client.connection_pool.reset()
+
     @property
     def available(self):
         return self._available and self._client is not None
@@ -67,12 +77,18 @@ class RedisClient:
     def _exec(self, op, *a, **kw):
         if not self._ensure():
             return None
+        start = time.perf_counter()
+        error = False
         try:
             return op(*a, **kw)
         except _redis.RedisError as e:
+            error = True
             logger.warning("Redis error: %s", e)
             self._available = False
             return None
+        finally:
+            if self.on_command is not None:
+                self.on_command(getattr(op, '__name__', 'other'), time.perf_counter() - start, error)
 
     def get(self, key):
         return self._exec(self._client.get, key) if self.available else None
@@ -86,6 +102,9 @@ class RedisClient:
     def delete(self, *keys):
         return self._exec(self._client.delete, *keys) if self.available else 0
 
+    def mget(self, keys):
+        return self._exec(self._client.mget, keys) if self.available else None
+
     def incr(self, key):
         return self._exec(self._client.incr, key) if self.available else None
 
@@ -95,6 +114,9 @@ class RedisClient:
     def exists(self, *keys):
         return self._exec(self._client.exists, *keys) if self.available else 0
 
+    def eval(self, script, keys, args):
+        return self._exec(self._client.eval, script, len(keys), *keys, *args) if self.available else None
+
     def ping(self):
         if not self._client:
             return False
@@ -3,10 +3,13 @@
 from flask import request
 from app.folders import folders_bp
 from app.auth.middleware import require_auth
+from app.replicas import read_replica
 from app.auth.utils import get_current_user_id as uid
 from app.responses import success_response, error_response
 from app.folders import service
 from app.middleware.rate_limit import api_limiter, write_limiter
+from app.middleware.conditional import conditional
+from app.cache import keys as K
 
 
 @folders_bp.route('', methods=['POST'])
@@ -28,6 +31,8 @@ def create():
 @folders_bp.route('', methods=['GET'])
 @require_auth
 @api_limiter
+@conditional(K.TTL_FOLDERS)
+@read_replica
 def list_all():
     view = request.args.get('view', 'list')
     if view == 'tree':
@@ -7,9 +7,10 @@ from typing import Optional, List, Dict, Any, Tuple
 from sqlalchemy import func, desc, asc, or_, case
 from app.extensions import db
 from app.models import Folder, Link, LinkTag
-from app.dashboard.serializers import serialize_link
+from app.dashboard.serializers import serialize_links
 from app.cache.redis_layer import cache as redis_cache
 from app.cache import keys as K
+from app.cache.invalidation import on_folder_change, on_link_change, on_related_change
 
 logger = logging.getLogger(__name__)
 
@@ -100,6 +101,10 @@ def _get_all_folder_counts(user_id: str) -> Dict[int, int]:
     return {folder_id: count for folder_id, count in rows}
 
 
+def _folder_link_ids(user_id: str, folder_id: int) -> List[int]:
+    return [r[0] for r in db.session.query(Link.id).filter_by(folder_id=folder_id, user_id=user_id).all()]
+
+
 def _get_folder_map(user_id: str) -> Dict[int, Folder]:
     """Load all user folders once."""
     folders = Folder.query.filter_by(
@@ -298,7 +303,7 @@ def _get_links_for_folder(user_id: str, folder_id: int,
         items = items[:limit]
 
     return {
-        'links': [serialize_link(l) for l in items],
+        'links': serialize_links(items),
         'meta': {
             'total': total,
             'has_more': has_more,
@@ -334,6 +339,7 @@ def create_folder(user_id: str, data: Dict[str, Any]) -> Tuple[Optional[Folder],
     )
     db.session.add(folder)
     db.session.commit()
+    on_folder_change(user_id)
     return folder, None
 
 
@@ -381,6 +387,7 @@ def update_folder(user_id: str, folder_id: int,
     ).first()
     if not folder:
         return None
+    renamed = False
     if 'name' in data:
         name = data['name'].strip()
         if not name:
@@ -390,6 +397,7 @@ def update_folder(user_id: str, folder_id: int,
             Folder.id != folder_id, Folder.soft_deleted == False
         ).first():
             return None
+        renamed = name != folder.name
         folder.name = name
         base_slug = _generate_slug(name)
         folder.slug = _unique_slug(user_id, base_slug, exclude_id=folder_id)
@@ -399,6 +407,9 @@ def update_folder(user_id: str, folder_id: int,
                     bool(data[field]) if field == 'pinned' else data[field])
     folder.updated_at = datetime.utcnow()
     db.session.commit()
+    on_folder_change(user_id)
+    if renamed:
+        on_related_change(_folder_link_ids(user_id, folder_id))
     return folder
 
 
@@ -408,6 +419,7 @@ def soft_delete_folder(user_id: str, folder_id: int) -> bool:
     ).first()
     if not folder:
         return False
+    link_ids = _folder_link_ids(user_id, folder_id)
     Folder.query.filter_by(
         parent_id=folder_id, user_id=user_id, soft_deleted=False
     ).update({'parent_id': folder.parent_id})
@@ -416,6 +428,9 @@ def soft_delete_folder(user_id: str, folder_id: int) -> bool:
     ).update({'folder_id': None})
     folder.soft_deleted = True
     db.session.commit()
+    on_folder_change(user_id)
+    on_link_change(user_id)     # its links moved to the root
+    on_related_change(link_ids)
     return True
 
 
@@ -427,6 +442,7 @@ def toggle_folder_pin(user_id: str, folder_id: int) -> Optional[bool]:
         return None
     folder.pinned = not folder.pinned
     db.session.commit()
+    on_folder_change(user_id)
     return folder.pinned
 
 
@@ -452,6 +468,7 @@ def move_folder(user_id: str, folder_id: int,
             current = p.parent_id if p else None
     folder.parent_id = new_parent_id
     db.session.commit()
+    on_folder_change(user_id)
     return True
 
 
@@ -559,7 +576,7 @@ def get_root_items(user_id: str, params: Dict[str, Any]) -> Dict[str, Any]:
         'folders': [serialize_folder(f, counts=True,
                                      precomputed_counts=count_map)
                     for f in root_folders],
-        'links': [serialize_link(l) for l in items],
+        'links': serialize_links(items),
         'meta': {
             'total': total_links,
             'has_more': has_more,
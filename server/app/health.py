@@ -0,0 +1,196 @@
+# server/app/health.py
+
+import os
+import time
+import random
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+
+from sqlalchemy import text
+
+from app.pool import percentile
+
+logger = logging.getLogger(__name__)
+
+INTERVAL = float(os.environ.get('HEALTH_INTERVAL', '10'))
+WINDOW = int(os.environ.get('HEALTH_WINDOW', '60'))           # samples per percentile
+READY_SATURATION = float(os.environ.get('HEALTH_READY_SATURATION', '1.0'))
+KEY_REFRESH_MARGIN = INTERVAL * 3   # refetch signing certs this long before expiry
+STALE_AFTER = INTERVAL * 3
+
+
+class Probe:
+    """Last outcome and a rolling latency window for one dependency."""
+    __slots__ = ('samples', 'healthy', 'error', 'checked_at', 'skipped')
+
+    def __init__(self):
+        self.samples = deque(maxlen=WINDOW)
+        self.healthy: Optional[bool] = None
+        self.error: Optional[str] = None
+        self.checked_at = 0.0
+        self.skipped = 0
+
+    def record(self, seconds: float, healthy: bool, error: Optional[str] = None):
+        self.samples.append(seconds * 1000)
+        self.healthy, self.error, self.checked_at = healthy, error, time.time()
+
+    def summary(self) -> Dict[str, Any]:
+        out = {
+            'healthy': bool(self.healthy),
+            'checked_at': self.checked_at,
+            'latency_ms': {
+                'last': round(self.samples[-1], 2) if self.samples else None,
+                'p50': round(percentile(self.samples, 0.5), 2),
+                'p95': round(percentile(self.samples, 0.95), 2),
+                'p99': round(percentile(self.samples, 0.99), 2),
+            },
+        }
+        if self.error:
+            out['error'] = self.error
+        if self.skipped:
+            out['skipped'] = self.skipped
+        return out
+
+
+class HealthSampler:
+    """
+    Probes the database, Redis, Firebase signing keys and replicas from a
+    background thread every INTERVAL seconds (jittered), so health requests
+    are answered from memory and load balancer probes never touch the pool.
+    The DB probe only runs when the pool has room: a saturated pool is
+    reported by readiness, and the last result stands until then.
+    """
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.database = Probe()
+        self.redis = Probe()
+        self._snapshot: Dict[str, Any] = {'status': 'starting', 'checked_at': 0, 'checks': {}}
+
+    def start(self, app):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run_forever, args=(app,), daemon=True, name='health-sampler',
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_forever(self, app):
+        with app.app_context():
+            while True:
+                try:
+                    self.sample(app)
+                except Exception as e:
+                    logger.warning("[HEALTH] Sampling failed: %s", e)
+                if self._stop.wait(INTERVAL * random.uniform(0.8, 1.2)):
+                    return
+
+    #  Probes
+
+    def _probe_database(self):
+        from app.extensions import db
+        engine = db.engine
+        pool = engine.pool
+        if pool.checkedin() == 0 and pool.checkedout() >= pool.size() + max(0, pool._max_overflow):
+            self.database.skipped += 1
+            return
+        start = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.execute(text('SELECT 1'))
+            self.database.record(time.perf_counter() - start, True)
+        except Exception as e:
+            self.database.record(time.perf_counter() - start, False, str(e)[:200])
+
+    def _probe_redis(self):
+        from app.extensions import redis_client
+        start = time.perf_counter()
+        ok = bool(redis_client.ping())
+        self.redis.record(time.perf_counter() - start, ok, None if ok else 'ping failed')
+
+    def _probe_firebase(self, app) -> Dict[str, Any]:
+        from app.auth.tokens import LOCAL_VERIFY, key_cache, KeysUnavailableError
+        if not app.config.get('FIREBASE_CONFIG_JSON'):
+            return {'healthy': True, 'configured': False}
+        if not LOCAL_VERIFY:
+            return {'healthy': True, 'configured': True, 'local_verify': False}
+
+        # refresh() is a no-op while the cache is backing off a failed fetch
+        if key_cache.expires_in() < KEY_REFRESH_MARGIN:
+            try:
+                key_cache.refresh()
+            except KeysUnavailableError:
+                pass
+        expires_in = key_cache.expires_in()
+        error = key_cache.last_error
+        out = {
+            'healthy': key_cache.key_count() > 0,
+            'configured': True,
+            'local_verify': True,
+            'keys': key_cache.key_count(),
+            # Stale keys served through a fetch backoff aren't fresh
+            'fresh': expires_in > 0 and not error,
+            'expires_in': round(expires_in) if key_cache.key_count() else None,
+        }
+        if error:
+            out['error'] = error
+        return out
+
+    def sample(self, app):
+        from app.replicas import replica_router
+
+        self._probe_database()
+        checks = {'database': self.database.summary()}
+        if app.config.get('REDIS_URL'):
+            self._probe_redis()
+            checks['redis'] = self.redis.summary()
+        checks['firebase'] = self._probe_firebase(app)
+        if replica_router.enabled:
+            replicas = replica_router.check_lag()
+            checks['replicas'] = {
+                'healthy': all(r['healthy'] for r in replicas),
+                'serving': sum(r['serving'] for r in replicas),
+                'replicas': replicas,
+            }
+
+        status = 'healthy' if all(c.get('healthy') for c in checks.values() if isinstance(c, dict)) \
+            else 'degraded'
+        self._snapshot = {'status': status, 'checked_at': time.time(), 'checks': checks}
+
+    #  Reads (memory only)
+
+    def snapshot(self) -> Dict[str, Any]:
+        snap = self._snapshot
+        if snap['checked_at'] and time.time() - snap['checked_at'] > STALE_AFTER:
+            return {**snap, 'status': 'stale'}
+        return snap
+
+    def readiness(self, engine) -> Dict[str, Any]:
+        snap = self.snapshot()
+        pool = engine.pool
+        capacity = pool.size() + max(0, pool._max_overflow)
+        in_use = pool.checkedout()
+
+        reasons = []
+        if snap['status'] in ('starting', 'stale'):
+            reasons.append(snap['status'])
+        elif not snap['checks']['database']['healthy']:
+            reasons.append('database')
+        if capacity and in_use >= capacity * READY_SATURATION:
+            reasons.append('pool_saturated')
+        return {
+            'ready': not reasons,
+            'reasons': reasons,
+            'pool': {'in_use': in_use, 'capacity': capacity},
+            'checked_at': snap['checked_at'],
+        }
+
+
+health_sampler = HealthSampler()
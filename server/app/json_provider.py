@@ -0,0 +1,94 @@
+# server/app/json_provider.py
+
+import os
+import json
+from datetime import date
+from typing import Any, Union
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib encoder
+    orjson = None
+
+# 'stdlib' forces the stdlib encoder even when orjson is installed
+BACKEND = os.environ.get('JSON_BACKEND', 'orjson' if orjson else 'stdlib')
+USE_ORJSON = BACKEND == 'orjson' and orjson is not None
+
+_ORJSON_OPTS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+def _default(o):
+    if isinstance(o, date):  # datetime too
+        return o.isoformat()
+    return str(o)
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON; datetimes as ISO 8601, anything else unknown as str()."""
+    if USE_ORJSON:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTS)
+    return json.dumps(obj, default=_default, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def loads(raw: Union[str, bytes]) -> Any:
+    if USE_ORJSON:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+class Encoded:
+    """
+    JSON already encoded (e.g. a cached payload read as raw bytes).
+    success_response splices it into the envelope as-is.
+    """
+    __slots__ = ('raw',)
+
+    def __init__(self, raw: Union[str, bytes]):
+        self.raw = raw.encode() if isinstance(raw, str) else raw
+
+    def under(self, field: str) -> 'Encoded':
+        """{field: <this>}, still without decoding."""
+        return Encoded(b'{' + dumps(field) + b':' + self.raw + b'}')
+
+
+class JSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider: orjson when available (JSON_BACKEND), with
+    datetimes as ISO 8601 on either backend rather than Flask's HTTP dates.
+    """
+    sort_keys = False
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, date):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if USE_ORJSON and not kwargs.keys() - {'separators'}:
+            return orjson.dumps(obj, default=self.default, option=_ORJSON_OPTS).decode()
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if USE_ORJSON and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        if not USE_ORJSON:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        option = _ORJSON_OPTS
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        # bytes straight into the body: no str round trip
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option | orjson.OPT_APPEND_NEWLINE),
+            mimetype=self.mimetype,
+        )
+
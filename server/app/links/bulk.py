@@ -40,7 +40,7 @@ def execute_bulk(user_id: str, action: str, link_ids: List[int], params: Dict[st
     affected = handler(links, now, user_id, params)
 
     db.session.commit()
-    on_bulk_change(user_id)
+    on_bulk_change(user_id, list(found_ids))
 
     _log_bulk(user_id, action, [l.id for l in links])
 
@@ -1,15 +1,92 @@
 # server/app/links/queries.py
 from datetime import datetime, timedelta
 from typing import Optional, Tuple, List, Dict, Any
-from sqlalchemy import or_, func, desc
-from sqlalchemy.orm import joinedload
-from app.models import Link, LinkTag
+from sqlalchemy import or_, func, desc, select, cast, literal, Text
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
+from app.models import Link, LinkTag, Folder, Tag, PageMetadata
 from app.extensions import db
 
 
+#  List rows
+
+# Page metadata fields the list serializers read; extracted in SQL
+PAGE_FIELDS = (
+    'title', 'description', 'domain', 'favicon', 'favicons', 'image', 'site_name',
+    'content_type', 'reading_time_minutes', 'word_count', 'author', 'published_at',
+)
+_JSON_FIELDS = {'favicons', 'reading_time_minutes', 'word_count'}   # kept typed, not ->>
+
+_LINK_FIELDS = (
+    'id', 'original_url', 'url_hash', 'domain', 'title', 'notes', 'link_type', 'slug',
+    'is_active', 'pinned', 'starred', 'frequently_used', 'pinned_at', 'archived_at',
+    'expires_at', 'created_at', 'updated_at', 'click_count', 'folder_id',
+)
+
+
+class LinkRow:
+    """
+    One listed link, as selected by list_columns(): the Link columns the
+    serializers use, folder and tag names, a password flag instead of the
+    hash, and page metadata extracted from JSONB. Not tracked by the session.
+    """
+    __slots__ = _LINK_FIELDS + ('folder_name', 'tag_names', 'password_protected', 'page')
+
+    def __init__(self, row):
+        n = len(_LINK_FIELDS)
+        for name, value in zip(_LINK_FIELDS, row):
+            setattr(self, name, value)
+        self.folder_name, tags, self.password_protected = row[n:n + 3]
+        self.tag_names = tags or []
+        # Absent keys stay absent, as in the JSONB document
+        self.page = {k: v for k, v in zip(PAGE_FIELDS, row[n + 3:]) if v is not None}
+
+
+def list_columns():
+    # The shared page_metadata row wins; links saved before it existed keep theirs inline
+    page = func.coalesce(
+        func.nullif(PageMetadata.data, cast(literal('{}'), JSONB)),
+        _field(Link.metadata_, 'page_metadata'),
+    )
+    tags = (
+        select(func.array_agg(aggregate_order_by(Tag.name, LinkTag.id)))
+        .select_from(LinkTag).join(Tag, Tag.id == LinkTag.tag_id)
+        .where(LinkTag.link_id == Link.id)
+        .correlate(Link).scalar_subquery()
+    )
+    return (
+        [getattr(Link, f) for f in _LINK_FIELDS]
+        + [Folder.name.label('folder_name'), tags.label('tag_names'),
+           Link.password_hash.isnot(None).label('password_protected')]
+        + [_field(page, f, as_text=f not in _JSON_FIELDS).label(f'page_{f}') for f in PAGE_FIELDS]
+    )
+
+
+def _field(doc, key: str, as_text: bool = False):
+    # Explicit ->/->> : subscripting a function result isn't valid SQL
+    if as_text:
+        return doc.op('->>', return_type=Text)(key)
+    return doc.op('->', return_type=JSONB)(key)
+
+
+def list_query(*criteria):
+    """Projected select over links (plus folder and page metadata); filter/order like a Query."""
+    return (
+        select(*list_columns())
+        .select_from(Link)
+        .outerjoin(Folder, Folder.id == Link.folder_id)
+        .outerjoin(PageMetadata, PageMetadata.url_hash == Link.url_hash)
+        .where(*criteria)
+    )
+
+
+def fetch_rows(stmt) -> List[LinkRow]:
+    return [LinkRow(r) for r in db.session.execute(stmt)]
+
+
+#  Views
+
 def base_query(user_id: str):
-    return Link.query.options(joinedload(Link.folder)).filter(
-        Link.user_id == user_id, Link.soft_deleted == False)
+    return list_query(Link.user_id == user_id, Link.soft_deleted == False)
 
 
 def view_all(user_id: str):
@@ -97,14 +174,14 @@ def apply_filters(query, filters: Dict[str, Any]):
     return query
 
 
-def paginate(query, cursor: Optional[str], limit: int) -> Tuple[List[Link], Optional[str]]:
+def paginate(query, cursor: Optional[str], limit: int) -> Tuple[List[LinkRow], Optional[str]]:
     offset = 0
     if cursor:
         try:
             offset = max(0, int(cursor))
         except (ValueError, TypeError):
             pass
-    items = query.offset(offset).limit(limit + 1).all()
+    items = fetch_rows(query.offset(offset).limit(limit + 1))
     has_more = len(items) > limit
     if has_more:
         items = items[:limit]
@@ -7,6 +7,7 @@ from app.auth.utils import get_current_user_id as uid
 from app.responses import success_response, error_response
 from app.links import service
 from app.dashboard.serializers import serialize_link
+from app.middleware.admission import priority
 
 
 @links_bp.route('', methods=['POST'])
@@ -150,6 +151,7 @@ def check_duplicate():
 
 @links_bp.route('/bulk', methods=['POST'])
 @require_auth
+@priority('bulk')
 def bulk_action():
     data = request.get_json()
     if not data:
@@ -8,7 +8,8 @@ from app.extensions import db
 from app.models import Link, Folder, Tag, LinkTag
 from app.utils.slug import generate_unique_slug, is_slug_available
 from app.utils.crypto import hash_password
-from app.cache.invalidation import on_link_change, on_tag_change
+from app.utils.url import url_hash
+from app.cache.invalidation import on_link_change, on_link_edit, on_tag_change
 
 logger = logging.getLogger(__name__)
 
@@ -69,12 +70,9 @@ def _log(user_id, action, entity_type, entity_id=None, **details):
 #  Duplicate detection 
 
 def check_duplicate(user_id: str, url: str) -> Optional[Dict]:
-    normalized = url.strip().rstrip('/')
     existing = Link.query.filter(
         Link.user_id == user_id, Link.soft_deleted == False,
-        (Link.original_url == normalized) |
-        (Link.original_url == normalized + '/') |
-        (Link.original_url == url)
+        Link.url_hash == url_hash(url),
     ).first()
     if not existing:
         return None
@@ -165,6 +163,10 @@ def create_link(user_id: str, data: Dict[str, Any]) -> Tuple[Optional[Link], Opt
 
 #  Update 
 
+# Edits that leave list membership and counts alone (updated_at still moves)
+_CONTENT_CHANGES = {'title', 'notes', 'url', 'slug', 'expires_at', 'password'}
+
+
 def update_link(user_id: str, link_id: int, data: Dict[str, Any]) -> Tuple[Optional[Link], Optional[str]]:
     link = _get_link(link_id, user_id)
     if not link:
@@ -240,7 +242,10 @@ def update_link(user_id: str, link_id: int, data: Dict[str, Any]) -> Tuple[Optio
 
     link.updated_at = datetime.utcnow()
     db.session.commit()
-    on_link_change(user_id, link_id)
+    if set(changes) <= _CONTENT_CHANGES:
+        on_link_edit(user_id, link)
+    else:
+        on_link_change(user_id, link_id)
     if changes:
         _log(user_id, 'link.updated', 'link', link_id, fields=changes)
 
@@ -410,6 +415,7 @@ def update_link_tags(user_id: str, link_id: int, add_ids: List[int], remove_ids:
         LinkTag.query.filter(
             LinkTag.link_id == link_id, LinkTag.tag_id.in_(remove_ids), LinkTag.user_id == user_id
         ).delete(synchronize_session='fetch')
+    link.updated_at = datetime.utcnow()     # tags are part of its fragment
     db.session.commit()
     on_link_change(user_id, link_id)
     on_tag_change(user_id)
@@ -433,6 +439,6 @@ def extend_link_expiry(user_id: str, link_id: int, days: int) -> bool:
     base = link.expires_at or datetime.utcnow()
     link.expires_at = base + timedelta(days=days)
     db.session.commit()
-    on_link_change(user_id, link_id)
+    on_link_edit(user_id, link)
     _log(user_id, 'link.expiry_extended', 'link', link_id, days=days)
     return True
\ No newline at end of file
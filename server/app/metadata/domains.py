@@ -0,0 +1,264 @@
+# server/app/metadata/domains.py
+
+import os
+import time
+import logging
+import threading
+from typing import Dict, Any, Optional, Tuple, List
+
+from app.extensions import redis_client
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('METADATA_DOMAIN_CONTROL', 'true').lower() == 'true'
+
+STATE_KEY = "meta:host:{}"        # token bucket + circuit state per host
+STATS_KEY = "meta:hoststats:{}"   # request / failure / latency counters per host
+HOSTS_KEY = "meta:hosts"          # zset of hosts by last fetch time
+
+BUCKET_CAPACITY = 4       # burst of fetches allowed per host
+BUCKET_RATE = 1.0         # tokens refilled per second
+POLITE_WAIT = 1.0         # max seconds we sleep for a token before giving up
+FAILURE_THRESHOLD = 3     # consecutive failures before the circuit opens
+BACKOFF_BASE = 60         # first open period, doubled on every re-open
+BACKOFF_MAX = 3600
+PROBE_WINDOW = 15         # one half-open probe per window
+SLOW_FETCH = 8.0          # fetches slower than this count as failures
+STATE_TTL = 86400
+STATS_TTL = 86400 * 7
+
+# Outcomes of acquire()
+ALLOW = 'allow'
+THROTTLED = 'throttled'
+OPEN = 'open'
+
+_ACQUIRE_LUA = """
+local s = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'open_until', 'probe_until')
+local now = tonumber(ARGV[1])
+local cap = tonumber(ARGV[2])
+local rate = tonumber(ARGV[3])
+local open_until = tonumber(s[3]) or 0
+if open_until > now then
+  return {'open', tostring(open_until - now)}
+end
+if open_until > 0 then
+  local probe_until = tonumber(s[4]) or 0
+  if probe_until > now then
+    return {'open', tostring(probe_until - now)}
+  end
+  redis.call('HSET', KEYS[1], 'probe_until', now + tonumber(ARGV[4]))
+end
+local tokens = tonumber(s[1]) or cap
+local ts = tonumber(s[2]) or now
+tokens = math.min(cap, tokens + math.max(0, now - ts) * rate)
+if tokens < 1 then
+  redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+  return {'throttled', tostring((1 - tokens) / rate)}
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens - 1, 'ts', now)
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[5]))
+return {'allow', '0'}
+"""
+
+_RECORD_LUA = """
+local now = tonumber(ARGV[1])
+local ok = ARGV[2] == '1'
+local ms = tonumber(ARGV[3])
+redis.call('HINCRBY', KEYS[2], 'requests', 1)
+redis.call('HINCRBYFLOAT', KEYS[2], 'latency_ms_total', ms)
+redis.call('HSET', KEYS[2], 'last_latency_ms', ms, 'last_status', ARGV[4], 'last_at', now)
+redis.call('EXPIRE', KEYS[2], tonumber(ARGV[9]))
+redis.call('ZADD', KEYS[3], now, ARGV[10])
+if ok then
+  redis.call('HSET', KEYS[1], 'failures', 0, 'opens', 0, 'open_until', 0, 'probe_until', 0)
+  redis.call('EXPIRE', KEYS[1], tonumber(ARGV[8]))
+  return {0, '0'}
+end
+redis.call('HINCRBY', KEYS[2], 'failures', 1)
+local failures = redis.call('HINCRBY', KEYS[1], 'failures', 1)
+local opens = tonumber(redis.call('HGET', KEYS[1], 'opens')) or 0
+local was_open = (tonumber(redis.call('HGET', KEYS[1], 'open_until')) or 0) > 0
+local retry_after = tonumber(ARGV[5])
+local backoff = 0
+if retry_after > 0 or was_open or failures >= tonumber(ARGV[6]) then
+  backoff = math.min(tonumber(ARGV[7]), tonumber(ARGV[11]) * (2 ^ opens))
+  backoff = math.max(backoff, retry_after)
+  redis.call('HSET', KEYS[1], 'open_until', now + backoff, 'probe_until', 0, 'opens', opens + 1)
+end
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[8]))
+return {failures, tostring(backoff)}
+"""
+
+
+class DomainController:
+    """
+    Per-host politeness and health for metadata fetches.
+
+    State lives in Redis so every worker sees the same buckets and circuits;
+    an in-process copy of the same logic is used while Redis is down.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local_state: Dict[str, Dict[str, float]] = {}
+        self._local_stats: Dict[str, Dict[str, Any]] = {}
+
+    #  Admission
+
+    def acquire(self, host: str) -> Tuple[str, float]:
+        """Returns (outcome, wait_seconds). Sleeps briefly for a token when cheap."""
+        if not ENABLED or not host:
+            return ALLOW, 0.0
+
+        outcome, wait = self._acquire_once(host)
+        if outcome == THROTTLED and wait <= POLITE_WAIT:
+            time.sleep(wait)
+            outcome, wait = self._acquire_once(host)
+        return outcome, wait
+
+    def _acquire_once(self, host: str) -> Tuple[str, float]:
+        now = time.time()
+        if redis_client.available:
+            res = redis_client.eval(
+                _ACQUIRE_LUA, [STATE_KEY.format(host)],
+                [now, BUCKET_CAPACITY, BUCKET_RATE, PROBE_WINDOW, STATE_TTL],
+            )
+            if res:
+                return res[0], float(res[1])
+        return self._acquire_local(host, now)
+
+    def _acquire_local(self, host: str, now: float) -> Tuple[str, float]:
+        with self._lock:
+            s = self._local_state.setdefault(host, {
+                'tokens': BUCKET_CAPACITY, 'ts': now, 'failures': 0,
+                'opens': 0, 'open_until': 0, 'probe_until': 0,
+            })
+            if s['open_until'] > now:
+                return OPEN, s['open_until'] - now
+            if s['open_until'] > 0:
+                if s['probe_until'] > now:
+                    return OPEN, s['probe_until'] - now
+                s['probe_until'] = now + PROBE_WINDOW
+            s['tokens'] = min(BUCKET_CAPACITY, s['tokens'] + max(0.0, now - s['ts']) * BUCKET_RATE)
+            s['ts'] = now
+            if s['tokens'] < 1:
+                return THROTTLED, (1 - s['tokens']) / BUCKET_RATE
+            s['tokens'] -= 1
+            return ALLOW, 0.0
+
+    #  Outcome recording
+
+    def record(self, host: str, ok: bool, duration: float,
+               status: Optional[int] = None, retry_after: float = 0):
+        if not ENABLED or not host:
+            return
+        if ok and duration > SLOW_FETCH:
+            ok = False
+
+        now = time.time()
+        ms = round(duration * 1000, 1)
+        status_s = str(status or ('ok' if ok else 'error'))
+
+        if redis_client.available:
+            res = redis_client.eval(
+                _RECORD_LUA,
+                [STATE_KEY.format(host), STATS_KEY.format(host), HOSTS_KEY],
+                [now, '1' if ok else '0', ms, status_s, retry_after,
+                 FAILURE_THRESHOLD, BACKOFF_MAX, STATE_TTL, STATS_TTL, host, BACKOFF_BASE],
+            )
+            if res is not None:
+                backoff = float(res[1])
+                if backoff:
+                    logger.warning("[META] Circuit open for %s — backing off %.0fs", host, backoff)
+                return
+
+        self._record_local(host, ok, ms, status_s, retry_after, now)
+
+    def _record_local(self, host, ok, ms, status_s, retry_after, now):
+        with self._lock:
+            st = self._local_stats.setdefault(host, {
+                'requests': 0, 'failures': 0, 'latency_ms_total': 0.0,
+            })
+            st['requests'] += 1
+            st['latency_ms_total'] += ms
+            st.update(last_latency_ms=ms, last_status=status_s, last_at=now)
+
+            s = self._local_state.setdefault(host, {
+                'tokens': BUCKET_CAPACITY, 'ts': now, 'failures': 0,
+                'opens': 0, 'open_until': 0, 'probe_until': 0,
+            })
+            if ok:
+                s.update(failures=0, opens=0, open_until=0, probe_until=0)
+                return
+
+            st['failures'] += 1
+            s['failures'] += 1
+            if retry_after > 0 or s['open_until'] > 0 or s['failures'] >= FAILURE_THRESHOLD:
+                backoff = max(min(BACKOFF_MAX, BACKOFF_BASE * (2 ** s['opens'])), retry_after)
+                s.update(open_until=now + backoff, probe_until=0, opens=s['opens'] + 1)
+                logger.warning("[META] Circuit open for %s — backing off %.0fs", host, backoff)
+
+    #  Metrics
+
+    def stats(self, limit: int = 50) -> List[Dict[str, Any]]:
+        rows = []
+        if redis_client.available:
+            hosts = redis_client._exec(
+                redis_client._client.zrevrange, HOSTS_KEY, 0, limit - 1
+            ) or []
+            for host in hosts:
+                raw = redis_client._exec(redis_client._client.hgetall, STATS_KEY.format(host)) or {}
+                state = redis_client._exec(redis_client._client.hgetall, STATE_KEY.format(host)) or {}
+                rows.append(_summarize(host, raw, state))
+        else:
+            with self._lock:
+                for host, raw in self._local_stats.items():
+                    rows.append(_summarize(host, raw, self._local_state.get(host, {})))
+            rows.sort(key=lambda r: r['last_at'] or 0, reverse=True)
+            rows = rows[:limit]
+        return rows
+
+
+def _summarize(host: str, raw: Dict, state: Dict) -> Dict[str, Any]:
+    requests_ = int(float(raw.get('requests', 0) or 0))
+    failures = int(float(raw.get('failures', 0) or 0))
+    total_ms = float(raw.get('latency_ms_total', 0) or 0)
+    open_until = float(state.get('open_until', 0) or 0)
+    now = time.time()
+
+    if open_until > now:
+        circuit = 'open'
+    elif open_until > 0:
+        circuit = 'half_open'
+    else:
+        circuit = 'closed'
+
+    return {
+        'domain': host,
+        'requests': requests_,
+        'failures': failures,
+        'failure_rate': round(failures / requests_, 3) if requests_ else 0,
+        'avg_latency_ms': round(total_ms / requests_, 1) if requests_ else None,
+        'last_latency_ms': float(raw['last_latency_ms']) if raw.get('last_latency_ms') else None,
+        'last_status': raw.get('last_status'),
+        'last_at': float(raw['last_at']) if raw.get('last_at') else None,
+        'circuit': circuit,
+        'retry_in': round(open_until - now, 1) if circuit == 'open' else 0,
+    }
+
+
+def is_host_failure(status: Optional[int]) -> bool:
+    """429 and 5xx say something about the host; other 4xx only about the URL."""
+    return status is not None and (status == 429 or status >= 500)
+
+
+def parse_retry_after(value: Optional[str]) -> float:
+    if not value:
+        return 0
+    try:
+        return min(float(value), BACKOFF_MAX)
+    except ValueError:
+        return 0
+
+
+domain_controller = DomainController()
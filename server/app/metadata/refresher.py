@@ -0,0 +1,269 @@
+# server/app/metadata/refresher.py
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import text
+
+from app.extensions import db
+from app.metadata.store import save_page_metadata_batch, link_ids_for
+from app.cache.invalidation import on_related_change
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('METADATA_REFRESH_ENABLED', 'false').lower() == 'true'
+BUDGET_PER_MINUTE = int(os.environ.get('METADATA_REFRESH_BUDGET', '30'))
+CYCLE_SECONDS = 60
+WRITE_BATCH = 25
+LOCK_KEY = 12346          # 12345 is the migration lock
+
+HOUR = 3600
+
+# Base max age per detected content_type
+TIERS = {
+    'product': 24 * HOUR,
+    'event': 24 * HOUR,
+    'video': 7 * 24 * HOUR,
+    'audio': 7 * 24 * HOUR,
+    'profile': 7 * 24 * HOUR,
+    'website': 7 * 24 * HOUR,
+    'article': 30 * 24 * HOUR,
+    'recipe': 30 * 24 * HOUR,
+    'image': 90 * 24 * HOUR,
+    'pdf': 90 * 24 * HOUR,
+    'file': 90 * 24 * HOUR,
+}
+DEFAULT_TIER = 7 * 24 * HOUR
+FAILED_MAX_AGE = 24 * HOUR   # pages whose last extraction fell back
+
+# Popularity scaling of the base age
+HOT_CLICKS = 50
+HOT_LINKS = 5
+HOT_RECENT = timedelta(days=7)
+COLD_AGE = timedelta(days=90)
+HOT_FACTOR = 0.5
+COLD_FACTOR = 3.0
+
+MIN_MAX_AGE = min(min(TIERS.values()) * HOT_FACTOR, FAILED_MAX_AGE * HOT_FACTOR)
+
+
+def _max_age_sql() -> str:
+    """
+    Seconds a page may go unrefreshed: its content_type tier (capped at
+    FAILED_MAX_AGE when the last extraction fell back), halved for hot
+    pages and tripled for cold ones. Built from the constants above.
+    """
+    tiers = ' '.join(f"WHEN '{t}' THEN {int(age)}" for t, age in TIERS.items())
+    base = f"CASE content_type {tiers} ELSE {int(DEFAULT_TIER)} END"
+    base = f"CASE WHEN ok THEN {base} ELSE LEAST({base}, {int(FAILED_MAX_AGE)}) END"
+    factor = (
+        f"CASE WHEN clicks >= {HOT_CLICKS} OR links >= {HOT_LINKS} OR last_saved > :hot_since THEN {HOT_FACTOR}"
+        f" WHEN clicks = 0 AND (last_saved IS NULL OR last_saved < :cold_before) THEN {COLD_FACTOR}"
+        f" ELSE 1 END"
+    )
+    return f"({base}) * ({factor})"
+
+
+# Tiers are applied before the LIMIT, so pages that aren't due yet can't
+# crowd out due ones fetched more recently
+_CANDIDATES_SQL = text(f"""
+    WITH stale AS (
+        SELECT p.url_hash, p.fetched_at,
+               p.data->>'content_type' AS content_type,
+               COALESCE((p.data->>'extraction_success')::boolean, false) AS ok,
+               s.url, s.clicks, s.links, s.last_saved
+        FROM page_metadata p
+        CROSS JOIN LATERAL (
+            SELECT (array_agg(l.original_url ORDER BY l.created_at DESC))[1] AS url,
+                   COALESCE(SUM(l.click_count), 0) AS clicks,
+                   COUNT(*) AS links,
+                   MAX(l.created_at) AS last_saved
+            FROM links l
+            WHERE l.url_hash = p.url_hash AND l.soft_deleted = false
+        ) s
+        WHERE p.fetched_at < :cutoff AND s.links > 0
+    ), ranked AS (
+        SELECT url_hash, url, ok,
+               EXTRACT(EPOCH FROM (:now - fetched_at)) / ({_max_age_sql()}) AS overdue
+        FROM stale
+    )
+    SELECT url_hash, url, ok, overdue
+    FROM ranked
+    WHERE overdue >= 1
+    ORDER BY overdue DESC
+    LIMIT :n
+""")
+
+
+def due_pages(budget: int, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Stale pages ordered by how far past their tier's max age they are."""
+    now = now or datetime.utcnow()
+    rows = db.session.execute(_CANDIDATES_SQL, {
+        'now': now,
+        'cutoff': now - timedelta(seconds=MIN_MAX_AGE),
+        'hot_since': now - HOT_RECENT,
+        'cold_before': now - COLD_AGE,
+        'n': budget,
+    }).fetchall()
+    db.session.commit()
+    return [{'url_hash': r.url_hash, 'url': r.url, 'ok': r.ok, 'overdue': float(r.overdue)} for r in rows]
+
+
+def refresh_due(budget: int = BUDGET_PER_MINUTE) -> Dict[str, int]:
+    """One pass: fetch up to budget stale pages and write them back in batches."""
+    from app.metadata.service import extract_metadata
+
+    stats = {'due': 0, 'refreshed': 0, 'failed': 0}
+    pages = due_pages(budget)
+    stats['due'] = len(pages)
+
+    batch, failed = [], []
+    for page in pages:
+        try:
+            meta = extract_metadata(page['url'], force_refresh=True)
+        except Exception as e:
+            logger.warning("[META] Refresh failed for %s: %s", page['url'], e)
+            meta = None
+
+        # Never replace a good extraction with a fallback; just push the
+        # page back a full tier so one bad host can't pin the queue head.
+        if meta and (meta.get('extraction_success') or not page['ok']):
+            batch.append((page['url_hash'], page['url'], meta))
+        else:
+            failed.append(page['url_hash'])
+
+        if len(batch) >= WRITE_BATCH:
+            stats['refreshed'] += _flush(batch)
+            batch = []
+
+    stats['refreshed'] += _flush(batch)
+    stats['failed'] = _touch(failed)
+    return stats
+
+
+def _flush(batch) -> int:
+    if not batch:
+        return 0
+    try:
+        n = save_page_metadata_batch(batch)
+        db.session.commit()
+        on_related_change(link_ids_for(h for h, _, _ in batch))
+        return n
+    except Exception as e:
+        db.session.rollback()
+        logger.error("[META] Refresh write failed: %s", e)
+        return 0
+
+
+def _touch(hashes: List[str]) -> int:
+    if not hashes:
+        return 0
+    try:
+        db.session.execute(
+            text("UPDATE page_metadata SET fetched_at = :now WHERE url_hash = ANY(:h)"),
+            {'now': datetime.utcnow(), 'h': hashes},
+        )
+        db.session.commit()
+        return len(hashes)
+    except Exception as e:
+        db.session.rollback()
+        logger.error("[META] Refresh touch failed: %s", e)
+        return 0
+
+
+class MetadataRefresher:
+    """
+    Periodic refresher. Every process may run one; a session-level Postgres
+    advisory lock held on a dedicated connection elects the single leader
+    that actually fetches. Session locks need a session-mode connection, so
+    behind a transaction pooler run the CLI worker instead.
+    """
+
+    def __init__(self):
+        self._thread = None
+        self._stop = threading.Event()
+        self._conn = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._conn is not None
+
+    def start(self, app):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run_forever, args=(app,), daemon=True, name='metadata-refresher',
+        )
+        self._thread.start()
+        logger.info("[META] Refresher started (budget %d/min)", BUDGET_PER_MINUTE)
+
+    def stop(self):
+        self._stop.set()
+
+    def run_forever(self, app, budget: int = BUDGET_PER_MINUTE):
+        with app.app_context():
+            while not self._stop.is_set():
+                started = time.monotonic()
+                try:
+                    if self._ensure_leader():
+                        stats = refresh_due(budget)
+                        if stats['due']:
+                            logger.info(
+                                "[META] Refreshed %d/%d stale pages (%d failed)",
+                                stats['refreshed'], stats['due'], stats['failed'],
+                            )
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error("[META] Refresh cycle failed: %s", e)
+                finally:
+                    db.session.remove()
+
+                self._stop.wait(max(1.0, CYCLE_SECONDS - (time.monotonic() - started)))
+            self._release()
+
+    def _ensure_leader(self) -> bool:
+        if self._conn is not None:
+            try:
+                self._conn.execute(text("SELECT 1"))
+                self._conn.commit()
+                return True
+            except Exception:
+                logger.warning("[META] Lost refresher leader connection")
+                self._release()
+
+        conn = db.engine.connect()
+        try:
+            got = conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {'k': LOCK_KEY}).scalar()
+            conn.commit()
+        except Exception:
+            conn.close()
+            return False
+        if not got:
+            conn.close()
+            return False
+        self._conn = conn
+        logger.info("[META] Refresher leadership acquired")
+        return True
+
+    def _release(self):
+        if self._conn is None:
+            return
+        try:
+            self._conn.execute(text("SELECT pg_advisory_unlock(:k)"), {'k': LOCK_KEY})
+            self._conn.commit()
+        except Exception:
+            pass
+        finally:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+
+refresher = MetadataRefresher()
@@ -4,7 +4,7 @@ from flask import request, Blueprint
 from app.auth.middleware import require_auth
 from app.auth.utils import get_current_user_id as uid
 from app.responses import success_response, error_response
-from app.metadata.service import extract_metadata, refresh_link_metadata, batch_extract
+from app.metadata.service import extract_metadata, refresh_link_metadata, batch_extract, preview_of
 import logging
 
 logger = logging.getLogger(__name__)
@@ -61,15 +61,7 @@ def preview():
         return error_response('Invalid URL', 400)
     try:
         meta = extract_metadata(url, force_refresh=False)
-        preview_fields = {
-            'title', 'description', 'image', 'images', 'favicon', 'favicons',
-            'domain', 'type', 'content_type', 'site_name', 'author',
-            'published_at', 'reading_time_minutes', 'word_count',
-            'theme_color', 'locale',
-        }
-        return success_response({
-            'preview': {k: meta.get(k) for k in preview_fields if meta.get(k) is not None}
-        })
+        return success_response({'preview': preview_of(meta)})
     except Exception as e:
         logger.error("Preview failed for %s: %s", url, e)
-        return error_response('Preview failed', 500)
\ No newline at end of file
+        return error_response('Preview failed', 500)
@@ -2,19 +2,25 @@
 
 import re
 import json
-import hashlib
+import asyncio
 import logging
 import random
+import time
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 from urllib.parse import urljoin, urlparse, urlunparse
 
 import requests
-from bs4 import BeautifulSoup, Comment
 
 from app.extensions import db, redis_client
 from app.models import Link
-from app.utils.url import extract_domain
+from app.utils.url import extract_domain, url_hash
+from app.metadata.store import save_page_metadata, page_metadata_for, link_ids_for
+from app.metrics import METADATA_FETCH
+from app.cache.invalidation import on_link_edit, on_related_change
+from app.metadata.domains import (
+    domain_controller, ALLOW, is_host_failure, parse_retry_after,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -53,14 +59,31 @@ DATE_PATTERNS = [
 STRIP_TAGS = {'script', 'style', 'nav', 'footer', 'header', 'aside', 'noscript', 'iframe'}
 
 
-def _cache_key(url: str) -> str:
-    return f"meta:v2:{hashlib.sha256(url.encode()).hexdigest()[:24]}"
+def _cache_key(entry: str) -> str:
+    return f"meta:v3:{entry[:24]}"
+
+
+def _alias_key(h: str) -> str:
+    return f"meta:alias:{h[:24]}"
 
 
 def _get_cached(url: str) -> Optional[Dict]:
     if not redis_client.available:
         return None
-    raw = redis_client.get(_cache_key(url))
+    h = url_hash(url)
+    entry = redis_client.get(_alias_key(h)) or h
+    return _decode_cached(redis_client.get(_cache_key(entry)))
+
+
+async def _get_cached_async(url: str, cache) -> Optional[Dict]:
+    if not cache.available:
+        return None
+    h = url_hash(url)
+    entry = await cache.get(_alias_key(h)) or h
+    return _decode_cached(await cache.get(_cache_key(entry)))
+
+
+def _decode_cached(raw: Optional[str]) -> Optional[Dict]:
     if not raw:
         return None
     try:
@@ -70,11 +93,35 @@ def _get_cached(url: str) -> Optional[Dict]:
 
 
 def _set_cached(url: str, meta: Dict):
+    """
+    Store one entry per canonical page and point every URL we saw on the way
+    (the requested URL, the final redirect target and a same-host
+    <link rel=canonical>) at it through the alias table.
+    """
     if not redis_client.available:
         return
-    ttl = CACHE_TTL if meta.get('extraction_success') else ERROR_TTL
+    requested = url_hash(url)
+
+    if not meta.get('extraction_success'):
+        try:
+            redis_client.setex(_cache_key(requested), ERROR_TTL, json.dumps(meta, default=str))
+        except Exception:
+            pass
+        return
+
+    final_url = meta.get('url') or url
+    canonical = meta.get('canonical_url')
+    if canonical and extract_domain(canonical) != extract_domain(final_url):
+        # A page may not claim another site's URL — that would poison its cache
+        canonical = None
+
+    entry = url_hash(canonical or final_url)
+    aliases = {requested, url_hash(final_url)} - {entry}
+
     try:
-        redis_client.setex(_cache_key(url), ttl, json.dumps(meta, default=str))
+        redis_client.setex(_cache_key(entry), CACHE_TTL, json.dumps(meta, default=str))
+        for h in aliases:
+            redis_client.setex(_alias_key(h), CACHE_TTL, entry)
     except Exception:
         pass
 
@@ -118,7 +165,7 @@ def _is_valid_image(url: Optional[str]) -> bool:
     return True
 
 
-#  Main entry 
+#  Main entry
 
 def extract_metadata(url: str, force_refresh: bool = False) -> Dict[str, Any]:
     if not force_refresh:
@@ -127,8 +174,9 @@ def extract_metadata(url: str, force_refresh: bool = False) -> Dict[str, Any]:
             cached['_from_cache'] = True
             return cached
 
-    domain = extract_domain(url)
-    fallback = _build_fallback(url, domain)
+    fetch = prepare_fetch(url)
+    if fetch.skipped:
+        return fetch.fallback
 
     try:
         session = requests.Session()
@@ -137,22 +185,114 @@ def extract_metadata(url: str, force_refresh: bool = False) -> Dict[str, Any]:
         resp.raise_for_status()
     except requests.exceptions.TooManyRedirects:
         logger.warning("Too many redirects: %s", url)
-        _set_cached(url, fallback)
-        return fallback
+        return fetch_failed(fetch, 'redirects')
+    except requests.exceptions.HTTPError as e:
+        logger.warning("Fetch failed for %s: %s", url, e)
+        if e.response is None:
+            return fetch_failed(fetch, 'http_error')
+        return fetch_failed(fetch, 'http_error', e.response.status_code,
+                            e.response.headers.get('Retry-After'))
+    except Exception as e:
+        logger.warning("Fetch failed for %s: %s", url, e)
+        return fetch_failed(fetch, 'error')
+
+    return fetch_succeeded(fetch, resp.status_code, resp.headers, resp.text, str(resp.url))
+
+
+async def extract_metadata_async(url: str, http, cache, force_refresh: bool = False) -> Dict[str, Any]:
+    """
+    extract_metadata for the ASGI app: the cache read and the page fetch
+    are awaited (http is an httpx.AsyncClient, cache an AsyncRedis), the
+    politeness gate, parsing and cache writes run in a thread.
+    """
+    import httpx
+
+    if not force_refresh:
+        cached = await _get_cached_async(url, cache)
+        if cached:
+            cached['_from_cache'] = True
+            return cached
+
+    fetch = await asyncio.to_thread(prepare_fetch, url)
+    if fetch.skipped:
+        return fetch.fallback
+
+    try:
+        resp = await http.get(url, headers=_headers())
+        resp.raise_for_status()
+    except httpx.TooManyRedirects:
+        logger.warning("Too many redirects: %s", url)
+        return await asyncio.to_thread(fetch_failed, fetch, 'redirects')
+    except httpx.HTTPStatusError as e:
+        logger.warning("Fetch failed for %s: %s", url, e)
+        return await asyncio.to_thread(fetch_failed, fetch, 'http_error', e.response.status_code,
+                                       e.response.headers.get('Retry-After'))
     except Exception as e:
         logger.warning("Fetch failed for %s: %s", url, e)
-        _set_cached(url, fallback)
-        return fallback
+        return await asyncio.to_thread(fetch_failed, fetch, 'error')
+
+    return await asyncio.to_thread(
+        fetch_succeeded, fetch, resp.status_code, resp.headers, resp.text, str(resp.url),
+    )
+
+
+#  Fetch stages (shared by the sync and async entry points)
+
+class Fetch:
+    __slots__ = ('url', 'domain', 'host', 'fallback', 'skipped', 'start')
+
+    def __init__(self, url: str):
+        self.url = url
+        self.domain = extract_domain(url)
+        self.host = urlparse(url).hostname or ''
+        self.fallback = _build_fallback(url, self.domain)
+        self.skipped = False
+        self.start = 0.0
+
+
+def prepare_fetch(url: str) -> Fetch:
+    fetch = Fetch(url)
+    outcome, wait = domain_controller.acquire(fetch.host)
+    if outcome != ALLOW:
+        # Host is failing or over its politeness budget — don't pin this
+        # request on it and don't poison the per-URL cache either.
+        logger.info("Skipping fetch for %s: host %s (%.1fs)", url, outcome, wait)
+        fetch.skipped = True
+    fetch.start = time.monotonic()
+    return fetch
+
+
+def fetch_failed(fetch: Fetch, outcome: str, status: Optional[int] = None,
+                 retry_after: Optional[str] = None) -> Dict[str, Any]:
+    elapsed = time.monotonic() - fetch.start
+    METADATA_FETCH.labels(outcome).observe(elapsed)
+    if outcome == 'redirects':
+        domain_controller.record(fetch.host, True, elapsed)
+    elif outcome == 'http_error':
+        domain_controller.record(
+            fetch.host, not is_host_failure(status), elapsed, status,
+            parse_retry_after(retry_after) if status == 429 else 0,
+        )
+    else:
+        domain_controller.record(fetch.host, False, elapsed)
+    _set_cached(fetch.url, fetch.fallback)
+    return fetch.fallback
+
+
+def fetch_succeeded(fetch: Fetch, status: int, headers, text: str, final_url: str) -> Dict[str, Any]:
+    url, domain = fetch.url, fetch.domain
+    elapsed = time.monotonic() - fetch.start
+    METADATA_FETCH.labels('ok').observe(elapsed)
+    domain_controller.record(fetch.host, True, elapsed, status)
 
     try:
-        content_type = resp.headers.get('Content-Type', '')
+        content_type = headers.get('Content-Type', '')
         if 'text/html' not in content_type and 'application/xhtml' not in content_type:
-            meta = _handle_non_html(url, resp, domain)
+            meta = _handle_non_html(url, headers, domain)
             _set_cached(url, meta)
             return meta
 
-        soup = BeautifulSoup(resp.text, 'html.parser')
-        final_url = str(resp.url)
+        soup = _parse_html(text)
 
         meta = {}
         _extract_jsonld(soup, meta)
@@ -179,8 +319,8 @@ def extract_metadata(url: str, force_refresh: bool = False) -> Dict[str, Any]:
 
     except Exception as e:
         logger.error("Parse failed for %s: %s", url, e)
-        _set_cached(url, fallback)
-        return fallback
+        _set_cached(url, fetch.fallback)
+        return fetch.fallback
 
 
 def _build_fallback(url: str, domain: str) -> Dict[str, Any]:
@@ -208,9 +348,9 @@ def _google_favicons(domain: str) -> List[Dict]:
     ]
 
 
-def _handle_non_html(url: str, resp, domain: str) -> Dict[str, Any]:
-    ct = resp.headers.get('Content-Type', '')
-    cl = resp.headers.get('Content-Length')
+def _handle_non_html(url: str, headers, domain: str) -> Dict[str, Any]:
+    ct = headers.get('Content-Type', '')
+    cl = headers.get('Content-Length')
     file_type = 'file'
     if 'image/' in ct:
         file_type = 'image'
@@ -240,9 +380,15 @@ def _handle_non_html(url: str, resp, domain: str) -> Dict[str, Any]:
     }
 
 
-#  JSON-LD 
+def _parse_html(html: str) -> 'BeautifulSoup':
+    # bs4 is imported on first fetch rather than at boot
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, 'html.parser')
+
+
+#  JSON-LD
 
-def _extract_jsonld(soup: BeautifulSoup, meta: Dict):
+def _extract_jsonld(soup: 'BeautifulSoup', meta: Dict):
     for script in soup.find_all('script', type='application/ld+json'):
         try:
             raw = script.string
@@ -331,7 +477,7 @@ def _extract_jsonld(soup: BeautifulSoup, meta: Dict):
 
 #  Open Graph 
 
-def _extract_opengraph(soup: BeautifulSoup, meta: Dict, base_url: str):
+def _extract_opengraph(soup: 'BeautifulSoup', meta: Dict, base_url: str):
     og_map = {
         'og:title': 'title',
         'og:description': 'description',
@@ -389,7 +535,7 @@ def _extract_opengraph(soup: BeautifulSoup, meta: Dict, base_url: str):
 
 #  Twitter Cards 
 
-def _extract_twitter(soup: BeautifulSoup, meta: Dict, base_url: str):
+def _extract_twitter(soup: 'BeautifulSoup', meta: Dict, base_url: str):
     tw_map = {
         'twitter:title': 'title',
         'twitter:description': 'description',
@@ -418,7 +564,7 @@ def _extract_twitter(soup: BeautifulSoup, meta: Dict, base_url: str):
 
 #  Standard HTML tags 
 
-def _extract_standard(soup: BeautifulSoup, meta: Dict, base_url: str):
+def _extract_standard(soup: 'BeautifulSoup', meta: Dict, base_url: str):
     if not meta.get('title'):
         el = soup.find('title')
         if el:
@@ -489,7 +635,7 @@ def _extract_standard(soup: BeautifulSoup, meta: Dict, base_url: str):
 
 #  Favicons 
 
-def _extract_favicons(soup: BeautifulSoup, meta: Dict, base_url: str, domain: str):
+def _extract_favicons(soup: 'BeautifulSoup', meta: Dict, base_url: str, domain: str):
     favicons = []
     seen = set()
 
@@ -551,7 +697,7 @@ def _extract_favicons(soup: BeautifulSoup, meta: Dict, base_url: str, domain: st
 
 #  Dates 
 
-def _extract_dates(soup: BeautifulSoup, meta: Dict):
+def _extract_dates(soup: 'BeautifulSoup', meta: Dict):
     if not meta.get('published_at'):
         for sel in [
             'time[datetime]',
@@ -601,7 +747,7 @@ def _normalize_date(s: str) -> Optional[str]:
 
 #  Content Metrics 
 
-def _extract_content_metrics(soup: BeautifulSoup, meta: Dict):
+def _extract_content_metrics(soup: 'BeautifulSoup', meta: Dict):
     article = soup.find('article') or soup.find('main') or soup.find('[role="main"]')
     container = article or soup.body
 
@@ -611,6 +757,7 @@ def _extract_content_metrics(soup: BeautifulSoup, meta: Dict):
     for tag in container.find_all(STRIP_TAGS):
         tag.decompose()
 
+    from bs4 import Comment
     for comment in container.find_all(string=lambda t: isinstance(t, Comment)):
         comment.extract()
 
@@ -638,7 +785,7 @@ def _extract_content_metrics(soup: BeautifulSoup, meta: Dict):
 
 #  RSS/Atom feeds 
 
-def _extract_feeds(soup: BeautifulSoup, meta: Dict, base_url: str):
+def _extract_feeds(soup: 'BeautifulSoup', meta: Dict, base_url: str):
     feeds = []
     for link in soup.find_all('link', type=True):
         link_type = link.get('type', '')
@@ -656,7 +803,7 @@ def _extract_feeds(soup: BeautifulSoup, meta: Dict, base_url: str):
 
 #  Canonical URL 
 
-def _extract_canonical(soup: BeautifulSoup, meta: Dict, base_url: str):
+def _extract_canonical(soup: 'BeautifulSoup', meta: Dict, base_url: str):
     if not meta.get('canonical_url'):
         link = soup.find('link', rel='canonical')
         if link and link.get('href'):
@@ -665,7 +812,7 @@ def _extract_canonical(soup: BeautifulSoup, meta: Dict, base_url: str):
 
 #  Locale 
 
-def _extract_locale(soup: BeautifulSoup, meta: Dict):
+def _extract_locale(soup: 'BeautifulSoup', meta: Dict):
     if not meta.get('locale'):
         html = soup.find('html')
         if html:
@@ -682,7 +829,7 @@ def _extract_locale(soup: BeautifulSoup, meta: Dict):
 
 #  Content Type Detection 
 
-def _detect_content_type(meta: Dict, soup: BeautifulSoup) -> str:
+def _detect_content_type(meta: Dict, soup: 'BeautifulSoup') -> str:
     og_type = (meta.get('type') or '').lower()
     jsonld = (meta.get('jsonld_type') or '').lower()
 
@@ -760,20 +907,41 @@ def refresh_link_metadata(link_id: int, user_id: str) -> Dict[str, Any]:
         return {'error': 'Link not found'}
     try:
         meta = extract_metadata(link.original_url, force_refresh=True)
-        link.metadata_ = link.metadata_ or {}
-        link.metadata_['page_metadata'] = meta
-
-        if not link.title and meta.get('title'):
+        if not meta.get('extraction_success'):
+            # Failed or skipped (circuit open, domain gate): the shared row
+            # serves every link to this page, so keep what it has
+            return {'success': True, 'refreshed': False, 'metadata': page_metadata_for(link)}
+        save_page_metadata(link.original_url, meta)
+        if link.metadata_ and 'page_metadata' in link.metadata_:
+            link.metadata_ = {k: v for k, v in link.metadata_.items() if k != 'page_metadata'}
+
+        titled = not link.title and meta.get('title')
+        if titled:
             link.title = meta['title'][:500]
 
         db.session.commit()
-        return {'success': True, 'metadata': meta}
+        on_related_change(link_ids_for([link.url_hash]) or [link.id], user_id)
+        if titled:
+            on_link_edit(user_id, link)
+        return {'success': True, 'refreshed': True, 'metadata': meta}
     except Exception as e:
         return {'error': str(e)}
 
 
 #  Batch extraction 
 
+PREVIEW_FIELDS = frozenset({
+    'title', 'description', 'image', 'images', 'favicon', 'favicons',
+    'domain', 'type', 'content_type', 'site_name', 'author',
+    'published_at', 'reading_time_minutes', 'word_count',
+    'theme_color', 'locale',
+})
+
+
+def preview_of(meta: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: meta.get(k) for k in PREVIEW_FIELDS if meta.get(k) is not None}
+
+
 def batch_extract(urls: List[str], force_refresh: bool = False) -> List[Dict[str, Any]]:
     results = []
     for url in urls[:20]:
@@ -782,4 +950,18 @@ def batch_extract(urls: List[str], force_refresh: bool = False) -> List[Dict[str
             results.append({'url': url, 'metadata': meta, 'success': True})
         except Exception as e:
             results.append({'url': url, 'metadata': None, 'success': False, 'error': str(e)})
-    return results
\ No newline at end of file
+    return results
+
+async def batch_extract_async(urls: List[str], http, cache, force_refresh: bool = False) -> List[Dict[str, Any]]:
+    """batch_extract with the fetches in flight concurrently."""
+    urls = urls[:20]
+    metas = await asyncio.gather(
+        *(extract_metadata_async(url.strip(), http, cache, force_refresh=force_refresh) for url in urls),
+        return_exceptions=True,
+    )
+    return [
+        {'url': url, 'metadata': None, 'success': False, 'error': str(meta)}
+        if isinstance(meta, Exception) else
+        {'url': url, 'metadata': meta, 'success': True}
+        for url, meta in zip(urls, metas)
+    ]
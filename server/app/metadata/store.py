@@ -0,0 +1,145 @@
+# server/app/metadata/store.py
+
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional, Iterable, List, Tuple
+
+from flask import g, has_app_context
+from sqlalchemy import inspect, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.extensions import db
+from app.models import Link, PageMetadata
+from app.utils.url import url_hash, canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH = 500
+
+
+#  Writes
+
+def save_page_metadata(url: str, meta: Dict[str, Any]) -> Optional[str]:
+    """Upserts the shared row for url's canonical form. Returns its hash."""
+    if not url or not meta:
+        return None
+    h = url_hash(url)
+    data = dict(meta)
+    now = datetime.utcnow()
+
+    stmt = insert(PageMetadata).values(
+        url_hash=h, url=canonicalize_url(url), data=data,
+        fetched_at=now, created_at=now,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PageMetadata.url_hash],
+        set_={'data': stmt.excluded.data, 'fetched_at': stmt.excluded.fetched_at},
+    )
+    db.session.execute(stmt)
+
+    memo = _memo()
+    if memo is not None:
+        memo[h] = data
+    return h
+
+
+def save_page_metadata_batch(rows: List[Tuple[str, str, Dict[str, Any]]]) -> int:
+    """Upserts (url_hash, url, meta) rows in one statement."""
+    if not rows:
+        return 0
+    now = datetime.utcnow()
+    stmt = insert(PageMetadata).values([
+        {'url_hash': h, 'url': canonicalize_url(url), 'data': dict(meta),
+         'fetched_at': now, 'created_at': now}
+        for h, url, meta in rows
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PageMetadata.url_hash],
+        set_={'data': stmt.excluded.data, 'fetched_at': stmt.excluded.fetched_at},
+    )
+    db.session.execute(stmt)
+    return len(rows)
+
+
+#  Reads
+
+def page_metadata_statement(hashes: List[str]):
+    return select(PageMetadata.url_hash, PageMetadata.data).where(PageMetadata.url_hash.in_(hashes))
+
+
+def load_page_metadata(hashes: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    hashes = [h for h in set(hashes) if h]
+    if not hashes:
+        return {}
+    rows = db.session.execute(page_metadata_statement(hashes)).all()
+    return {r.url_hash: r.data or {} for r in rows}
+
+
+def link_ids_for(hashes: Iterable[str]) -> List[int]:
+    """Every user's links to these pages, whose fragments show their metadata."""
+    hashes = [h for h in set(hashes) if h]
+    if not hashes:
+        return []
+    return list(db.session.execute(select(Link.id).where(Link.url_hash.in_(hashes))).scalars())
+
+
+async def load_page_metadata_async(session, hashes: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    load_page_metadata over an AsyncSession. The rows also seed this app
+    context's memo, so page_metadata_for() on these links won't query.
+    """
+    hashes = [h for h in set(hashes) if h]
+    if not hashes:
+        return {}
+    rows = (await session.execute(page_metadata_statement(hashes))).all()
+    found = {r.url_hash: r.data or {} for r in rows}
+    memo = _memo()
+    if memo is not None:
+        for h in hashes:
+            memo[h] = found.get(h)
+    return found
+
+
+def page_metadata_for(link: Link) -> Dict[str, Any]:
+    """
+    Shared metadata for a link. The first lookup in an app context loads
+    rows for every Link already in the session, so serializing a page of
+    links costs one query instead of one per link.
+    """
+    legacy = (link.metadata_ or {}).get('page_metadata')
+    h = link.url_hash
+    if not h:
+        return legacy or {}
+
+    memo = _memo()
+    if memo is None:
+        return load_page_metadata([h]).get(h) or legacy or {}
+
+    if h not in memo:
+        pending = [h] + list(_session_hashes(memo) - {h})[:MAX_BATCH - 1]
+        found = load_page_metadata(pending)
+        for p in pending:
+            memo[p] = found.get(p)
+
+    return memo[h] or legacy or {}
+
+
+def _session_hashes(memo: Dict) -> set:
+    # Read loaded state directly: touching attributes on expired instances
+    # would issue a refresh per link, which is what this avoids.
+    hashes = set()
+    for obj in list(db.session.identity_map.values()):
+        if isinstance(obj, Link):
+            h = inspect(obj).dict.get('url_hash')
+            if h and h not in memo:
+                hashes.add(h)
+    return hashes
+
+
+def _memo() -> Optional[Dict[str, Any]]:
+    if not has_app_context():
+        return None
+    memo = getattr(g, '_page_metadata', None)
+    if memo is None:
+        memo = g._page_metadata = {}
+    return memo
@@ -0,0 +1,200 @@
+# server/app/metrics.py
+
+import os
+import time
+import logging
+import hmac
+
+from flask import g, request, Response, current_app
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST,
+)
+from prometheus_client import multiprocess
+
+logger = logging.getLogger(__name__)
+
+# Set by gunicorn.conf.py in the master so every worker writes its samples
+# to shared mmap files and any worker can serve the aggregate.
+MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+_LATENCY_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+_FAST_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, 1)
+
+HTTP_LATENCY = Histogram(
+    'savlink_http_request_duration_seconds', 'Request latency',
+    ['blueprint', 'endpoint', 'method', 'status'], buckets=_LATENCY_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    'savlink_db_pool_checked_out', 'Connections checked out', ['engine'],
+    multiprocess_mode='livesum',
+)
+DB_POOL_OVERFLOW = Gauge(
+    'savlink_db_pool_overflow', 'Overflow connections in use', ['engine'],
+    multiprocess_mode='livesum',
+)
+DB_POOL_WAIT = Histogram(
+    'savlink_db_pool_wait_seconds', 'Time spent waiting for a pooled connection',
+    ['engine', 'endpoint'], buckets=_FAST_BUCKETS,
+)
+DB_POOL_HOLD = Histogram(
+    'savlink_db_pool_hold_seconds', 'Time a connection stays checked out',
+    ['engine', 'endpoint'], buckets=_LATENCY_BUCKETS,
+)
+DB_POOL_TIMEOUTS = Counter(
+    'savlink_db_pool_timeouts_total', 'Checkouts that gave up waiting', ['engine', 'endpoint'],
+)
+DB_POOL_MAX_OVERFLOW = Gauge(
+    'savlink_db_pool_max_overflow', 'Overflow connections allowed (adaptive sizing)', ['engine'],
+    multiprocess_mode='livesum',
+)
+REDIS_LATENCY = Histogram(
+    'savlink_redis_command_duration_seconds', 'Redis command latency', ['command'],
+    buckets=_FAST_BUCKETS,
+)
+REDIS_ERRORS = Counter('savlink_redis_errors_total', 'Redis command errors', ['command'])
+CACHE_LOOKUPS = Counter(
+    'savlink_cache_lookups_total', 'Cache lookups by layer result', ['prefix', 'result'],
+)
+ACTIVITY_QUEUE_DEPTH = Gauge(
+    'savlink_activity_queue_depth', 'Activity log entries waiting to be written',
+    multiprocess_mode='livesum',
+)
+ACTIVITY_DROPPED = Counter('savlink_activity_dropped_total', 'Activity log entries dropped')
+ADMISSION_WAIT = Histogram(
+    'savlink_admission_wait_seconds', 'Time queued for an admission slot', ['priority'],
+    buckets=(.001, .005, .01, .025, .05, .1, .25, .5, 1),
+)
+ADMISSION_REJECTED = Counter(
+    'savlink_admission_rejected_total', 'Requests shed with 503', ['priority'],
+)
+METADATA_FETCH = Histogram(
+    'savlink_metadata_fetch_seconds', 'Metadata page fetch latency', ['outcome'],
+    buckets=(.1, .25, .5, 1, 2, 4, 8, 15),
+)
+
+
+#  Recording helpers (kept cheap: one mmap write per call)
+
+def cache_prefix(key: str) -> str:
+    """'sl:dash:<uid>:home' -> 'sl:dash'; keeps label cardinality bounded."""
+    parts = key.split(':', 2)
+    return ':'.join(parts[:2])
+
+
+def observe_cache(key: str, result: str):
+    CACHE_LOOKUPS.labels(cache_prefix(key), result).inc()
+
+
+def observe_redis(command: str, seconds: float, error: bool):
+    REDIS_LATENCY.labels(command).observe(seconds)
+    if error:
+        REDIS_ERRORS.labels(command).inc()
+
+
+def instrument_engine(engine, name: str):
+    """
+    Pool checkout/overflow gauges, plus checkout wait and time-in-use per
+    endpoint, for one engine. Also feeds app.pool's telemetry.
+    """
+    from sqlalchemy import event, exc
+    from app.pool import pool_telemetry, current_endpoint
+
+    checked_out = DB_POOL_CHECKED_OUT.labels(name)
+    overflow = DB_POOL_OVERFLOW.labels(name)
+
+    @event.listens_for(engine, 'checkout')
+    def _checkout(dbapi_conn, record, proxy):
+        checked_out.inc()
+        pool = engine.pool
+        overflow.set(max(0, pool.overflow()))
+        endpoint = current_endpoint()
+        record.info['pool_checkout'] = (time.perf_counter(), endpoint)
+        pool_telemetry.record_checkout(name, endpoint, pool.checkedout())
+
+    @event.listens_for(engine, 'checkin')
+    def _checkin(dbapi_conn, record):
+        checked_out.dec()
+        started = record.info.pop('pool_checkout', None)
+        if started:
+            held = time.perf_counter() - started[0]
+            DB_POOL_HOLD.labels(name, started[1]).observe(held)
+            pool_telemetry.record_hold(name, started[1], held)
+
+    # The pool has no pre-checkout event; time the acquisition itself.
+    # dispose() swaps in a new pool, so wrap each one as it appears.
+    def _wrap_pool(pool):
+        do_get = pool._do_get
+
+        def _timed_get():
+            endpoint = current_endpoint()
+            opened = getattr(pool, '_overflow', 0)
+            start = time.perf_counter()
+            timed_out = False
+            try:
+                return do_get()
+            except exc.TimeoutError:
+                timed_out = True
+                DB_POOL_TIMEOUTS.labels(name, endpoint).inc()
+                raise
+            finally:
+                seconds = time.perf_counter() - start
+                DB_POOL_WAIT.labels(name, endpoint).observe(seconds)
+                created = getattr(pool, '_overflow', 0) > opened
+                pool_telemetry.record_wait(name, endpoint, seconds, created, timed_out)
+
+        pool._do_get = _timed_get
+
+    @event.listens_for(engine, 'engine_disposed')
+    def _disposed(eng):
+        _wrap_pool(eng.pool)
+
+    _wrap_pool(engine.pool)
+
+
+#  HTTP
+
+def _registry():
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    from prometheus_client import REGISTRY
+    return REGISTRY
+
+
+def init_app(app):
+    from app.extensions import db, redis_client
+    from app.replicas import replica_router
+
+    with app.app_context():
+        instrument_engine(db.engine, 'primary')
+    for replica in replica_router.replicas:
+        instrument_engine(replica.engine, replica.name)
+    redis_client.on_command = observe_redis
+
+    @app.after_request
+    def _observe_request(resp):
+        start = g.get('request_start_time')
+        if start is not None:
+            endpoint = request.endpoint or 'unmatched'
+            HTTP_LATENCY.labels(
+                request.blueprint or '-', endpoint, request.method, f'{resp.status_code // 100}xx',
+            ).observe(time.time() - start)
+        return resp
+
+    # Without a token /metrics is open, which is only acceptable off production
+    closed = not app.config.get('METRICS_TOKEN') and app.config.get('FLASK_ENV') == 'production'
+    if closed:
+        logger.warning("[METRICS] METRICS_TOKEN not set — /metrics disabled in production")
+
+    @app.route('/metrics')
+    def _metrics():
+        if closed:
+            return Response('Metrics disabled: set METRICS_TOKEN\n', status=403, mimetype='text/plain')
+        token = current_app.config.get('METRICS_TOKEN')
+        if token:
+            supplied = request.headers.get('Authorization', '')[7:]
+            if not hmac.compare_digest(supplied.encode(), token.encode()):
+                return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        # content_type, not mimetype: Werkzeug would append a second charset
+        return Response(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
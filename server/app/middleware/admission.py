@@ -0,0 +1,164 @@
+# server/app/middleware/admission.py
+
+import os
+import math
+import time
+import logging
+import threading
+from typing import Dict, Optional
+
+from flask import g, request, current_app, make_response
+from app.responses import error_response
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('ADMISSION_CONTROL', 'true').lower() == 'true'
+
+# Priority classes, highest first. `share` is the fraction of DB pool
+# capacity a class may fill (counting everything in flight ahead of it),
+# so as load grows bulk work is shed first and redirects last. `wait` is
+# the longest a request may queue for a slot before a 503.
+CLASSES: Dict[str, Dict[str, float]] = {
+    'redirect': {'share': 1.0, 'wait': 1.0, 'retry_after': 1},
+    'auth':     {'share': 0.9, 'wait': 0.5, 'retry_after': 1},
+    'api':      {'share': 0.75, 'wait': 0.25, 'retry_after': 2},
+    'bulk':     {'share': 0.35, 'wait': 0.0, 'retry_after': 5},
+}
+
+BLUEPRINT_CLASSES = {
+    'redirect': 'redirect',
+    'auth': 'auth',
+    'export': 'bulk',
+    'metadata': 'bulk',
+}
+
+# Liveness/metrics endpoints are never shed
+EXEMPT_ENDPOINTS = {'_index', '_ping', '_health', '_health_full', '_health_ready', '_metrics', 'static'}
+
+
+def priority(cls: str):
+    """Overrides the admission class of a view, e.g. @priority('bulk')."""
+    if cls not in CLASSES:
+        raise ValueError(f'Unknown admission class: {cls}')
+
+    def decorator(f):
+        f._admission_class = cls
+        return f
+    return decorator
+
+
+class AdmissionController:
+    """
+    Per-worker concurrency gate sized from the DB pool. Load is the larger
+    of requests in flight and connections checked out (background writers
+    included); a class is admitted only while load is under its ceiling.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._by_class = {name: 0 for name in CLASSES}
+        self._capacity = 1
+        self._engine = None
+
+    def configure(self, capacity: int, engine=None):
+        self._capacity = max(1, capacity)
+        self._engine = engine
+
+    def ceiling(self, cls: str) -> int:
+        return max(1, math.floor(self._capacity * CLASSES[cls]['share']))
+
+    def load(self) -> int:
+        checked_out = 0
+        if self._engine is not None:
+            try:
+                # Read through the engine: dispose() replaces the pool
+                checked_out = self._engine.pool.checkedout()
+            except Exception:
+                pass
+        return max(self._in_flight, checked_out)
+
+    def acquire(self, cls: str) -> Optional[float]:
+        """Seconds waited if admitted, None if the request should be shed."""
+        ceiling = self.ceiling(cls)
+        max_wait = CLASSES[cls]['wait']
+        start = time.perf_counter()
+        deadline = start + max_wait
+        with self._cond:
+            while self.load() >= ceiling:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return None
+                # Woken on release; re-polled regularly since pool checkins
+                # by background threads don't notify
+                self._cond.wait(min(remaining, 0.05))
+            self._in_flight += 1
+            self._by_class[cls] += 1
+        return time.perf_counter() - start
+
+    def release(self, cls: str):
+        with self._cond:
+            self._in_flight -= 1
+            self._by_class[cls] -= 1
+            self._cond.notify()
+
+    def stats(self) -> Dict[str, object]:
+        with self._cond:
+            return {
+                'capacity': self._capacity,
+                'in_flight': self._in_flight,
+                'load': self.load(),
+                'by_class': dict(self._by_class),
+                'ceilings': {name: self.ceiling(name) for name in CLASSES},
+            }
+
+
+admission = AdmissionController()
+
+
+def classify() -> Optional[str]:
+    endpoint = request.endpoint
+    if endpoint is None or endpoint in EXEMPT_ENDPOINTS or request.method == 'OPTIONS':
+        return None
+    view = current_app.view_functions.get(endpoint)
+    cls = getattr(view, '_admission_class', None)
+    if cls:
+        return cls
+    return BLUEPRINT_CLASSES.get(request.blueprint, 'api')
+
+
+def init_app(app):
+    if not ENABLED:
+        return
+    from app.extensions import db
+    from app.metrics import ADMISSION_WAIT, ADMISSION_REJECTED
+
+    opts = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    capacity = opts.get('pool_size', 5) + max(0, opts.get('max_overflow', 0))
+    with app.app_context():
+        admission.configure(capacity, db.engine)
+
+    @app.before_request
+    def _admit():
+        cls = classify()
+        if cls is None:
+            return None
+        waited = admission.acquire(cls)
+        if waited is None:
+            ADMISSION_REJECTED.labels(cls).inc()
+            logger.warning("[ADMISSION] Shedding %s request to %s (load %d, ceiling %d)",
+                           cls, request.endpoint, admission.load(), admission.ceiling(cls))
+            response = make_response(error_response(
+                'Server busy. Please retry shortly.', 503, code='OVERLOADED'
+            ))
+            response.headers['Retry-After'] = str(CLASSES[cls]['retry_after'])
+            return response
+        ADMISSION_WAIT.labels(cls).observe(waited)
+        g._admission_class = cls
+        return None
+
+    @app.teardown_request
+    def _leave(exception=None):
+        cls = g.pop('_admission_class', None)
+        if cls is not None:
+            admission.release(cls)
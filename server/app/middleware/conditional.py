@@ -0,0 +1,122 @@
+# server/app/middleware/conditional.py
+
+import os
+import gzip
+import time
+import hashlib
+import logging
+from functools import wraps
+from typing import Optional
+
+from flask import request, make_response
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('RESPONSE_COMPRESSION', 'true').lower() == 'true'
+MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', '1024'))
+GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', '4'))   # 4-5: gzip speed, smaller output
+
+COMPRESSIBLE = {'application/json', 'text/csv', 'text/plain', 'text/html'}
+
+# Revalidated on every use, but stored, so clients can send If-None-Match
+REVALIDATE = 'private, no-cache'
+
+
+def _digest(*parts) -> str:
+    return hashlib.blake2b('\x00'.join(map(str, parts)).encode(), digest_size=12).hexdigest()
+
+
+def conditional(ttl: int):
+    """
+    ETag from the user's cache generation, checked before the view runs:
+    a matching If-None-Match gets a 304 without touching the cache or DB.
+    The tag also rolls over every `ttl` seconds (the TTL of the data the
+    view serves), so values that change without an invalidation, like
+    click counts, are no staler than the cached payload. Place under
+    @require_auth. Falls through to the view when Redis is unavailable.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapped(*args, **kwargs):
+            from app.auth.utils import get_current_user_id
+            from app.cache.invalidation import generation
+
+            uid = get_current_user_id()
+            gen = generation(uid) if uid else None
+            if gen is None:
+                return f(*args, **kwargs)
+
+            tag = f'g{gen}-' + _digest(uid, request.endpoint, sorted(request.args.items(multi=True)),
+                                       int(time.time() // ttl))
+            if tag in request.if_none_match:
+                response = make_response('', 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(tag, weak=True)
+            return response
+        return wrapped
+    return decorator
+
+
+def _negotiate() -> Optional[str]:
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def _compress(resp):
+    if (resp.status_code < 200 or resp.status_code in (204, 304)
+            or resp.mimetype not in COMPRESSIBLE or 'Content-Encoding' in resp.headers):
+        return resp
+    data = resp.get_data()
+    if len(data) < MIN_BYTES:
+        return resp
+
+    resp.vary.add('Accept-Encoding')
+    encoding = _negotiate()
+    if encoding == 'br':
+        body = brotli.compress(data, quality=BROTLI_QUALITY)
+    elif encoding == 'gzip':
+        body = gzip.compress(data, compresslevel=GZIP_LEVEL)
+    else:
+        return resp
+    resp.set_data(body)
+    resp.headers['Content-Encoding'] = encoding
+    return resp
+
+
+def init_app(app):
+    """
+    Registered before the other after_request hooks, so it runs last: GET
+    responses under /api/ get a weak ETag (from the view, or a digest of
+    the body) and a 304 on If-None-Match; then compressible bodies over
+    MIN_BYTES are brotli/gzip encoded.
+    """
+    if not ENABLED:
+        return
+
+    @app.after_request
+    def _conditional(resp):
+        if resp.direct_passthrough or resp.is_streamed:
+            return resp
+        if request.method in ('GET', 'HEAD') and request.path.startswith('/api/'):
+            if resp.status_code == 200 and not resp.get_etag()[0]:
+                resp.set_etag(hashlib.blake2b(resp.get_data(), digest_size=12).hexdigest(), weak=True)
+            if resp.get_etag()[0]:
+                # Replaces the no-store set for /api/ by apply_response_headers
+                resp.headers['Cache-Control'] = REVALIDATE
+                resp.make_conditional(request)
+            if resp.status_code == 304:
+                return resp
+        return _compress(resp)
@@ -0,0 +1,213 @@
+# server/app/middleware/query_stats.py
+
+import os
+import re
+import time
+import random
+import logging
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Any, List
+
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('SQL_INSTRUMENTATION', 'true').lower() == 'true'
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '200'))
+SLOW_QUERY_SAMPLE = float(os.environ.get('SLOW_QUERY_SAMPLE_RATE', '0.25'))
+N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', '5'))
+N_PLUS_ONE_LOG_INTERVAL = 300
+MAX_FINGERPRINTS = 2000
+BACKGROUND = '<background>'
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PARAM_RE = re.compile(r'%\(\w+\)s|%s|\?|:\w+')
+_IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_POSTCOMPILE_RE = re.compile(r'\(__\[POSTCOMPILE_\w+\]\)')
+_SPACE_RE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """SQL with literals and parameters replaced, so repeats group together."""
+    sql = _STRING_RE.sub('?', statement)
+    sql = _POSTCOMPILE_RE.sub('(?)', sql)
+    sql = _PARAM_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('(?)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+class RequestQueries:
+    __slots__ = ('count', 'seconds', 'statements')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+
+
+class QueryStats:
+    """
+    Aggregates per endpoint (requests, queries, DB time, N+1 suspects) and
+    per statement fingerprint, for the admin metrics endpoint.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict[str, Any]] = {}
+        self._fingerprints: Dict[str, Dict[str, Any]] = {}
+        self._n1_logged: Dict[tuple, float] = {}
+        self._since = time.time()
+
+    def record_query(self, fp: str, seconds: float):
+        with self._lock:
+            entry = self._fingerprints.get(fp)
+            if entry is None:
+                if len(self._fingerprints) >= MAX_FINGERPRINTS:
+                    return
+                entry = self._fingerprints[fp] = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+            ms = seconds * 1000
+            entry['count'] += 1
+            entry['total_ms'] += ms
+            entry['max_ms'] = max(entry['max_ms'], ms)
+
+    def record_request(self, endpoint: str, queries: RequestQueries, suspects: List[str]):
+        with self._lock:
+            e = self._endpoints.get(endpoint)
+            if e is None:
+                e = self._endpoints[endpoint] = {
+                    'requests': 0, 'queries': 0, 'db_ms': 0.0,
+                    'max_queries': 0, 'max_db_ms': 0.0, 'n_plus_one': 0,
+                }
+            ms = queries.seconds * 1000
+            e['requests'] += 1
+            e['queries'] += queries.count
+            e['db_ms'] += ms
+            e['max_queries'] = max(e['max_queries'], queries.count)
+            e['max_db_ms'] = max(e['max_db_ms'], ms)
+            if suspects:
+                e['n_plus_one'] += 1
+
+    def should_log_n_plus_one(self, endpoint: str, fp: str) -> bool:
+        now = time.time()
+        with self._lock:
+            key = (endpoint, fp)
+            if now - self._n1_logged.get(key, 0) < N_PLUS_ONE_LOG_INTERVAL:
+                return False
+            if len(self._n1_logged) > 1000:
+                self._n1_logged.clear()
+            self._n1_logged[key] = now
+            return True
+
+    def snapshot(self, top: int = 50) -> Dict[str, Any]:
+        with self._lock:
+            endpoints = [
+                {
+                    'endpoint': name, **e,
+                    'db_ms': round(e['db_ms'], 2),
+                    'max_db_ms': round(e['max_db_ms'], 2),
+                    'avg_queries': round(e['queries'] / e['requests'], 2) if e['requests'] else 0,
+                    'avg_db_ms': round(e['db_ms'] / e['requests'], 2) if e['requests'] else 0,
+                }
+                for name, e in self._endpoints.items()
+            ]
+            statements = [
+                {'sql': fp, 'count': s['count'], 'total_ms': round(s['total_ms'], 2),
+                 'max_ms': round(s['max_ms'], 2)}
+                for fp, s in self._fingerprints.items()
+            ]
+        endpoints.sort(key=lambda e: e['db_ms'], reverse=True)
+        statements.sort(key=lambda s: s['total_ms'], reverse=True)
+        return {'since': self._since, 'endpoints': endpoints, 'statements': statements[:top]}
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+            self._fingerprints.clear()
+            self._since = time.time()
+
+
+query_stats = QueryStats()
+
+
+#  Engine hooks (every engine, including replicas)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+    if context is not None:
+        context._query_timing = True
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    if context is not None:
+        context._query_timing = False
+    elapsed = time.perf_counter() - starts.pop()
+    fp = fingerprint(statement)
+    query_stats.record_query(fp, elapsed)
+
+    in_request = has_request_context()
+    if in_request:
+        queries = g.get('_sql_queries')
+        if queries is not None:
+            queries.count += 1
+            queries.seconds += elapsed
+            queries.statements[fp] += 1
+
+    if elapsed * 1000 >= SLOW_QUERY_MS and random.random() < SLOW_QUERY_SAMPLE:
+        logger.warning("[SQL] Slow query %.0fms on %s: %s",
+                       elapsed * 1000, request.endpoint if in_request else BACKGROUND, fp[:500])
+
+
+def _handle_error(context):
+    # A statement that raises never reaches after_cursor_execute; drop its
+    # start so the next statement on this connection isn't timed from it
+    conn, ctx = context.connection, context.execution_context
+    if conn is not None and ctx is not None and getattr(ctx, '_query_timing', False):
+        ctx._query_timing = False
+        starts = conn.info.get('query_start')
+        if starts:
+            starts.pop()
+
+
+def init_app(app):
+    if not ENABLED:
+        return
+
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(Engine, 'handle_error', _handle_error)
+
+    @app.before_request
+    def _start_queries():
+        g._sql_queries = RequestQueries()
+
+    @app.after_request
+    def _finish_queries(resp):
+        queries = g.pop('_sql_queries', None)
+        if queries is None:
+            return resp
+        endpoint = request.endpoint or 'unmatched'
+
+        suspects = [fp for fp, n in queries.statements.items() if n >= N_PLUS_ONE_THRESHOLD]
+        for fp in suspects:
+            if query_stats.should_log_n_plus_one(endpoint, fp):
+                logger.warning("[SQL] Possible N+1 on %s: %d x %s",
+                               endpoint, queries.statements[fp], fp[:300])
+        query_stats.record_request(endpoint, queries, suspects)
+
+        timing = f'db;dur={queries.seconds * 1000:.1f};desc="{queries.count} queries"'
+        start = g.get('request_start_time')
+        if start:
+            timing += f', app;dur={(time.time() - start) * 1000:.1f}'
+        existing = resp.headers.get('Server-Timing')
+        resp.headers['Server-Timing'] = f'{existing}, {timing}' if existing else timing
+        return resp
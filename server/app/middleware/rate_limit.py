@@ -1,28 +1,247 @@
 # server/app/middleware/rate_limit.py
 
+import os
+import math
 import time
 import logging
+import threading
 from functools import wraps
-from flask import request, g
+from typing import Dict, Optional, Tuple, NamedTuple
+from flask import request, g, current_app, make_response
 from app.extensions import redis_client
 from app.responses import error_response
 
 logger = logging.getLogger(__name__)
 
-# In-memory fallback when Redis is down
-_local_counters = {}
-_local_cleanup_time = 0
+# GCRA: one key per identity holding its theoretical arrival time (TAT).
+# Requests are spaced by T = window / limit with up to `limit` of burst,
+# so there is no window boundary to straddle, and the key always carries
+# a PX expiry equal to the time it takes to drain back to zero.
+# With ARGV[5] = 1 the script grants as many of `cost` tokens as are
+# available instead of all-or-nothing (used for leases).
+_GCRA_LUA = """
+local now = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local partial = ARGV[5] == '1'
+local interval = period / limit
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then tat = now end
+local available = math.floor((period - (tat - now)) / interval + 1e-9)
+if partial and available < cost then cost = math.max(available, 1) end
+local new_tat = tat + interval * cost
+local over = new_tat - now - period
+if over > 1e-9 then
+  return {0, math.max(available, 0), tostring(tat - now), tostring(over)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {cost, math.floor((period - (new_tat - now)) / interval + 1e-9), tostring(new_tat - now), '0'}
+"""
 
+LEASE_TOLERANCE = float(os.environ.get('RATE_LIMIT_LEASE_TOLERANCE', '0.1'))
+LEASE_MAX = int(os.environ.get('RATE_LIMIT_LEASE_MAX', '10'))
+LEASE_MAX_AGE = 10.0      # seconds a leased slice may be spent for
+# Processes holding leases on the same quota (gunicorn / uvicorn workers)
+WORKERS = max(1, int(os.environ.get('WEB_CONCURRENCY', '2')))
 
-def _cleanup_local():
-    global _local_cleanup_time
-    now = time.time()
-    if now - _local_cleanup_time < 60:
-        return
-    _local_cleanup_time = now
-    expired = [k for k, (_, exp) in _local_counters.items() if exp < now]
-    for k in expired:
-        del _local_counters[k]
+
+class RateResult(NamedTuple):
+    allowed: bool
+    remaining: int
+    reset_at: float      # epoch seconds when the identity is back to a full quota
+    retry_after: float   # seconds until the next request would be allowed
+
+
+#  In-memory fallback
+
+class TokenBucket:
+    __slots__ = ('tokens', 'updated')
+
+    def __init__(self, capacity: float, now: float):
+        self.tokens = capacity
+        self.updated = now
+
+
+class LocalLimiter:
+    """Thread-safe token buckets, used while Redis is unavailable."""
+
+    def __init__(self, max_keys: int = 50000):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._max_keys = max_keys
+        self._last_prune = 0.0
+
+    def check(self, key: str, limit: int, window: float, cost: int = 1) -> RateResult:
+        now = time.time()
+        rate = limit / window
+        with self._lock:
+            self._prune(now, window)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(limit, now)
+            bucket.tokens = min(limit, bucket.tokens + (now - bucket.updated) * rate)
+            bucket.updated = now
+
+            if bucket.tokens < cost:
+                retry = (cost - bucket.tokens) / rate
+                return RateResult(False, int(bucket.tokens), now + (limit - bucket.tokens) / rate, retry)
+
+            bucket.tokens -= cost
+            return RateResult(True, int(bucket.tokens), now + (limit - bucket.tokens) / rate, 0.0)
+
+    def _prune(self, now: float, window: float):
+        if now - self._last_prune < 60 and len(self._buckets) < self._max_keys:
+            return
+        self._last_prune = now
+        # A bucket idle for a full window has refilled; dropping it is lossless
+        stale = [k for k, b in self._buckets.items() if now - b.updated > window]
+        for k in stale:
+            del self._buckets[k]
+        if len(self._buckets) >= self._max_keys:
+            self._buckets.clear()
+
+
+#  Engine
+
+class Lease:
+    """Tokens prepaid in Redis; tokens == -1 marks a cached denial."""
+    __slots__ = ('tokens', 'expires_at', 'remaining', 'reset_at')
+
+    def __init__(self, tokens: int, expires_at: float, remaining: int, reset_at: float):
+        self.tokens = tokens
+        self.expires_at = expires_at
+        self.remaining = remaining
+        self.reset_at = reset_at
+
+
+def lease_size(limit: int) -> int:
+    """
+    Tokens leased per Redis call. Leased tokens are already paid for, so a
+    lease can't over-admit; at worst every worker strands one slice, so the
+    slice is LEASE_TOLERANCE of the limit split across WORKERS. Limits too
+    small for that to reach 2 aren't leased.
+    """
+    return max(1, min(LEASE_MAX, int(limit * LEASE_TOLERANCE / WORKERS)))
+
+
+class RateLimiter:
+    """
+    Single rate-limit engine. Each worker leases a slice of an identity's
+    quota from Redis in one Lua call and spends it locally, so most checks
+    never leave the process. Token buckets stand in while Redis is down.
+    """
+
+    def __init__(self):
+        self._local = LocalLimiter()
+        self._lock = threading.Lock()
+        self._leases: Dict[str, Lease] = {}
+        self._stats = {'checks': 0, 'redis_calls': 0, 'denied': 0, 'local_fallback': 0}
+
+    def check(self, key: str, limit: int, window: float, cost: int = 1) -> RateResult:
+        now = time.time()
+        size = lease_size(limit) if cost == 1 else cost
+
+        with self._lock:
+            self._stats['checks'] += 1
+            if size > 1:
+                lease = self._leases.get(key)
+                if lease and lease.expires_at > now:
+                    if lease.tokens > 0:
+                        lease.tokens -= 1
+                        return RateResult(True, lease.remaining + lease.tokens, lease.reset_at, 0.0)
+                    if lease.tokens < 0:
+                        # Denied recently: nothing frees up before expires_at
+                        self._stats['denied'] += 1
+                        return RateResult(False, 0, lease.reset_at, lease.expires_at - now)
+
+        if redis_client.available:
+            res = redis_client.eval(
+                _GCRA_LUA, [key], [now, window, limit, size, '1' if size > cost else '0'],
+            )
+            if res:
+                granted, remaining = int(res[0]), int(res[1])
+                reset_at = now + float(res[2])
+                with self._lock:
+                    self._stats['redis_calls'] += 1
+                    # Another thread may have leased while this one was in
+                    # Redis: its tokens are paid for, so spend or add to them
+                    lease = self._leases.get(key) if size > 1 else None
+                    live = lease if lease and lease.expires_at > now and lease.tokens > 0 else None
+                    if not granted:
+                        if live:
+                            live.tokens -= 1
+                            return RateResult(True, live.remaining + live.tokens, live.reset_at, 0.0)
+                        self._stats['denied'] += 1
+                        retry_after = float(res[3])
+                        if size > 1:
+                            self._leases[key] = Lease(-1, now + retry_after, 0, reset_at)
+                        return RateResult(False, remaining, reset_at, retry_after)
+                    if granted > cost:
+                        if live:
+                            live.tokens += granted - cost
+                            live.remaining, live.reset_at = remaining, reset_at
+                        else:
+                            self._prune(now)
+                            self._leases[key] = Lease(
+                                granted - cost, now + min(window, LEASE_MAX_AGE), remaining, reset_at,
+                            )
+                    return RateResult(True, remaining + granted - cost, reset_at, 0.0)
+
+        with self._lock:
+            self._stats['local_fallback'] += 1
+        result = self._local.check(key, limit, window, cost)
+        if not result.allowed:
+            with self._lock:
+                self._stats['denied'] += 1
+        return result
+
+    def _prune(self, now: float):
+        if len(self._leases) < 10000:
+            return
+        for k in [k for k, v in self._leases.items() if v.expires_at <= now or v.tokens == 0]:
+            del self._leases[k]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, 'leases': len(self._leases)}
+
+
+limiter = RateLimiter()
+
+
+#  Policies
+
+def parse_policy(spec) -> Tuple[int, int]:
+    """'120/60' or (120, 60) -> (limit, window_seconds)."""
+    if isinstance(spec, str):
+        limit, window = spec.split('/', 1)
+        return int(limit), int(window)
+    limit, window = spec
+    return int(limit), int(window)
+
+
+def get_policy(name: str, default: Tuple[int, int]) -> Tuple[int, int, Optional[str]]:
+    """
+    Resolves a policy from RATE_LIMIT_POLICIES as (limit, window, scope).
+    The current endpoint (e.g. 'folders.create') wins over the limiter's
+    policy name, and is then the scope: an override with its own emission
+    interval needs its own GCRA key, not the limiter's shared one.
+    """
+    try:
+        policies = current_app.config.get('RATE_LIMIT_POLICIES') or {}
+    except RuntimeError:
+        return (*default, None)
+    endpoint = request.endpoint if request else None
+    scope = endpoint if endpoint in policies else None
+    spec = policies.get(endpoint) if scope else policies.get(name)
+    if not spec:
+        return (*default, None)
+    try:
+        return (*parse_policy(spec), scope)
+    except (ValueError, TypeError):
+        logger.warning("Invalid rate limit policy %r for %s", spec, endpoint or name)
+        return (*default, None)
 
 
 def _get_identifier():
@@ -35,87 +254,40 @@ def _get_identifier():
     return f'ip:{request.remote_addr}'
 
 
-def rate_limit(max_requests=60, window_seconds=60, key_prefix='rl'):
+def rate_limit(max_requests=60, window_seconds=60, key_prefix='rl', policy=None):
     """
     Decorator for rate limiting.
-    Uses Redis if available, falls back to in-memory.
+    Limits come from the named policy in config, falling back to the
+    arguments. Uses Redis if available, falls back to in-memory.
     """
     def decorator(f):
         @wraps(f)
         def wrapped(*args, **kwargs):
-            identifier = _get_identifier()
-            key = f'{key_prefix}:{identifier}'
+            limit, window, scope = get_policy(policy, (max_requests, window_seconds)) if policy \
+                else (max_requests, window_seconds, None)
+            key = f'{key_prefix}:{scope}' if scope else key_prefix
+            result = limiter.check(f'{key}:{_get_identifier()}', limit, window)
 
-            allowed, remaining, reset_at = _check_rate(
-                key, max_requests, window_seconds
-            )
-
-            if not allowed:
-                return error_response(
+            if not result.allowed:
+                response = make_response(error_response(
                     'Too many requests. Please wait.',
                     429,
                     code='RATE_LIMITED'
-                )
-
-            response = f(*args, **kwargs)
-
-            # Add rate limit headers
-            if hasattr(response, 'headers'):
-                response.headers['X-RateLimit-Limit'] = str(max_requests)
-                response.headers['X-RateLimit-Remaining'] = str(remaining)
-                response.headers['X-RateLimit-Reset'] = str(int(reset_at))
+                ))
+                response.headers['Retry-After'] = str(max(1, math.ceil(result.retry_after)))
+            else:
+                response = make_response(f(*args, **kwargs))
 
+            response.headers['X-RateLimit-Limit'] = str(limit)
+            response.headers['X-RateLimit-Remaining'] = str(result.remaining)
+            response.headers['X-RateLimit-Reset'] = str(int(result.reset_at))
             return response
         return wrapped
     return decorator
 
 
-def _check_rate(key, max_requests, window_seconds):
-    """Returns (allowed, remaining, reset_timestamp)."""
-    now = time.time()
-    reset_at = now + window_seconds
-
-    if redis_client.available:
-        return _check_redis(key, max_requests, window_seconds, now)
-
-    return _check_local(key, max_requests, window_seconds, now)
-
-
-def _check_redis(key, max_requests, window_seconds, now):
-    try:
-        count = redis_client.incr(key)
-        if count == 1:
-            redis_client.expire(key, window_seconds)
-
-        ttl = redis_client._exec(redis_client._client.ttl, key) or window_seconds
-        reset_at = now + ttl
-        remaining = max(0, max_requests - (count or 0))
-        allowed = (count or 0) <= max_requests
-
-        return allowed, remaining, reset_at
-    except Exception:
-        return True, max_requests, now + window_seconds
-
-
-def _check_local(key, max_requests, window_seconds, now):
-    _cleanup_local()
-
-    if key in _local_counters:
-        count, expires = _local_counters[key]
-        if now > expires:
-            _local_counters[key] = (1, now + window_seconds)
-            return True, max_requests - 1, now + window_seconds
-        count += 1
-        _local_counters[key] = (count, expires)
-        remaining = max(0, max_requests - count)
-        return count <= max_requests, remaining, expires
-    else:
-        _local_counters[key] = (1, now + window_seconds)
-        return True, max_requests - 1, now + window_seconds
-
-
-api_limiter = rate_limit(max_requests=120, window_seconds=60, key_prefix='rl:api')
-write_limiter = rate_limit(max_requests=30, window_seconds=60, key_prefix='rl:write')
-auth_limiter = rate_limit(max_requests=10, window_seconds=60, key_prefix='rl:auth')
-search_limiter = rate_limit(max_requests=30, window_seconds=60, key_prefix='rl:search')
-metadata_limiter = rate_limit(max_requests=20, window_seconds=60, key_prefix='rl:meta')
\ No newline at end of file
+api_limiter = rate_limit(max_requests=120, window_seconds=60, key_prefix='rl:api', policy='api')
+write_limiter = rate_limit(max_requests=30, window_seconds=60, key_prefix='rl:write', policy='write')
+auth_limiter = rate_limit(max_requests=10, window_seconds=60, key_prefix='rl:auth', policy='auth')
+search_limiter = rate_limit(max_requests=30, window_seconds=60, key_prefix='rl:search', policy='search')
+metadata_limiter = rate_limit(max_requests=20, window_seconds=60, key_prefix='rl:meta', policy='metadata')
@@ -6,6 +6,10 @@ from .versions.v002_feature_tables import register_migration as register_002
 from .versions.v003_performance_indexes import register_migration as register_003
 from .versions.v004_add_folder_slug import register_migration as register_004
 from .versions.v005_scalability_indexes import register_migration as register_005
+from .versions.v006_link_url_hash import register_migration as register_006
+from .versions.v007_page_metadata import register_migration as register_007
+from .versions.v008_links_url_hash_index import register_migration as register_008
+from .versions.v009_link_domain import register_migration as register_009
 
 
 def register_all_migrations():
@@ -14,6 +18,10 @@ def register_all_migrations():
     register_003(migration_manager)
     register_004(migration_manager)
     register_005(migration_manager)
+    register_006(migration_manager)
+    register_007(migration_manager)
+    register_008(migration_manager)
+    register_009(migration_manager)
 
 
 def run_migrations(dry_run=False):
@@ -0,0 +1,61 @@
+# server/app/migrations/versions/v006_link_url_hash.py
+
+import logging
+from sqlalchemy import text
+from app.extensions import db
+from app.migrations.manager import Migration
+from app.utils.url import url_hash
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+class LinkUrlHashMigration(Migration):
+    def __init__(self):
+        super().__init__(
+            version='006_link_url_hash',
+            description='Add canonical url_hash to links for duplicate detection'
+        )
+
+    def up(self) -> None:
+        logger.info("Adding url_hash column to links table")
+
+        db.session.execute(text("""
+            ALTER TABLE links
+            ADD COLUMN IF NOT EXISTS url_hash VARCHAR(64)
+        """))
+        db.session.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_links_user_url_hash
+            ON links (user_id, url_hash)
+            WHERE soft_deleted = false
+        """))
+        db.session.commit()
+
+        # Canonicalization lives in Python, so backfill in batches from here
+        filled = 0
+        while True:
+            rows = db.session.execute(text("""
+                SELECT id, original_url FROM links
+                WHERE url_hash IS NULL
+                ORDER BY id
+                LIMIT :n
+            """), {'n': BATCH_SIZE}).fetchall()
+            if not rows:
+                break
+            db.session.execute(
+                text("UPDATE links SET url_hash = :h WHERE id = :id"),
+                [{'id': r.id, 'h': url_hash(r.original_url or '')} for r in rows],
+            )
+            db.session.commit()
+            filled += len(rows)
+
+        logger.info("url_hash backfilled for %d links", filled)
+
+    def down(self) -> None:
+        db.session.execute(text("DROP INDEX IF EXISTS ix_links_user_url_hash"))
+        db.session.execute(text("ALTER TABLE links DROP COLUMN IF EXISTS url_hash"))
+
+
+def register_migration(manager):
+    manager.register_migration(LinkUrlHashMigration())
@@ -0,0 +1,65 @@
+# server/app/migrations/versions/v007_page_metadata.py
+
+import logging
+from sqlalchemy import text
+from app.extensions import db
+from app.migrations.manager import Migration
+
+logger = logging.getLogger(__name__)
+
+
+class PageMetadataMigration(Migration):
+    def __init__(self):
+        super().__init__(
+            version='007_page_metadata',
+            description='Move per-link page metadata into shared page_metadata table'
+        )
+
+    def up(self) -> None:
+        logger.info("Creating page_metadata table")
+
+        db.session.execute(text("""
+            CREATE TABLE IF NOT EXISTS page_metadata (
+                url_hash VARCHAR(64) PRIMARY KEY,
+                url TEXT NOT NULL,
+                data JSONB NOT NULL DEFAULT '{}'::jsonb,
+                fetched_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+        db.session.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_page_metadata_fetched_at ON page_metadata(fetched_at)"
+        ))
+
+        # Newest copy wins when several links hold metadata for the same page
+        result = db.session.execute(text("""
+            INSERT INTO page_metadata (url_hash, url, data, fetched_at, created_at)
+            SELECT DISTINCT ON (url_hash)
+                   url_hash, original_url, metadata->'page_metadata', updated_at, updated_at
+            FROM links
+            WHERE url_hash IS NOT NULL
+              AND metadata ? 'page_metadata'
+              AND jsonb_typeof(metadata->'page_metadata') = 'object'
+            ORDER BY url_hash, updated_at DESC
+            ON CONFLICT (url_hash) DO NOTHING
+        """))
+        logger.info("page_metadata seeded with %d pages", result.rowcount)
+
+        db.session.execute(text("""
+            UPDATE links SET metadata = metadata - 'page_metadata'
+            WHERE metadata ? 'page_metadata'
+        """))
+
+    def down(self) -> None:
+        db.session.execute(text("""
+            UPDATE links l
+            SET metadata = COALESCE(l.metadata, '{}'::jsonb)
+                           || jsonb_build_object('page_metadata', p.data)
+            FROM page_metadata p
+            WHERE l.url_hash = p.url_hash
+        """))
+        db.session.execute(text("DROP TABLE IF EXISTS page_metadata"))
+
+
+def register_migration(manager):
+    manager.register_migration(PageMetadataMigration())
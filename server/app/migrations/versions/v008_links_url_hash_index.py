@@ -0,0 +1,31 @@
+# server/app/migrations/versions/v008_links_url_hash_index.py
+
+import logging
+from sqlalchemy import text
+from app.extensions import db
+from app.migrations.manager import Migration
+
+logger = logging.getLogger(__name__)
+
+
+class LinksUrlHashIndexMigration(Migration):
+    def __init__(self):
+        super().__init__(
+            version='008_links_url_hash_index',
+            description='Index links by url_hash for page-level popularity lookups'
+        )
+
+    def up(self) -> None:
+        logger.info("Creating ix_links_url_hash")
+        db.session.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_links_url_hash
+            ON links (url_hash)
+            WHERE soft_deleted = false
+        """))
+
+    def down(self) -> None:
+        db.session.execute(text("DROP INDEX IF EXISTS ix_links_url_hash"))
+
+
+def register_migration(manager):
+    manager.register_migration(LinksUrlHashIndexMigration())
@@ -0,0 +1,56 @@
+# server/app/migrations/versions/v009_link_domain.py
+
+import logging
+from sqlalchemy import text
+from app.extensions import db
+from app.migrations.manager import Migration
+from app.utils.url import extract_domain
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+class LinkDomainMigration(Migration):
+    def __init__(self):
+        super().__init__(
+            version='009_link_domain',
+            description='Store each link\'s URL domain so listings never parse URLs'
+        )
+
+    def up(self) -> None:
+        logger.info("Adding domain column to links table")
+
+        db.session.execute(text("""
+            ALTER TABLE links
+            ADD COLUMN IF NOT EXISTS domain VARCHAR(255)
+        """))
+        db.session.commit()
+
+        # Same parsing as Link._sync_url_hash, so backfill from Python
+        filled, last_id = 0, 0
+        while True:
+            rows = db.session.execute(text("""
+                SELECT id, original_url FROM links
+                WHERE domain IS NULL AND id > :last
+                ORDER BY id
+                LIMIT :n
+            """), {'last': last_id, 'n': BATCH_SIZE}).fetchall()
+            if not rows:
+                break
+            db.session.execute(
+                text("UPDATE links SET domain = :d WHERE id = :id"),
+                [{'id': r.id, 'd': extract_domain(r.original_url or '')[:255]} for r in rows],
+            )
+            db.session.commit()
+            filled += len(rows)
+            last_id = rows[-1].id
+
+        logger.info("domain backfilled for %d links", filled)
+
+    def down(self) -> None:
+        db.session.execute(text("ALTER TABLE links DROP COLUMN IF EXISTS domain"))
+
+
+def register_migration(manager):
+    manager.register_migration(LinkDomainMigration())
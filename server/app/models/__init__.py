@@ -8,9 +8,10 @@ from .link_tag import LinkTag
 from .activity_log import ActivityLog
 from .share_link import ShareLink
 from .user_preferences import UserPreferences
+from .page_metadata import PageMetadata
 
 __all__ = [
     'User', 'EmergencyToken', 'Link', 'Folder',
     'Tag', 'LinkTag', 'ActivityLog', 'ShareLink',
-    'UserPreferences',
+    'UserPreferences', 'PageMetadata',
 ]
\ No newline at end of file
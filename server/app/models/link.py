@@ -2,7 +2,8 @@
 from datetime import datetime
 from app.extensions import db
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
+from app.utils.url import url_hash, extract_domain
 
 
 class Link(db.Model):
@@ -12,6 +13,8 @@ class Link(db.Model):
     user_id = db.Column(db.Text, db.ForeignKey('users.id'), nullable=False, index=True)
     folder_id = db.Column(db.Integer, db.ForeignKey('folders.id'), nullable=True, index=True)
     original_url = db.Column(db.Text, nullable=False)
+    url_hash = db.Column(db.String(64), nullable=True)
+    domain = db.Column(db.String(255), nullable=True)
     link_type = db.Column(db.String(20), nullable=False, default='saved', index=True)
     slug = db.Column(db.String(255), unique=True, nullable=True, index=True)
     title = db.Column(db.String(500))
@@ -41,4 +44,10 @@ class Link(db.Model):
         db.Index('ix_links_user_created', 'user_id', 'created_at', 'soft_deleted'),
         db.Index('ix_links_user_folder', 'user_id', 'folder_id', 'soft_deleted'),
         db.Index('ix_links_expires', 'expires_at', 'link_type', 'is_active'),
-    )
\ No newline at end of file
+    )
+
+    @validates('original_url')
+    def _sync_url_hash(self, key, value):
+        self.url_hash = url_hash(value) if value else None
+        self.domain = extract_domain(value)[:255] if value else None
+        return value
\ No newline at end of file
@@ -0,0 +1,15 @@
+# server/app/models/page_metadata.py
+from datetime import datetime
+from app.extensions import db
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+class PageMetadata(db.Model):
+    """Extracted page metadata shared by every link whose URL canonicalizes to url_hash."""
+    __tablename__ = 'page_metadata'
+
+    url_hash = db.Column(db.String(64), primary_key=True)
+    url = db.Column(db.Text, nullable=False)
+    data = db.Column(JSONB, nullable=False, default=dict)
+    fetched_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
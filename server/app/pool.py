@@ -0,0 +1,300 @@
+# server/app/pool.py
+
+import os
+import time
+import random
+import socket
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, Optional, Tuple
+
+from flask import request, has_request_context
+
+from app.middleware.query_stats import BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+TUNE_INTERVAL = float(os.environ.get('DB_POOL_TUNE_INTERVAL', '15'))
+TARGET_WAIT_MS = float(os.environ.get('DB_POOL_TARGET_WAIT_MS', '5'))
+MIN_OVERFLOW = int(os.environ.get('DB_POOL_MIN_OVERFLOW', '0'))
+BUDGET_KEY = 'sl:pool:budget'
+CLAIM_TTL = TUNE_INTERVAL * 3     # a worker that stops reporting releases its share
+WAIT_SAMPLES = 2048
+
+
+def current_endpoint() -> str:
+    if has_request_context():
+        return request.endpoint or 'unmatched'
+    return BACKGROUND
+
+
+def percentile(samples, q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+#  Telemetry
+
+class PoolWindow:
+    """Checkout activity on one engine since the tuner last looked."""
+    __slots__ = ('checkouts', 'queued', 'timeouts', 'peak', 'held', 'started')
+
+    def __init__(self):
+        self.checkouts = 0
+        self.queued = deque(maxlen=WAIT_SAMPLES)  # waits that didn't open a connection
+        self.timeouts = 0
+        self.peak = 0
+        self.held = 0.0
+        self.started = time.monotonic()
+
+
+class PoolTelemetry:
+    """
+    Checkout wait and time-in-use per endpoint (for the admin metrics
+    endpoint) and per engine windows (for the tuner). Fed by the pool hooks
+    in app.metrics.instrument_engine.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict[str, float]] = {}
+        self._windows: Dict[str, PoolWindow] = {}
+        self._since = time.time()
+
+    def _endpoint(self, name: str) -> Dict[str, float]:
+        e = self._endpoints.get(name)
+        if e is None:
+            e = self._endpoints[name] = {
+                'checkouts': 0, 'wait_ms': 0.0, 'max_wait_ms': 0.0,
+                'hold_ms': 0.0, 'max_hold_ms': 0.0, 'timeouts': 0,
+            }
+        return e
+
+    def _window(self, engine: str) -> PoolWindow:
+        w = self._windows.get(engine)
+        if w is None:
+            w = self._windows[engine] = PoolWindow()
+        return w
+
+    def record_wait(self, engine: str, endpoint: str, seconds: float, created: bool, timed_out: bool):
+        ms = seconds * 1000
+        with self._lock:
+            e = self._endpoint(endpoint)
+            e['wait_ms'] += ms
+            e['max_wait_ms'] = max(e['max_wait_ms'], ms)
+            w = self._window(engine)
+            if timed_out:
+                e['timeouts'] += 1
+                w.timeouts += 1
+            elif not created:
+                # Opening a connection isn't contention; counting it would
+                # make growing the pool look like a reason to grow it more
+                w.queued.append(ms)
+
+    def record_checkout(self, engine: str, endpoint: str, in_use: int):
+        with self._lock:
+            self._endpoint(endpoint)['checkouts'] += 1
+            w = self._window(engine)
+            w.checkouts += 1
+            w.peak = max(w.peak, in_use)
+
+    def record_hold(self, engine: str, endpoint: str, seconds: float):
+        ms = seconds * 1000
+        with self._lock:
+            e = self._endpoint(endpoint)
+            e['hold_ms'] += ms
+            e['max_hold_ms'] = max(e['max_hold_ms'], ms)
+            self._window(engine).held += seconds
+
+    def drain(self, engine: str) -> PoolWindow:
+        with self._lock:
+            window = self._window(engine)
+            self._windows[engine] = PoolWindow()
+            return window
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = [
+                {
+                    'endpoint': name, **e,
+                    'wait_ms': round(e['wait_ms'], 2),
+                    'max_wait_ms': round(e['max_wait_ms'], 2),
+                    'hold_ms': round(e['hold_ms'], 2),
+                    'max_hold_ms': round(e['max_hold_ms'], 2),
+                    'avg_wait_ms': round(e['wait_ms'] / e['checkouts'], 2) if e['checkouts'] else 0,
+                    'avg_hold_ms': round(e['hold_ms'] / e['checkouts'], 2) if e['checkouts'] else 0,
+                }
+                for name, e in self._endpoints.items()
+            ]
+        endpoints.sort(key=lambda e: e['hold_ms'], reverse=True)
+        return {'since': self._since, 'endpoints': endpoints}
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+            self._since = time.time()
+
+
+pool_telemetry = PoolTelemetry()
+
+
+#  Adaptive sizing
+
+# Stores this worker's claim and returns every live one, dropping claims
+# not refreshed within CLAIM_TTL. Values are 'floor:demand:ts'.
+_CLAIM_SCRIPT = """
+local now = tonumber(ARGV[3])
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+local all = redis.call('HGETALL', KEYS[1])
+local live = {}
+for i = 1, #all, 2 do
+    local ts = tonumber(string.match(all[i + 1], ':([%d%.]+)$'))
+    if ts == nil or now - ts > tonumber(ARGV[4]) then
+        redis.call('HDEL', KEYS[1], all[i])
+    else
+        table.insert(live, all[i])
+        table.insert(live, all[i + 1])
+    end
+end
+return live
+"""
+
+
+def allocate(budget: int, claims: Dict[str, Tuple[int, int]]) -> Dict[str, int]:
+    """
+    Connections per worker from {worker: (floor, demand)}. Demands are met
+    when they fit the budget; otherwise every worker keeps its floor (the
+    pool_size it holds anyway) and what's left is split in proportion to
+    the demand above it.
+    """
+    if sum(d for _, d in claims.values()) <= budget:
+        return {w: d for w, (_, d) in claims.items()}
+    spare = max(0, budget - sum(f for f, _ in claims.values()))
+    excess = sum(max(0, d - f) for f, d in claims.values()) or 1
+    return {w: f + spare * max(0, d - f) // excess for w, (f, d) in claims.items()}
+
+
+class PoolTuner:
+    """
+    Resizes the primary pool's max_overflow every TUNE_INTERVAL seconds.
+    Queued checkouts over TARGET_WAIT_MS (p95) or timeouts grow it by half;
+    a window that left two or more connections unused shrinks it by one.
+    Each worker's demand is published to Redis and the grant is its share
+    of DB_POOL_BUDGET across all live workers; without Redis the worker
+    stays within its configured max_overflow.
+    """
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.worker_id = None
+        self.budget = 0
+        self.ceiling = 0
+        self._state: Dict[str, Any] = {}
+
+    def start(self, app):
+        if self._thread and self._thread.is_alive():
+            return
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.budget = app.config.get('DB_POOL_BUDGET', 0)
+        self.ceiling = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}).get('max_overflow', 0)
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run_forever, args=(app,), daemon=True, name='pool-tuner',
+        )
+        self._thread.start()
+        logger.info("[DB] Adaptive pool sizing on (budget %d, every %.0fs)", self.budget, TUNE_INTERVAL)
+
+    def stop(self):
+        """Stops tuning and returns this worker's share to the budget."""
+        self._stop.set()
+        from app.extensions import redis_client
+        if self.worker_id and redis_client.available:
+            redis_client.eval("return redis.call('HDEL', KEYS[1], ARGV[1])", [BUDGET_KEY], [self.worker_id])
+
+    def run_forever(self, app):
+        from app.extensions import db
+        with app.app_context():
+            # Jittered so workers started together don't all resize at once
+            while not self._stop.wait(TUNE_INTERVAL * random.uniform(0.8, 1.2)):
+                try:
+                    self.tick(db.engine)
+                except Exception as e:
+                    logger.warning("[DB] Pool tuning failed: %s", e)
+
+    def demand(self, window: PoolWindow, size: int, overflow: int) -> int:
+        """Overflow this worker would like, from the last window."""
+        p95 = percentile(window.queued, 0.95)
+        if window.timeouts or p95 > TARGET_WAIT_MS:
+            return overflow + max(1, overflow // 2)
+        if window.peak <= size + overflow - 2:
+            return max(MIN_OVERFLOW, overflow - 1, window.peak - size + 1)
+        return overflow
+
+    def _grant(self, size: int, want: int) -> int:
+        """Connections this worker may hold, given every worker's claim."""
+        from app.extensions import redis_client
+        if not redis_client.available or not self.budget:
+            return size + min(want, self.ceiling)
+        now = time.time()
+        live = redis_client.eval(
+            _CLAIM_SCRIPT, [BUDGET_KEY],
+            [self.worker_id, f'{size}:{size + want}:{now:.3f}', now, CLAIM_TTL, int(CLAIM_TTL * 4)],
+        )
+        if not live:
+            return size + min(want, self.ceiling)
+        claims = {}
+        for worker, value in zip(live[::2], live[1::2]):
+            floor, demand, _ = value.split(':')
+            claims[worker] = (int(floor), int(demand))
+        self._state['workers'] = len(claims)
+        self._state['claimed'] = sum(d for _, d in claims.values())
+        return allocate(self.budget, claims).get(self.worker_id, size)
+
+    def tick(self, engine):
+        from app.metrics import DB_POOL_MAX_OVERFLOW
+        from app.middleware.admission import admission
+
+        pool = engine.pool
+        window = pool_telemetry.drain('primary')
+        size, current = pool.size(), pool._max_overflow
+        cap = self.budget - size if self.budget else self.ceiling
+        want = max(MIN_OVERFLOW, min(self.demand(window, size, current), cap))
+        granted = max(MIN_OVERFLOW, min(want, self._grant(size, want) - size))
+
+        if granted != current:
+            # QueuePool reads _max_overflow on every checkout; connections
+            # above a lower limit are closed as they're returned
+            pool._max_overflow = granted
+            admission.configure(size + granted, engine)
+            logger.info("[DB] Pool overflow %d → %d (p95 wait %.1fms, peak %d/%d, %d timeouts)",
+                        current, granted, percentile(window.queued, 0.95),
+                        window.peak, size + current, window.timeouts)
+        DB_POOL_MAX_OVERFLOW.labels('primary').set(granted)
+
+        elapsed = max(time.monotonic() - window.started, 1e-3)
+        self._state.update({
+            'size': size,
+            'max_overflow': granted,
+            'wanted': want,
+            'checkouts': window.checkouts,
+            'p95_wait_ms': round(percentile(window.queued, 0.95), 2),
+            'timeouts': window.timeouts,
+            'peak_in_use': window.peak,
+            'utilization': round(window.held / elapsed / (size + current), 3) if size + current else 0,
+            'at': time.time(),
+        })
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': bool(self._thread and self._thread.is_alive()),
+            'budget': self.budget,
+            **self._state,
+        }
+
+
+pool_tuner = PoolTuner()
@@ -1,15 +1,26 @@
 # server/app/redirect/routes.py
 import logging
 from datetime import datetime
-from flask import redirect as flask_redirect, abort, request, jsonify
+from flask import redirect as flask_redirect, abort, request, jsonify, make_response
 from app.redirect import redirect_bp
+from app.responses import error_response
+from app.shortlinks import unlock
 from app.shortlinks.service import ShortLinkManager
 
 logger = logging.getLogger(__name__)
 
 
 def _client_info():
-    ua = request.headers.get('User-Agent', '').lower()
+    return client_info(request.headers, request.remote_addr)
+
+
+def client_info(headers, remote_addr) -> dict:
+    """
+    Click attributes from request headers (Flask or Starlette). remote_addr
+    must already be the trusted client address (ProxyFix / uvicorn's proxy
+    headers), never X-Forwarded-For as sent.
+    """
+    ua = headers.get('User-Agent', '').lower()
     if 'mobile' in ua or 'android' in ua or 'iphone' in ua:
         device = 'mobile'
     elif 'tablet' in ua or 'ipad' in ua:
@@ -29,19 +40,49 @@ def _client_info():
         browser = 'Other'
 
     return {
-        'ip': request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr),
-        'referrer': request.headers.get('Referer', 'Direct'),
-        'country': request.headers.get('CF-IPCountry', 'Unknown'),
+        'ip': remote_addr or '0.0.0.0',
+        'referrer': headers.get('Referer', 'Direct'),
+        'country': headers.get('CF-IPCountry', 'Unknown'),
         'device_type': device,
         'browser': browser,
     }
 
 
-@redirect_bp.route('/<slug>')
+_UNLOCK_ERRORS = {
+    unlock.PASSWORD_REQUIRED: ('Password required', 401),
+    unlock.INVALID_PASSWORD: ('Invalid password', 401),
+    unlock.TOO_MANY_ATTEMPTS: ('Too many attempts. Please wait.', 429),
+    unlock.BUSY: ('Server busy. Please retry.', 503),
+}
+
+
+def unlock_error(outcome: str):
+    """(message, status, Retry-After or None) for a failed unlock."""
+    message, status = _UNLOCK_ERRORS[outcome]
+    if status == 429:
+        return message, status, str(unlock.ATTEMPT_WINDOW)
+    if status == 503:
+        return message, status, '1'
+    return message, status, None
+
+
+@redirect_bp.route('/<slug>', methods=['GET', 'POST'])
 def handle_redirect(slug):
     if not slug or len(slug) > 255:
         abort(404)
-    dest = ShortLinkManager.track_click(slug, _client_info())
+    info = _client_info()
+    info['unlock_token'] = request.cookies.get(unlock.cookie_name(slug))
+    if request.method == 'POST':
+        body = request.get_json(silent=True) or request.form
+        info['password'] = body.get('password')
+
+    dest, err = ShortLinkManager.track_click(slug, info)
+    if err in _UNLOCK_ERRORS:
+        message, status, retry_after = unlock_error(err)
+        response = make_response(error_response(message, status, code=err.upper()))
+        if retry_after:
+            response.headers['Retry-After'] = retry_after
+        return response
     if not dest:
         abort(404)
     return flask_redirect(dest, code=302)
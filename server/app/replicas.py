@@ -0,0 +1,228 @@
+# server/app/replicas.py
+
+import os
+import time
+import logging
+import itertools
+from functools import wraps
+from typing import Optional, List, Dict, Any
+
+# Imported by app.extensions for db.session, so nothing from app at module level
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.sql.elements import TextClause
+
+logger = logging.getLogger(__name__)
+
+RYW_PREFIX = 'savlink:ryw'
+# Lag is measured by the health sampler's thread (app.health), never on a
+# request. Without a reading this recent (sampler stalled, or not started
+# yet) reads stay on the primary.
+LAG_STALE_AFTER = float(os.environ.get('REPLICA_LAG_STALE_AFTER', '30'))
+
+# Zero when the replica has replayed everything it received, otherwise the
+# age of the last replayed transaction. On a primary (misconfiguration or
+# failover) pg_is_in_recovery() is false and lag is reported as 0.
+_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class Replica:
+    __slots__ = ('name', 'engine', 'lag', 'healthy', 'checked_at', 'error')
+
+    def __init__(self, name: str, engine):
+        self.name = name
+        self.engine = engine
+        self.lag: Optional[float] = None
+        self.healthy = True
+        self.checked_at = 0.0
+        self.error: Optional[str] = None
+
+
+class ReplicaRouter:
+    """
+    Read replicas behind db.session. Views opt in with @read_replica; the
+    RoutingSession then sends their SELECTs to a replica whose measured lag
+    is within max_lag, and everything else (flushes, DML, locking reads,
+    requests inside a user's read-your-writes window) to the primary.
+    """
+
+    def __init__(self):
+        self.replicas: List[Replica] = []
+        self.max_lag = 5.0
+        self.ryw_window = 5
+        self._cycle = None
+        self._last_check = 0.0
+        self._recent_writes: Dict[str, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def init_app(self, app):
+        from app.config import _build_engine_options
+
+        urls = app.config.get('DATABASE_REPLICA_URLS') or []
+        self.max_lag = float(app.config.get('REPLICA_MAX_LAG', self.max_lag))
+        self.ryw_window = int(app.config.get('READ_YOUR_WRITES_WINDOW', self.ryw_window))
+        is_prod = app.config.get('FLASK_ENV') == 'production'
+
+        self.replicas = []
+        for i, url in enumerate(urls):
+            # Same worker/thread pool math as the primary, per replica
+            options = _build_engine_options(url, is_prod)
+            options['connect_args'] = dict(options.get('connect_args', {}),
+                                           application_name=f'savlink-replica-{i}')
+            self.replicas.append(Replica(f'replica-{i}', create_engine(url, **options)))
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+
+        if self.replicas:
+            logger.info("[DB] %d read replica(s) configured (max lag %.1fs, RYW window %ds)",
+                        len(self.replicas), self.max_lag, self.ryw_window)
+
+    def dispose(self, close: bool = True):
+        for r in self.replicas:
+            r.engine.dispose(close=close)
+
+    #  Selection
+
+    def pick(self) -> Optional[Replica]:
+        """A replica within max_lag by the last readings; never probes."""
+        if not self.replicas or time.time() - self._last_check > LAG_STALE_AFTER:
+            return None
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if self._serving(replica):
+                return replica
+        return None
+
+    def _serving(self, r: Replica) -> bool:
+        return r.healthy and r.lag is not None and r.lag <= self.max_lag
+
+    def check_lag(self) -> List[Dict[str, Any]]:
+        """Measures every replica. Called by the health sampler."""
+        for r in self.replicas:
+            try:
+                with r.engine.connect() as conn:
+                    r.lag = float(conn.execute(_LAG_SQL).scalar() or 0)
+                r.healthy, r.error = True, None
+            except Exception as e:
+                r.healthy, r.error = False, str(e)[:200]
+                logger.warning("[DB] %s unreachable: %s", r.name, e)
+            r.checked_at = time.time()
+        self._last_check = time.time()
+        return self.status()
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                'name': r.name,
+                'healthy': r.healthy,
+                'lag_seconds': round(r.lag, 3) if r.lag is not None else None,
+                'serving': self._serving(r),
+                'checked_at': r.checked_at,
+                **({'error': r.error} if r.error else {}),
+                'pool': {'size': r.engine.pool.size(), 'checked_out': r.engine.pool.checkedout()},
+            }
+            for r in self.replicas
+        ]
+
+    #  Read-your-writes
+
+    def mark_write(self, uid: str):
+        from app.extensions import redis_client
+        self._recent_writes[uid] = time.time() + self.ryw_window
+        if len(self._recent_writes) > 10000:
+            now = time.time()
+            self._recent_writes = {k: v for k, v in self._recent_writes.items() if v > now}
+        if redis_client.available:
+            redis_client.setex(f'{RYW_PREFIX}:{uid}', self.ryw_window, '1')
+
+    def recently_wrote(self, uid: str) -> bool:
+        from app.extensions import redis_client
+        if self._recent_writes.get(uid, 0) > time.time():
+            return True
+        if redis_client.available:
+            return bool(redis_client.exists(f'{RYW_PREFIX}:{uid}'))
+        return False
+
+
+replica_router = ReplicaRouter()
+
+
+#  Session
+
+def _is_write(clause) -> bool:
+    if clause is None:
+        return False
+    if getattr(clause, 'is_dml', False):
+        return True
+    if getattr(clause, '_for_update_arg', None) is not None:
+        return True
+    if isinstance(clause, TextClause):
+        head = clause.text.lstrip()[:6].upper()
+        return head not in ('SELECT', 'WITH')
+    return False
+
+
+class RoutingSession(Session):
+    """db.session class: replica for opted-in reads, primary for the rest."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context():
+            replica = g.get('_db_replica')
+            if replica is not None and not g.get('_db_wrote') and not _is_write(clause):
+                return replica.engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _after_flush(session, flush_context):
+    if replica_router.enabled and has_app_context():
+        # The rest of this request reads its own writes from the primary
+        g._db_wrote = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _on_execute(orm_execute_state):
+    # Bulk insert/update/delete statements don't flush
+    if replica_router.enabled and has_app_context() and (
+        orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete
+    ):
+        g._db_wrote = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _after_commit(session):
+    if not replica_router.enabled or not has_app_context() or not g.get('_db_wrote'):
+        return
+    user = g.get('current_user')
+    uid = user.get('id') if isinstance(user, dict) else getattr(user, 'id', None)
+    if uid:
+        replica_router.mark_write(uid)
+
+
+def read_replica(f):
+    """
+    Lets a read-only view's queries go to a replica. Place under
+    @require_auth so the user's read-your-writes window is honoured.
+    """
+    @wraps(f)
+    def wrapped(*args, **kwargs):
+        if not replica_router.enabled:
+            return f(*args, **kwargs)
+        user = g.get('current_user')
+        uid = user.get('id') if isinstance(user, dict) else getattr(user, 'id', None)
+        if not (uid and replica_router.recently_wrote(uid)):
+            g._db_replica = replica_router.pick()
+        try:
+            return f(*args, **kwargs)
+        finally:
+            g._db_replica = None
+    return wrapped
@@ -1,9 +1,12 @@
 # server/app/responses.py
-from flask import jsonify
+from flask import jsonify, current_app
 from typing import Any, Optional
+from app.json_provider import Encoded, dumps
 
 
 def success_response(data: Optional[Any] = None, message: Optional[str] = None, status: int = 200):
+    if isinstance(data, Encoded):
+        return _encoded_response(data, message), status
     body = {'success': True}
     if data is not None:
         body['data'] = data
@@ -16,4 +19,12 @@ def error_response(message: str, status: int = 400, code: Optional[str] = None):
     body = {'success': False, 'error': message}
     if code:
         body['code'] = code
-    return jsonify(body), status
\ No newline at end of file
+    return jsonify(body), status
+
+
+def _encoded_response(data: Encoded, message: Optional[str]):
+    # The envelope around pre-encoded bytes; the payload is never decoded
+    tail = b',"message":' + dumps(message) + b'}' if message else b'}'
+    return current_app.response_class(
+        b'{"success":true,"data":' + data.raw + tail, mimetype='application/json',
+    )
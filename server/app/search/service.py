@@ -1,20 +1,25 @@
 # server/app/search/service.py
 import re
 import json
+import hashlib
 import logging
 from datetime import datetime
-from typing import Dict, Any, List, Optional
-from sqlalchemy import or_, func, desc, case, and_
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import select, exists, or_, func, desc, case, and_
 from sqlalchemy.orm import joinedload
 from app.extensions import db, redis_client
 from app.models import Link, Folder, Tag, LinkTag
-from app.utils.url import extract_domain
-from app.dashboard.serializers import serialize_link
+from app.dashboard.serializers import serialize_links
+from app.metadata.store import load_page_metadata_async
 
 logger = logging.getLogger(__name__)
 
 
 class SearchEngine:
+    """
+    Statements and result shaping are shared; search() runs them on
+    db.session and search_async() on an AsyncSession for the ASGI app.
+    """
     CACHE_TTL = 300
     MAX_HISTORY = 50
 
@@ -23,117 +28,161 @@ class SearchEngine:
         self.prefix = f"search:{user_id}"
 
     def search(self, query: str, filters: Optional[Dict] = None, limit: int = 50) -> Dict[str, Any]:
-        normalized = re.sub(r'\s+', ' ', query.strip()).lower()
+        normalized = _normalize(query)
         if not normalized:
             return self._empty()
 
-        cache_key = f"{self.prefix}:{hash(normalized)}:{hash(str(filters))}"
+        cache_key = self._cache_key(normalized, filters)
         if redis_client.available:
-            cached = redis_client.get(cache_key)
-            if cached:
-                try:
-                    return json.loads(cached)
-                except (json.JSONDecodeError, TypeError):
-                    pass
+            cached = _decode(redis_client.get(cache_key))
+            if cached is not None:
+                return cached
 
         self._record(query)
 
-        links = self._search_links(normalized, filters, limit)
-        folders = self._search_folders(normalized, limit // 4)
-        tags = self._search_tags(normalized, limit // 4)
-
-        results = {
-            'query': query, 'links': links, 'folders': folders, 'tags': tags,
-            'stats': {'total': len(links) + len(folders) + len(tags),
-                      'links_count': len(links), 'folders_count': len(folders), 'tags_count': len(tags)},
-        }
+        link_rows = db.session.execute(self._links_statement(normalized, filters, limit)).all()
+        folders = db.session.execute(self._folders_statement(normalized, limit // 4)).scalars().all()
+        counts = dict(db.session.execute(self._folder_counts_statement(folders)).all()) if folders else {}
+        tag_rows = db.session.execute(self._tags_statement(normalized, limit // 4)).all()
 
+        results = self._results(query, link_rows, folders, counts, tag_rows)
         if redis_client.available:
             redis_client.setex(cache_key, self.CACHE_TTL, json.dumps(results, default=str))
+        return results
 
+    async def search_async(self, session, cache, query: str, filters: Optional[Dict] = None,
+                           limit: int = 50) -> Dict[str, Any]:
+        normalized = _normalize(query)
+        if not normalized:
+            return self._empty()
+
+        cache_key = self._cache_key(normalized, filters)
+        if cache.available:
+            cached = _decode(await cache.get(cache_key))
+            if cached is not None:
+                return cached
+            await self._record_async(cache, query)
+
+        link_rows = (await session.execute(self._links_statement(normalized, filters, limit))).all()
+        folders = (await session.execute(self._folders_statement(normalized, limit // 4))).scalars().all()
+        counts = dict((await session.execute(self._folder_counts_statement(folders))).all()) if folders else {}
+        tag_rows = (await session.execute(self._tags_statement(normalized, limit // 4))).all()
+        # serialize_links reads page metadata through the memo this fills
+        await load_page_metadata_async(session, [link.url_hash for link, _ in link_rows])
+
+        results = self._results(query, link_rows, folders, counts, tag_rows)
+        if cache.available:
+            await cache.setex(cache_key, self.CACHE_TTL, json.dumps(results, default=str))
         return results
 
-    def _search_links(self, query: str, filters: Optional[Dict], limit: int) -> List[Dict]:
-        q = Link.query.options(joinedload(Link.folder)).filter(
+    #  Statements
+
+    def _links_statement(self, query: str, filters: Optional[Dict], limit: int):
+        stmt = select(Link).options(joinedload(Link.folder)).where(
             Link.user_id == self.user_id, Link.soft_deleted == False, Link.archived_at.is_(None))
 
         if filters:
             if filters.get('starred'):
-                q = q.filter(Link.starred == True)
+                stmt = stmt.where(Link.starred == True)
             if filters.get('pinned'):
-                q = q.filter(Link.pinned == True)
+                stmt = stmt.where(Link.pinned == True)
             if filters.get('link_type'):
-                q = q.filter(Link.link_type == filters['link_type'])
+                stmt = stmt.where(Link.link_type == filters['link_type'])
             if filters.get('folder_id'):
-                q = q.filter(Link.folder_id == filters['folder_id'])
+                stmt = stmt.where(Link.folder_id == filters['folder_id'])
             elif filters.get('unassigned_only'):
-                q = q.filter(Link.folder_id.is_(None))
-            if filters.get('tag_ids'):
-                for tid in filters['tag_ids']:
-                    sub = db.session.query(LinkTag.link_id).filter(LinkTag.tag_id == tid, LinkTag.link_id == Link.id)
-                    q = q.filter(sub.exists())
+                stmt = stmt.where(Link.folder_id.is_(None))
+            for tid in filters.get('tag_ids') or []:
+                stmt = stmt.where(exists().where(LinkTag.tag_id == tid, LinkTag.link_id == Link.id))
 
         pat = f'%{query}%'
-        q = q.filter(or_(
+        stmt = stmt.where(or_(
             func.lower(Link.title).like(pat), func.lower(Link.original_url).like(pat),
             func.lower(Link.notes).like(pat), func.lower(Link.slug).like(pat)))
 
         relevance = (
-            case([(func.lower(Link.title) == query, 100),
-                  (func.lower(Link.title).like(f'{query}%'), 80),
-                  (func.lower(Link.title).like(pat), 60)], else_=0) +
-            case([(func.lower(Link.original_url).like(pat), 40)], else_=0) +
-            case([(func.lower(Link.notes).like(pat), 30)], else_=0) +
-            case([(Link.pinned == True, 20)], else_=0) +
-            case([(Link.starred == True, 15)], else_=0)
+            case((func.lower(Link.title) == query, 100),
+                 (func.lower(Link.title).like(f'{query}%'), 80),
+                 (func.lower(Link.title).like(pat), 60), else_=0) +
+            case((func.lower(Link.original_url).like(pat), 40), else_=0) +
+            case((func.lower(Link.notes).like(pat), 30), else_=0) +
+            case((Link.pinned == True, 20), else_=0) +
+            case((Link.starred == True, 15), else_=0)
         )
 
-        rows = q.add_columns(relevance.label('rel')).order_by(
-            desc('rel'), desc(Link.pinned), desc(Link.updated_at)).limit(limit).all()
-
-        results = []
-        for link, rel in rows:
-            d = serialize_link(link)
-            d['search_relevance'] = float(rel) if rel else 0
-            results.append(d)
-        return results
+        return stmt.add_columns(relevance.label('rel')).order_by(
+            desc('rel'), desc(Link.pinned), desc(Link.updated_at)).limit(limit)
 
-    def _search_folders(self, query: str, limit: int) -> List[Dict]:
-        pat = f'%{query}%'
-        folders = Folder.query.filter(
+    def _folders_statement(self, query: str, limit: int):
+        return select(Folder).where(
             Folder.user_id == self.user_id, Folder.soft_deleted == False,
-            func.lower(Folder.name).like(pat)
-        ).order_by(desc(Folder.pinned), Folder.name).limit(limit).all()
-        from app.folders.service import serialize_folder
-        return [serialize_folder(f, counts=True) for f in folders]
+            func.lower(Folder.name).like(f'%{query}%')
+        ).order_by(desc(Folder.pinned), Folder.name).limit(limit)
 
-    def _search_tags(self, query: str, limit: int) -> List[Dict]:
-        pat = f'%{query}%'
-        rows = db.session.query(Tag, func.count(LinkTag.id).label('cnt')).outerjoin(
+    def _folder_counts_statement(self, folders: List[Folder]):
+        return select(Link.folder_id, func.count(Link.id)).where(
+            Link.folder_id.in_([f.id for f in folders]), Link.user_id == self.user_id,
+            Link.soft_deleted == False, Link.archived_at.is_(None),
+        ).group_by(Link.folder_id)
+
+    def _tags_statement(self, query: str, limit: int):
+        return select(Tag, func.count(LinkTag.id).label('cnt')).outerjoin(
             LinkTag, and_(LinkTag.tag_id == Tag.id, LinkTag.user_id == self.user_id)
-        ).filter(Tag.user_id == self.user_id, func.lower(Tag.name).like(pat)
-        ).group_by(Tag.id).order_by(desc('cnt')).limit(limit).all()
-        return [{'id': t.id, 'name': t.name, 'color': t.color, 'usage_count': c} for t, c in rows]
+        ).where(Tag.user_id == self.user_id, func.lower(Tag.name).like(f'%{query}%')
+        ).group_by(Tag.id).order_by(desc('cnt')).limit(limit)
+
+    #  Results
+
+    def _results(self, query: str, link_rows, folders, counts: Dict[int, int], tag_rows) -> Dict[str, Any]:
+        from app.folders.service import serialize_folder
+
+        links = serialize_links([link for link, _ in link_rows])
+        for d, (_, rel) in zip(links, link_rows):
+            d['search_relevance'] = float(rel) if rel else 0
+        folders = [serialize_folder(f, counts=True, precomputed_counts=counts) for f in folders]
+        tags = [{'id': t.id, 'name': t.name, 'color': t.color, 'usage_count': c} for t, c in tag_rows]
+
+        return {
+            'query': query, 'links': links, 'folders': folders, 'tags': tags,
+            'stats': {'total': len(links) + len(folders) + len(tags),
+                      'links_count': len(links), 'folders_count': len(folders), 'tags_count': len(tags)},
+        }
+
+    def _cache_key(self, normalized: str, filters: Optional[Dict]) -> str:
+        # hash() is salted per process; the key must match across workers
+        digest = hashlib.sha1(f'{normalized}\x00{json.dumps(filters, sort_keys=True)}'.encode()).hexdigest()[:20]
+        return f"{self.prefix}:{digest}"
+
+    #  History
 
     def _record(self, query: str):
         if not redis_client.available:
             return
         try:
             key = f"{self.prefix}:history"
-            raw = redis_client.get(key)
-            history = json.loads(raw) if raw else []
-            for entry in history:
-                if entry['query'].lower() == query.lower():
-                    entry['count'] += 1
-                    entry['ts'] = datetime.utcnow().isoformat()
-                    break
-            else:
-                history.append({'query': query, 'ts': datetime.utcnow().isoformat(), 'count': 1})
-            history.sort(key=lambda x: (x['count'], x['ts']), reverse=True)
-            redis_client.setex(key, 86400 * 30, json.dumps(history[:self.MAX_HISTORY]))
+            redis_client.setex(key, 86400 * 30, self._merge_history(redis_client.get(key), query))
+        except Exception as e:
+            logger.warning("Search history save failed: %s", e)
+
+    async def _record_async(self, cache, query: str):
+        try:
+            key = f"{self.prefix}:history"
+            await cache.setex(key, 86400 * 30, self._merge_history(await cache.get(key), query))
         except Exception as e:
             logger.warning("Search history save failed: %s", e)
 
+    def _merge_history(self, raw: Optional[str], query: str) -> str:
+        history = json.loads(raw) if raw else []
+        for entry in history:
+            if entry['query'].lower() == query.lower():
+                entry['count'] += 1
+                entry['ts'] = datetime.utcnow().isoformat()
+                break
+        else:
+            history.append({'query': query, 'ts': datetime.utcnow().isoformat(), 'count': 1})
+        history.sort(key=lambda x: (x['count'], x['ts']), reverse=True)
+        return json.dumps(history[:self.MAX_HISTORY])
+
     def get_history(self, limit: int = 10) -> List[Dict]:
         if not redis_client.available:
             return []
@@ -143,6 +192,55 @@ class SearchEngine:
         except Exception:
             return []
 
+    async def get_history_async(self, cache, limit: int = 10) -> List[Dict]:
+        if not cache.available:
+            return []
+        try:
+            raw = await cache.get(f"{self.prefix}:history")
+            return json.loads(raw)[:limit] if raw else []
+        except Exception:
+            return []
+
     def _empty(self):
         return {'query': '', 'links': [], 'folders': [], 'tags': [],
-                'stats': {'total': 0, 'links_count': 0, 'folders_count': 0, 'tags_count': 0}}
\ No newline at end of file
+                'stats': {'total': 0, 'links_count': 0, 'folders_count': 0, 'tags_count': 0}}
+
+
+def parse_search_args(args) -> Tuple[Dict[str, Any], int]:
+    """(filters, limit) from query-string args (Flask or Starlette)."""
+    filters = {}
+    for flag in ('starred', 'pinned', 'frequently_used', 'unassigned_only'):
+        if args.get(flag) == 'true':
+            filters[flag] = True
+    if args.get('link_type'):
+        filters['link_type'] = args.get('link_type')
+    if args.get('folder_id'):
+        try:
+            filters['folder_id'] = int(args.get('folder_id'))
+        except ValueError:
+            pass
+    tag_str = args.get('tag_ids')
+    if tag_str:
+        try:
+            filters['tag_ids'] = [int(x) for x in tag_str.split(',') if x.strip()]
+        except ValueError:
+            pass
+
+    try:
+        limit = min(max(1, int(args.get('limit', 50))), 200)
+    except ValueError:
+        limit = 50
+    return filters, limit
+
+
+def _normalize(query: str) -> str:
+    return re.sub(r'\s+', ' ', query.strip()).lower()
+
+
+def _decode(raw: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return None
@@ -2,6 +2,8 @@
 import re
 from flask import request, g, Blueprint
 from app.auth.middleware import require_auth
+from app.replicas import read_replica
+from app.middleware.admission import priority
 from app.responses import success_response, error_response
 from app.shortlinks.service import ShortLinkManager
 from app.dashboard.serializers import serialize_link
@@ -24,6 +26,7 @@ def create():
 
 @shortlinks_bp.route('/bulk', methods=['POST'])
 @require_auth
+@priority('bulk')
 def bulk_create():
     data = request.get_json()
     if not data or not isinstance(data.get('links'), list):
@@ -36,6 +39,7 @@ def bulk_create():
 
 @shortlinks_bp.route('/<int:link_id>/analytics', methods=['GET'])
 @require_auth
+@read_replica
 def analytics(link_id):
     try:
         days = min(max(1, int(request.args.get('days', 30))), 365)
@@ -78,6 +82,7 @@ def toggle_active(link_id):
 
 @shortlinks_bp.route('/analytics/summary', methods=['GET'])
 @require_auth
+@read_replica
 def summary():
     try:
         days = min(max(1, int(request.args.get('days', 30))), 365)
@@ -1,15 +1,19 @@
 # server/app/shortlinks/service.py
 import json
+import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, Tuple, List
+from sqlalchemy import select
+from sqlalchemy.orm import noload
 from app.extensions import db, redis_client
 from app.models import Link
 from app.links.service import _validate_url, _parse_expiration, _append_utm
 from app.utils.slug import generate_unique_slug, is_slug_available
-from app.utils.crypto import hash_password, verify_password
+from app.utils.crypto import hash_password
 from app.utils.url import extract_domain
 from app.cache.invalidation import on_link_change
+from app.shortlinks import unlock
 
 logger = logging.getLogger(__name__)
 
@@ -139,24 +143,30 @@ class ShortLinkManager:
         }
 
     @staticmethod
-    def track_click(slug: str, client_info: Dict[str, Any]) -> Optional[str]:
-        link = Link.query.filter_by(slug=slug, link_type='shortened', soft_deleted=False).first()
-        if not link or not link.is_active:
-            return None
+    def is_followable(link: Optional[Link]) -> bool:
+        """Active, unexpired, unarchived and under its click limit."""
+        if not link or not link.is_active or link.archived_at:
+            return False
         if link.expires_at and datetime.utcnow() > link.expires_at:
-            return None
-        if link.archived_at:
-            return None
+            return False
+        cl = (link.metadata_ or {}).get('click_limit')
+        return not (cl and link.click_count >= cl)
 
-        meta = link.metadata_ or {}
-        cl = meta.get('click_limit')
-        if cl and link.click_count >= cl:
-            return None
+    @staticmethod
+    def is_protected(link: Link) -> bool:
+        return bool(link.password_hash and (link.metadata_ or {}).get('password_protected'))
 
-        if link.password_hash and meta.get('password_protected'):
-            password = client_info.get('password')
-            if not password or not verify_password(password, link.password_hash):
-                return None
+    @staticmethod
+    def track_click(slug: str, client_info: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        """Returns (destination, None) or (None, reason) — see app.shortlinks.unlock."""
+        link = Link.query.filter_by(slug=slug, link_type='shortened', soft_deleted=False).first()
+        if not ShortLinkManager.is_followable(link):
+            return None, 'not_found'
+
+        if ShortLinkManager.is_protected(link):
+            outcome = unlock.check_password(link, client_info)
+            if outcome != unlock.UNLOCKED:
+                return None, outcome
 
         link.click_count = Link.click_count + 1
         db.session.commit()
@@ -164,31 +174,82 @@ class ShortLinkManager:
         if redis_client.available:
             _track_redis(link.id, client_info)
 
-        return link.original_url
+        return link.original_url, None
+
+    @staticmethod
+    async def track_click_async(session, cache, slug: str,
+                                client_info: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        """track_click for the ASGI app: session is an AsyncSession, cache an AsyncRedis."""
+        result = await session.execute(
+            select(Link).options(noload(Link.tags))
+            .filter_by(slug=slug, link_type='shortened', soft_deleted=False).limit(1)
+        )
+        link = result.scalar_one_or_none()
+        if not ShortLinkManager.is_followable(link):
+            return None, 'not_found'
+
+        if ShortLinkManager.is_protected(link):
+            # PBKDF2 pool and failure counters are blocking
+            outcome = await asyncio.to_thread(unlock.check_password, link, client_info)
+            if outcome != unlock.UNLOCKED:
+                return None, outcome
+
+        link.click_count = Link.click_count + 1
+        await session.commit()
+
+        if cache.available:
+            await _track_redis_async(cache, link.id, client_info)
+
+        return link.original_url, None
+
+
+ANALYTICS_TTL = 86400 * 365
+UNIQUE_IP_TTL = 86400
+
+
+def analytics_keys(link_id: int, info: Dict[str, Any]) -> Tuple[str, str]:
+    return f"analytics:{link_id}", f"analytics:{link_id}:ip:{info.get('ip', '')}"
+
+
+def merge_click(raw: Optional[str], info: Dict[str, Any], unique: bool) -> str:
+    """Adds one click to the JSON analytics blob; returns it re-encoded."""
+    data = json.loads(raw) if raw else {
+        'total_clicks': 0, 'unique_clicks': 0,
+        'countries': {}, 'devices': {}, 'referrers': {}, 'daily_clicks': {},
+    }
+    data['total_clicks'] += 1
+    today = datetime.utcnow().strftime('%Y-%m-%d')
+    data['daily_clicks'][today] = data['daily_clicks'].get(today, 0) + 1
+
+    for dim, key_name in [('countries', 'country'), ('devices', 'device_type'), ('referrers', 'referrer')]:
+        val = info.get(key_name, 'Unknown')
+        data[dim][val] = data[dim].get(val, 0) + 1
+
+    if unique:
+        data['unique_clicks'] += 1
+    return json.dumps(data)
 
 
 def _track_redis(link_id: int, info: Dict[str, Any]):
-    key = f"analytics:{link_id}"
+    key, ip_key = analytics_keys(link_id, info)
     try:
         raw = redis_client.get(key)
-        data = json.loads(raw) if raw else {
-            'total_clicks': 0, 'unique_clicks': 0,
-            'countries': {}, 'devices': {}, 'referrers': {}, 'daily_clicks': {},
-        }
-        data['total_clicks'] += 1
-        today = datetime.utcnow().strftime('%Y-%m-%d')
-        data['daily_clicks'][today] = data['daily_clicks'].get(today, 0) + 1
-
-        for dim, key_name in [('countries', 'country'), ('devices', 'device_type'), ('referrers', 'referrer')]:
-            val = info.get(key_name, 'Unknown')
-            data[dim][val] = data[dim].get(val, 0) + 1
+        unique = not redis_client.exists(ip_key)
+        if unique:
+            redis_client.setex(ip_key, UNIQUE_IP_TTL, '1')
+        redis_client.setex(key, ANALYTICS_TTL, merge_click(raw, info, unique))
+    except Exception as e:
+        logger.warning("Analytics tracking failed: %s", e)
 
-        ip_key = f"analytics:{link_id}:ip:{info.get('ip', '')}"
-        if not redis_client.exists(ip_key):
-            redis_client.setex(ip_key, 86400, '1')
-            data['unique_clicks'] += 1
 
-        redis_client.setex(key, 86400 * 365, json.dumps(data))
+async def _track_redis_async(cache, link_id: int, info: Dict[str, Any]):
+    key, ip_key = analytics_keys(link_id, info)
+    try:
+        raw = await cache.get(key)
+        unique = not await cache.exists(ip_key)
+        if unique:
+            await cache.setex(ip_key, UNIQUE_IP_TTL, '1')
+        await cache.setex(key, ANALYTICS_TTL, merge_click(raw, info, unique))
     except Exception as e:
         logger.warning("Analytics tracking failed: %s", e)
 
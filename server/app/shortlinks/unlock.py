@@ -0,0 +1,253 @@
+# server/app/shortlinks/unlock.py
+
+import os
+import time
+import hmac
+import hashlib
+import secrets
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Dict, Tuple, Any
+
+from flask import current_app, request, after_this_request, has_request_context
+from itsdangerous import URLSafeTimedSerializer, BadSignature
+
+from app.extensions import redis_client
+from app.utils.crypto import (
+    PASSWORD_ITERATIONS, verify_password, needs_rehash, split_password_hash, format_password_hash,
+)
+
+logger = logging.getLogger(__name__)
+
+VERIFY_WORKERS = int(os.environ.get('PASSWORD_VERIFY_WORKERS', '2'))
+VERIFY_QUEUE = int(os.environ.get('PASSWORD_VERIFY_QUEUE', str(VERIFY_WORKERS * 4)))
+VERIFY_TIMEOUT = 10
+UNLOCK_TTL = int(os.environ.get('LINK_UNLOCK_TTL', '3600'))
+ATTEMPT_LIMIT = int(os.environ.get('LINK_PASSWORD_ATTEMPTS', '5'))
+ATTEMPT_WINDOW = int(os.environ.get('LINK_PASSWORD_WINDOW', '900'))
+# Per link across all addresses, so rotating IPs still hits a ceiling
+LINK_ATTEMPT_LIMIT = int(os.environ.get('LINK_PASSWORD_ATTEMPTS_PER_LINK', '50'))
+
+COOKIE_PREFIX = 'slu_'
+FAILURE_PREFIX = 'savlink:pwfail'
+
+# Outcomes of check_password
+UNLOCKED = 'unlocked'
+PASSWORD_REQUIRED = 'password_required'
+INVALID_PASSWORD = 'invalid_password'
+TOO_MANY_ATTEMPTS = 'too_many_attempts'
+BUSY = 'busy'
+
+
+#  PBKDF2 pool
+
+class PasswordHasher:
+    """
+    Runs PBKDF2 in a small process pool, so hashing CPU per worker is capped
+    at VERIFY_WORKERS cores whatever the request concurrency. At most
+    VERIFY_QUEUE jobs may be pending; beyond that callers are told to back
+    off instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int = VERIFY_WORKERS, queue: int = VERIFY_QUEUE):
+        self._workers = workers
+        self._slots = threading.BoundedSemaphore(queue)
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        if self._workers <= 0:
+            return None
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a threaded gunicorn worker can deadlock the child
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self._workers, mp_context=multiprocessing.get_context('spawn'),
+                )
+            return self._pool
+
+    def run(self, fn, *args):
+        """
+        Returns fn(*args), or raises OverflowError when the queue is full.
+        fn should be a stdlib callable so the spawned children never import
+        the app.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise OverflowError('password verification queue full')
+        try:
+            pool = self._executor()
+            if pool is None:
+                return fn(*args)
+            try:
+                return pool.submit(fn, *args).result(timeout=VERIFY_TIMEOUT)
+            except BrokenProcessPool:
+                logger.warning("[UNLOCK] Process pool broken, recreating")
+                with self._lock:
+                    self._pool = None
+                return fn(*args)
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+hasher = PasswordHasher()
+
+
+def _verify(password: str, stored: str) -> bool:
+    parts = split_password_hash(stored)
+    if parts is None or not parts[0]:
+        return verify_password(password, stored)  # legacy SHA256 or malformed: no PBKDF2
+    iterations, salt, key_hex = parts
+    key = hasher.run(hashlib.pbkdf2_hmac, 'sha256', password.encode(), salt.encode(), iterations)
+    return hmac.compare_digest(key.hex(), key_hex)
+
+
+def _hash(password: str) -> str:
+    salt = secrets.token_hex(16)
+    key = hasher.run(hashlib.pbkdf2_hmac, 'sha256', password.encode(), salt.encode(), PASSWORD_ITERATIONS)
+    return format_password_hash(PASSWORD_ITERATIONS, salt, key)
+
+
+#  Unlock tokens
+
+def _serializer() -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='savlink-link-unlock')
+
+
+def _fingerprint(password_hash: str) -> str:
+    # Changing the password invalidates every outstanding unlock token
+    return hashlib.sha256(password_hash.encode()).hexdigest()[:16]
+
+
+def cookie_name(slug: str) -> str:
+    return f'{COOKIE_PREFIX}{slug}'
+
+
+def issue_unlock_token(slug: str, password_hash: str) -> str:
+    return _serializer().dumps([slug, _fingerprint(password_hash)])
+
+
+def is_unlocked(slug: str, password_hash: str, token: Optional[str]) -> bool:
+    if not token:
+        return False
+    try:
+        data = _serializer().loads(token, max_age=UNLOCK_TTL)
+    except BadSignature:
+        return False
+    return data == [slug, _fingerprint(password_hash)]
+
+
+def _set_unlock_cookie(slug: str, password_hash: str, client_info: Dict[str, Any]):
+    # Left in client_info for callers outside a Flask request (ASGI)
+    token = client_info['issued_unlock_token'] = issue_unlock_token(slug, password_hash)
+    if not has_request_context():
+        return
+
+    @after_this_request
+    def _cookie(response):
+        response.set_cookie(
+            cookie_name(slug), token, max_age=UNLOCK_TTL, path=request.path,
+            secure=not current_app.debug, httponly=True, samesite='Lax',
+        )
+        return response
+
+
+#  Failed attempts
+
+_local_failures: Dict[str, Tuple[int, float]] = {}
+
+# INCR with the window set in the same call: a counter can never be left
+# without an expiry (and the link locked for good)
+_RECORD_LUA = """
+for _, key in ipairs(KEYS) do
+  redis.call('INCR', key)
+  if redis.call('TTL', key) < 0 then redis.call('EXPIRE', key, ARGV[1]) end
+end
+return 1
+"""
+
+
+def _failure_keys(slug: str, ip: str) -> Tuple[str, str]:
+    """(per slug + client address, per slug) counters."""
+    return f'{FAILURE_PREFIX}:{slug}:{ip}', f'{FAILURE_PREFIX}:{slug}'
+
+
+def _locked_out(keys: Tuple[str, str]) -> bool:
+    if redis_client.available:
+        counts = [int(v) if v else 0 for v in (redis_client.mget(list(keys)) or (None, None))]
+    else:
+        now = time.time()
+        counts = [c if e > now else 0 for c, e in (_local_failures.get(k, (0, 0)) for k in keys)]
+    return counts[0] >= ATTEMPT_LIMIT or counts[1] >= LINK_ATTEMPT_LIMIT
+
+
+def _record_failure(keys: Tuple[str, str]):
+    if redis_client.available:
+        redis_client.eval(_RECORD_LUA, list(keys), [ATTEMPT_WINDOW])
+        return
+    now = time.time()
+    if len(_local_failures) > 10000:
+        _local_failures.clear()
+    for key in keys:
+        count, expires = _local_failures.get(key, (0, 0))
+        if expires <= now:
+            count, expires = 0, now + ATTEMPT_WINDOW
+        _local_failures[key] = (count + 1, expires)
+
+
+def _clear_failures(key: str):
+    # Only this client's counter: the link-wide one still bounds everyone else
+    if redis_client.available:
+        redis_client.delete(key)
+    _local_failures.pop(key, None)
+
+
+#  Entry point
+
+def check_password(link, client_info: Dict[str, Any]) -> str:
+    """
+    Decides whether a protected link may be followed. A valid unlock cookie
+    skips hashing entirely; otherwise the submitted password is verified in
+    the pool, failures are counted per slug + IP and per slug, and success
+    issues a cookie. Hashes below the current cost are upgraded in place (the caller
+    commits).
+    """
+    slug, stored = link.slug, link.password_hash
+    if is_unlocked(slug, stored, client_info.get('unlock_token')):
+        return UNLOCKED
+
+    password = client_info.get('password')
+    if not password:
+        return PASSWORD_REQUIRED
+
+    keys = _failure_keys(slug, client_info.get('ip', ''))
+    if _locked_out(keys):
+        return TOO_MANY_ATTEMPTS
+
+    try:
+        ok = _verify(password, stored)
+    except (OverflowError, FutureTimeout) as e:
+        logger.warning("[UNLOCK] Verification rejected for %s: %s", slug, e)
+        return BUSY
+
+    if ok and needs_rehash(stored):
+        try:
+            link.password_hash = stored = _hash(password)
+        except (OverflowError, FutureTimeout):
+            pass  # upgrade on a later unlock
+
+    if not ok:
+        _record_failure(keys)
+        return INVALID_PASSWORD
+
+    _clear_failures(keys[0])
+    _set_unlock_cookie(slug, stored, client_info)
+    return UNLOCKED
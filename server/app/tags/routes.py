@@ -6,10 +6,13 @@ from app.auth.middleware import require_auth
 from app.auth.utils import get_current_user_id as uid
 from app.responses import success_response, error_response
 from app.tags import service
+from app.middleware.conditional import conditional
+from app.cache import keys as K
 
 
 @tags_bp.route('', methods=['GET'])
 @require_auth
+@conditional(K.TTL_TAGS)
 def list_tags():
     tags = service.get_user_tags(uid())
     return success_response({'tags': tags})
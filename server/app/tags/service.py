@@ -2,6 +2,11 @@
 from typing import Optional, List, Dict, Any
 from app.extensions import db
 from app.models import Tag, LinkTag
+from app.cache.invalidation import on_tag_change, on_link_change, on_related_change
+
+
+def _tagged_link_ids(user_id: str, tag_id: int) -> List[int]:
+    return [r[0] for r in db.session.query(LinkTag.link_id).filter_by(tag_id=tag_id, user_id=user_id).all()]
 
 
 def serialize_tag(tag: Tag) -> Dict[str, Any]:
@@ -17,6 +22,7 @@ def create_tag(user_id: str, data: Dict[str, Any]) -> Optional[Tag]:
     tag = Tag(user_id=user_id, name=name, color=data.get('color'))
     db.session.add(tag)
     db.session.commit()
+    on_tag_change(user_id)
     return tag
 
 
@@ -35,16 +41,21 @@ def update_tag(user_id: str, tag_id: int, data: Dict[str, Any]) -> Optional[Tag]
     tag = Tag.query.filter_by(id=tag_id, user_id=user_id).first()
     if not tag:
         return None
+    renamed = False
     if 'name' in data:
         name = data['name'].strip().lower()
         if not name:
             return None
         if Tag.query.filter(Tag.user_id == user_id, Tag.name == name, Tag.id != tag_id).first():
             return None
+        renamed = name != tag.name
         tag.name = name
     if 'color' in data:
         tag.color = data['color']
     db.session.commit()
+    on_tag_change(user_id)
+    if renamed:
+        on_related_change(_tagged_link_ids(user_id, tag_id))
     return tag
 
 
@@ -52,7 +63,11 @@ def delete_tag(user_id: str, tag_id: int) -> bool:
     tag = Tag.query.filter_by(id=tag_id, user_id=user_id).first()
     if not tag:
         return False
+    link_ids = _tagged_link_ids(user_id, tag_id)
     LinkTag.query.filter_by(tag_id=tag_id, user_id=user_id).delete()
     db.session.delete(tag)
     db.session.commit()
+    on_tag_change(user_id)
+    on_link_change(user_id)     # its links lost the tag
+    on_related_change(link_ids)
     return True
\ No newline at end of file
@@ -5,6 +5,7 @@ from app.trash import trash_bp
 from app.auth.middleware import require_auth
 from app.responses import success_response, error_response
 from app.trash import service
+from app.middleware.admission import priority
 
 
 @trash_bp.route('', methods=['GET'])
@@ -37,6 +38,7 @@ def restore_item(item_id):
 
 @trash_bp.route('/restore-bulk', methods=['POST'])
 @require_auth
+@priority('bulk')
 def restore_bulk():
     data = request.get_json()
     if not data or not data.get('items'):
@@ -56,6 +58,7 @@ def permanent_delete(item_id):
 
 @trash_bp.route('/empty', methods=['POST'])
 @require_auth
+@priority('bulk')
 def empty_trash():
     result = service.empty_trash(g.current_user.id)
     return success_response(result)
@@ -63,6 +66,7 @@ def empty_trash():
 
 @trash_bp.route('/auto-cleanup', methods=['POST'])
 @require_auth
+@priority('bulk')
 def auto_cleanup():
     """Remove items that have been in trash > 30 days."""
     result = service.auto_cleanup(g.current_user.id)
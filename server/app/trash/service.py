@@ -6,7 +6,7 @@ from typing import Dict, Any, Optional, List
 from app.extensions import db
 from app.models import Link, Folder, LinkTag
 from app.cache.invalidation import on_link_change, on_folder_change, on_bulk_change
-from app.dashboard.serializers import serialize_link
+from app.dashboard.serializers import serialize_links
 
 logger = logging.getLogger(__name__)
 
@@ -34,8 +34,7 @@ def get_trash(user_id: str, entity_type: str = 'all',
             .all()
         )
         has_more_links = len(links) > limit
-        for l in links[:limit]:
-            d = serialize_link(l)
+        for l, d in zip(links[:limit], serialize_links(links[:limit])):
             d['trash_type'] = 'link'
             d['deleted_at'] = l.updated_at.isoformat() if l.updated_at else None
             d['auto_delete_at'] = (
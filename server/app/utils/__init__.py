@@ -1,5 +1,6 @@
 # server/app/utils/__init__.py
-from .crypto import generate_secure_token, hash_token, hash_password, verify_password
-from .url import get_base_url, get_short_link_url, extract_display_url, extract_domain, build_favicon_url
+from .crypto import generate_secure_token, hash_token, hash_password, verify_password, needs_rehash
+from .url import get_base_url, get_short_link_url, extract_display_url, extract_domain, build_favicon_url, \
+    canonicalize_url, url_hash
 from .slug import generate_slug, generate_unique_slug, is_slug_available
 from .time import relative_time
\ No newline at end of file
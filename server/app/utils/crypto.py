@@ -3,6 +3,13 @@ import hashlib
 import hmac
 import secrets
 import os
+from typing import Optional, Tuple
+
+# Hashes are stored as pbkdf2_sha256$<iterations>$<salt>$<hex>, so the cost
+# can be raised later and older hashes upgraded on the next successful check.
+PASSWORD_SCHEME = 'pbkdf2_sha256'
+PASSWORD_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS', '200000'))
+LEGACY_ITERATIONS = 100000
 
 
 def generate_secure_token(length: int = 32) -> str:
@@ -13,16 +20,46 @@ def hash_token(token: str) -> str:
     return hashlib.sha256(token.encode()).hexdigest()
 
 
-def hash_password(password: str) -> str:
+def format_password_hash(iterations: int, salt: str, key: bytes) -> str:
+    return f"{PASSWORD_SCHEME}${iterations}${salt}${key.hex()}"
+
+
+def split_password_hash(stored: str) -> Optional[Tuple[int, str, str]]:
+    """(iterations, salt, key_hex) for PBKDF2 hashes, None for legacy SHA256."""
+    if stored.startswith(PASSWORD_SCHEME + '$'):
+        try:
+            _, iterations, salt, key_hex = stored.split('$', 3)
+            return int(iterations), salt, key_hex
+        except ValueError:
+            return 0, '', ''
+    if ':' in stored:
+        # Pre-scheme format: salt:hex at a fixed 100k iterations
+        salt, key_hex = stored.split(':', 1)
+        return LEGACY_ITERATIONS, salt, key_hex
+    return None
+
+
+def hash_password(password: str, iterations: int = None) -> str:
+    iterations = iterations or PASSWORD_ITERATIONS
     salt = secrets.token_hex(16)
-    key = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-    return f"{salt}:{key.hex()}"
+    key = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), iterations)
+    return format_password_hash(iterations, salt, key)
 
 
 def verify_password(password: str, stored: str) -> bool:
-    if ':' not in stored:
-        # Legacy SHA256 — compare directly, will migrate on next set
-        return hashlib.sha256(password.encode()).hexdigest() == stored
-    salt, key_hex = stored.split(':', 1)
-    new_key = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-    return hmac.compare_digest(new_key.hex(), key_hex)
\ No newline at end of file
+    parts = split_password_hash(stored)
+    if parts is None:
+        # Legacy SHA256 — compare directly, upgraded by needs_rehash
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored)
+    iterations, salt, key_hex = parts
+    if not iterations:
+        return False
+    new_key = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), iterations)
+    return hmac.compare_digest(new_key.hex(), key_hex)
+
+
+def needs_rehash(stored: str) -> bool:
+    """True if the hash isn't in the current scheme at the current cost."""
+    if not stored.startswith(PASSWORD_SCHEME + '$'):
+        return True
+    return split_password_hash(stored)[0] < PASSWORD_ITERATIONS
@@ -4,13 +4,12 @@ from datetime import datetime
 from typing import Optional
 
 
-def relative_time(dt: Optional[datetime]) -> str:
+def relative_time(dt: Optional[datetime], now: Optional[datetime] = None) -> str:
     if not dt:
         return ''
 
     try:
-        now = datetime.utcnow()
-        diff = now - dt
+        diff = (now or datetime.utcnow()) - dt
         seconds = int(diff.total_seconds())
 
         if seconds < 60:
@@ -1,6 +1,16 @@
 # server/app/utils/url.py
 import os
-from urllib.parse import urlparse
+import re
+import hashlib
+from typing import Optional
+from urllib.parse import urlparse, urlsplit, urlunsplit, parse_qsl, urlencode
+
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'yclid',
+    'mc_cid', 'mc_eid', 'igshid', '_ga', '_gl', 'ref_src', 'spm',
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'mtm_')
+DEFAULT_PORTS = {80, 443}
 
 
 def get_base_url() -> str:
@@ -11,8 +21,8 @@ def get_base_url() -> str:
         return os.environ.get('BASE_URL')
 
 
-def get_short_link_url(slug: str) -> str:
-    return f'{get_base_url()}/r/{slug}'
+def get_short_link_url(slug: str, base: Optional[str] = None) -> str:
+    return f'{base or get_base_url()}/r/{slug}'
 
 
 def extract_domain(url: str) -> str:
@@ -38,5 +48,50 @@ def extract_display_url(url: str) -> str:
 
 
 def build_favicon_url(url: str, size: int = 32) -> str:
-    domain = extract_domain(url)
-    return f'https://www.google.com/s2/favicons?domain={domain}&sz={size}' if domain else ''
\ No newline at end of file
+    return favicon_for_domain(extract_domain(url), size)
+
+
+def favicon_for_domain(domain: str, size: int = 32) -> str:
+    return f'https://www.google.com/s2/favicons?domain={domain}&sz={size}' if domain else ''
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Reduce a URL to the form we treat as "the same page": https, no www.,
+    no default port, no fragment, no trailing slash, tracking params removed
+    and the remaining query sorted.
+    """
+    try:
+        p = urlsplit((url or '').strip())
+    except ValueError:
+        return (url or '').strip()
+    if not p.hostname:
+        return (url or '').strip()
+
+    scheme = p.scheme.lower()
+    if scheme in ('http', 'https'):
+        scheme = 'https'
+
+    host = p.hostname.lower().rstrip('.').removeprefix('www.')
+    try:
+        port = p.port
+    except ValueError:
+        port = None
+    netloc = f'{host}:{port}' if port and port not in DEFAULT_PORTS else host
+
+    path = re.sub(r'/{2,}', '/', p.path).rstrip('/')
+
+    params = [
+        (k, v) for k, v in parse_qsl(p.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query = urlencode(sorted(params))
+
+    # Hash-bang fragments are routes on old SPA sites, everything else is an anchor
+    fragment = p.fragment if p.fragment.startswith('!') else ''
+
+    return urlunsplit((scheme, netloc, path, query, fragment))
+
+
+def url_hash(url: str) -> str:
+    return hashlib.sha256(canonicalize_url(url).encode()).hexdigest()
@@ -0,0 +1,18 @@
+# server/asgi.py
+#
+# Async serving mode: uvicorn asgi:app --workers N  (see start.sh)
+
+import os
+import logging
+
+# Before app.config is imported: sizes the sync pool to share with asyncpg
+os.environ.setdefault('SERVER_MODE', 'asgi')
+
+from app.asgi import create_asgi_app  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s %(name)s %(levelname)s %(message)s',
+)
+
+app = create_asgi_app()
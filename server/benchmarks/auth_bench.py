@@ -0,0 +1,137 @@
+# server/benchmarks/auth_bench.py
+"""
+Offline benchmark for local Firebase ID-token verification.
+
+Generates a fixture RSA keypair and self-signed certificate, installs it
+in app.auth.tokens.key_cache in place of Google's certs, mints tokens the
+way Firebase does and times verify_token_locally. Also checks that the
+usual bad tokens are rejected, so it doubles as a smoke test.
+
+    cd server
+    python -m benchmarks.auth_bench            # 2000 verifications
+    python -m benchmarks.auth_bench -n 10000
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+from datetime import datetime, timedelta, timezone
+
+import jwt
+from cryptography import x509
+from cryptography.x509.oid import NameOID
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.auth import tokens
+
+PROJECT = 'savlink-bench'
+KID = 'bench-key-1'
+
+
+#  Fixture keypair
+
+def make_keypair():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'securetoken.bench')])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    return private_pem, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+def mint(private_pem, kid=KID, **overrides):
+    now = int(time.time())
+    claims = {
+        'iss': tokens.ISSUER_PREFIX + PROJECT,
+        'aud': PROJECT,
+        'auth_time': now - 60,
+        'user_id': 'bench-user-0001',
+        'sub': 'bench-user-0001',
+        'iat': now - 30,
+        'exp': now + 3600,
+        'email': 'bench@example.com',
+        'email_verified': True,
+        'firebase': {'identities': {'email': ['bench@example.com']}, 'sign_in_provider': 'password'},
+    }
+    claims.update(overrides)
+    claims = {k: v for k, v in claims.items() if v is not None}
+    return jwt.encode(claims, private_pem, algorithm='RS256', headers={'kid': kid})
+
+
+#  Checks
+
+def check_rejections(private_pem):
+    other_pem, _ = make_keypair()
+    now = int(time.time())
+    cases = {
+        'expired': (mint(private_pem, exp=now - 60, iat=now - 3700), tokens.ExpiredTokenError),
+        'wrong aud': (mint(private_pem, aud='other-project'), tokens.InvalidTokenError),
+        'wrong iss': (mint(private_pem, iss='https://evil.example/' + PROJECT), tokens.InvalidTokenError),
+        'future iat': (mint(private_pem, iat=now + 600), tokens.InvalidTokenError),
+        'future auth_time': (mint(private_pem, auth_time=now + 600), tokens.InvalidTokenError),
+        'missing auth_time': (mint(private_pem, auth_time=None), tokens.InvalidTokenError),
+        'empty sub': (mint(private_pem, sub=''), tokens.InvalidTokenError),
+        'bad signature': (mint(other_pem), tokens.InvalidTokenError),
+        'garbage': ('not.a.jwt', tokens.InvalidTokenError),
+    }
+    failures = []
+    for label, (token, expected) in cases.items():
+        try:
+            tokens.verify_token_locally(token, PROJECT)
+            failures.append(f'{label}: accepted')
+        except expected:
+            pass
+        except Exception as e:
+            failures.append(f'{label}: {type(e).__name__}: {e}')
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Local Firebase token verification benchmark')
+    parser.add_argument('-n', '--iterations', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    private_pem, cert_pem = make_keypair()
+    tokens.key_cache.load({KID: cert_pem}, max_age=3600)
+    token = mint(private_pem)
+
+    decoded = tokens.verify_token_locally(token, PROJECT)
+    assert decoded['uid'] == 'bench-user-0001'
+
+    failures = check_rejections(private_pem)
+
+    wall, cpu = [], []
+    for _ in range(args.iterations):
+        w, c = time.perf_counter(), time.process_time()
+        tokens.verify_token_locally(token, PROJECT)
+        cpu.append(time.process_time() - c)
+        wall.append(time.perf_counter() - w)
+
+    wall.sort()
+    print(f"verify_token_locally x{args.iterations}")
+    print(f"  wall  median {statistics.median(wall) * 1e6:8.1f}us   p99 {wall[int(len(wall) * 0.99)] * 1e6:8.1f}us")
+    print(f"  cpu   mean   {sum(cpu) / len(cpu) * 1e6:8.1f}us")
+    print(f"  rejections   {'ok' if not failures else 'FAILED'}")
+    for f in failures:
+        print(f"    {f}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('FIREBASE_PROJECT_ID', PROJECT)
+    sys.exit(main())
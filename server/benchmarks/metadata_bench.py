@@ -0,0 +1,299 @@
+# server/benchmarks/metadata_bench.py
+"""
+Offline benchmark for app.metadata.service.extract_metadata.
+
+Replays the HTML corpus in benchmarks/corpus/metadata through the real
+fetch + parse path against a local HTTP stand-in, so no network access is
+needed and runs are comparable across changes.
+
+    cd server
+    python -m benchmarks.metadata_bench                  # timing + memory report
+    python -m benchmarks.metadata_bench -n 20 -c 4       # 20 rounds, 4 threads
+    python -m benchmarks.metadata_bench --save-baseline  # record extracted fields
+    python -m benchmarks.metadata_bench --check          # fail if fields drifted
+
+Reported per page: median/p95 wall time, time spent in BeautifulSoup
+parsing and in each extractor, peak traced memory, and whether the
+extracted fields were identical across rounds (and match the baseline).
+"""
+
+import os
+
+# Offline, deterministic setup — must happen before app modules import.
+os.environ.pop('REDIS_URL', None)
+os.environ['METADATA_DOMAIN_CONTROL'] = 'false'
+os.environ['NO_PROXY'] = os.environ['no_proxy'] = '127.0.0.1,localhost'
+
+import sys
+import json
+import time
+import argparse
+import functools
+import statistics
+import threading
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.metadata import service
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), 'corpus', 'metadata')
+BASELINE_PATH = os.path.join(CORPUS_DIR, 'baseline.json')
+
+SECTION_START = '<!-- SECTION -->'
+SECTION_END = '<!-- /SECTION -->'
+DOCS_SECTIONS = 40
+HUGE_DOCS_SECTIONS = 1500
+
+# Fields that legitimately change between runs
+VOLATILE_FIELDS = ('extracted_at',)
+
+EXTRACTORS = (
+    '_extract_jsonld', '_extract_opengraph', '_extract_twitter', '_extract_standard',
+    '_extract_favicons', '_extract_dates', '_extract_content_metrics', '_extract_feeds',
+    '_extract_canonical', '_extract_locale', '_detect_content_type', '_finalize',
+)
+
+
+#  Corpus
+
+def load_corpus():
+    pages = {}
+    for name in sorted(os.listdir(CORPUS_DIR)):
+        if not name.endswith('.html'):
+            continue
+        with open(os.path.join(CORPUS_DIR, name), encoding='utf-8') as f:
+            html = f.read()
+        key = name[:-5]
+        if SECTION_START in html:
+            pages[key] = _expand_sections(html, DOCS_SECTIONS)
+            pages[key + '_huge'] = _expand_sections(html, HUGE_DOCS_SECTIONS)
+        else:
+            pages[key] = html
+    return {k: v.encode('utf-8') for k, v in pages.items()}
+
+
+def _expand_sections(html, count):
+    head, rest = html.split(SECTION_START, 1)
+    section, tail = rest.split(SECTION_END, 1)
+    body = ''.join(section.replace('{n}', str(i)) for i in range(1, count + 1))
+    return head + body + tail
+
+
+#  Local HTTP stand-in
+
+def serve(pages):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            body = pages.get(self.path.strip('/').split('?')[0])
+            if body is None:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+#  Instrumentation
+
+class Timings:
+    """Accumulates time per instrumented function, per page, across threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.data = defaultdict(lambda: defaultdict(list))
+
+    def page(self, name):
+        self._local.page = name
+
+    def wrap(self, label, fn):
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.data[getattr(self._local, 'page', '?')][label].append(elapsed)
+        return timed
+
+
+def instrument(timings):
+    originals = {name: getattr(service, name) for name in EXTRACTORS + ('_parse_html',)}
+    for name in EXTRACTORS:
+        setattr(service, name, timings.wrap(name, originals[name]))
+    service._parse_html = timings.wrap('parse', originals['_parse_html'])
+    return originals
+
+
+def restore(originals):
+    for name, fn in originals.items():
+        setattr(service, name, fn)
+
+
+#  Runs
+
+def extract(base, name):
+    return service.extract_metadata(f'{base}/{name}', force_refresh=True)
+
+
+def normalize(meta, base):
+    meta = {k: v for k, v in meta.items() if k not in VOLATILE_FIELDS}
+    return json.loads(json.dumps(meta, sort_keys=True, default=str).replace(base, '{base}'))
+
+
+def run_timed(base, names, rounds, concurrency):
+    timings = Timings()
+    originals = instrument(timings)
+    wall = defaultdict(list)
+    outputs = defaultdict(list)
+
+    def one(name):
+        timings.page(name)
+        start = time.perf_counter()
+        meta = extract(base, name)
+        wall[name].append(time.perf_counter() - start)
+        outputs[name].append(normalize(meta, base))
+
+    try:
+        for _ in range(rounds):
+            if concurrency > 1:
+                with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                    list(pool.map(one, names))
+            else:
+                for name in names:
+                    one(name)
+    finally:
+        restore(originals)
+    return wall, timings.data, outputs
+
+
+def run_memory(base, names):
+    peaks = {}
+    for name in names:
+        tracemalloc.start()
+        extract(base, name)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks[name] = peak
+    return peaks
+
+
+#  Report
+
+def _ms(values):
+    return statistics.median(values) * 1000 if values else 0.0
+
+
+def _p95(values):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))] * 1000
+
+
+def report(pages, wall, per_fn, peaks, outputs, baseline):
+    print()
+    print(f"{'page':<20} {'size':>9} {'median':>9} {'p95':>9} {'parse':>9} {'extract':>9} {'peak mem':>10}  stable  baseline")
+    for name in sorted(pages):
+        fns = per_fn.get(name, {})
+        extract_ms = sum(_ms(v) for k, v in fns.items() if k != 'parse')
+        stable = all(o == outputs[name][0] for o in outputs[name])
+        if baseline is None:
+            base_s = '-'
+        elif name not in baseline:
+            base_s = 'new'
+        else:
+            base_s = 'ok' if outputs[name][0] == baseline[name] else 'DIFF'
+        print(f"{name:<20} {len(pages[name]) / 1024:>7.1f}KB {_ms(wall[name]):>7.2f}ms "
+              f"{_p95(wall[name]):>7.2f}ms {_ms(fns.get('parse', [])):>7.2f}ms {extract_ms:>7.2f}ms "
+              f"{peaks.get(name, 0) / 1024 / 1024:>8.2f}MB  {'yes' if stable else 'NO':<6}  {base_s}")
+
+    print()
+    print("median ms per extractor")
+    labels = ('parse',) + EXTRACTORS
+    print(f"{'page':<20} " + ' '.join(f"{l.replace('_extract_', '').strip('_')[:10]:>10}" for l in labels))
+    for name in sorted(pages):
+        fns = per_fn.get(name, {})
+        print(f"{name:<20} " + ' '.join(f"{_ms(fns.get(l, [])):>10.3f}" for l in labels))
+    print()
+
+
+def field_diff(current, expected):
+    keys = sorted(set(current) | set(expected))
+    return [k for k in keys if current.get(k) != expected.get(k)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-n', '--rounds', type=int, default=10)
+    parser.add_argument('-c', '--concurrency', type=int, default=1)
+    parser.add_argument('-p', '--page', action='append', help='Only run these corpus pages')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc pass')
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--check', action='store_true', help='Exit 1 if fields differ from baseline')
+    args = parser.parse_args(argv)
+
+    pages = load_corpus()
+    if args.page:
+        pages = {k: v for k, v in pages.items() if k in args.page}
+    names = sorted(pages)
+
+    server = serve(pages)
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+
+    baseline = None
+    if os.path.exists(BASELINE_PATH) and not args.save_baseline:
+        with open(BASELINE_PATH, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    for name in names:  # warm-up: imports, connection setup, regex compilation
+        extract(base, name)
+
+    wall, per_fn, outputs = run_timed(base, names, args.rounds, args.concurrency)
+    peaks = {} if args.no_memory else run_memory(base, names)
+    server.shutdown()
+
+    report(pages, wall, per_fn, peaks, outputs, baseline)
+
+    unstable = [n for n in names if any(o != outputs[n][0] for o in outputs[n])]
+    if unstable:
+        print(f"unstable output across rounds: {', '.join(unstable)}")
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump({n: outputs[n][0] for n in names}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"baseline written to {os.path.relpath(BASELINE_PATH)}")
+        return 0
+
+    if args.check:
+        if baseline is None:
+            print("no baseline recorded; run with --save-baseline first")
+            return 1
+        drifted = {n: field_diff(outputs[n][0], baseline[n]) for n in names if n in baseline}
+        drifted = {n: d for n, d in drifted.items() if d}
+        for n, fields in drifted.items():
+            print(f"{n}: fields changed: {', '.join(fields)}")
+        return 1 if drifted or unstable else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
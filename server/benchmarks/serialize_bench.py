@@ -0,0 +1,163 @@
+# server/benchmarks/serialize_bench.py
+"""
+Microbenchmark for link serialization in list responses.
+
+Times serialize_links (one clock read and base URL per page, stored or
+memoized domains) against the per-link path it replaced, which read the
+clock and app config and parsed the URL twice for every link. Pages are
+built from synthetic LinkRows, so no database is needed. Also checks the
+two produce identical output.
+
+    cd server
+    python -m benchmarks.serialize_bench                 # 2000 pages of 50
+    python -m benchmarks.serialize_bench -n 500 -p 100
+    python -m benchmarks.serialize_bench --no-stored     # domain column not backfilled
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+from datetime import datetime, timedelta
+
+from flask import Flask
+
+from app.links.queries import LinkRow, PAGE_FIELDS, _LINK_FIELDS
+from app.dashboard import serializers
+from app.dashboard.serializers import serialize_links, _related, _iso, _preview
+from app.utils.url import extract_domain, build_favicon_url, get_short_link_url
+from app.utils.time import relative_time
+
+BASE_URL = 'https://savl.ink'
+DOMAINS = 300
+
+
+#  Reference: the per-link path before serialize_links
+
+def per_link(link):
+    page, folder_name, tags, protected = _related(link)
+    domain = page.get('domain') or extract_domain(link.original_url)
+    favicon = page.get('favicon') or build_favicon_url(link.original_url)
+    return {
+        'id': link.id,
+        'original_url': link.original_url,
+        'title': link.title or page.get('title') or domain,
+        'notes': link.notes,
+        'notes_preview': _preview(link.notes, 120),
+        'description': page.get('description'),
+        'link_type': link.link_type,
+        'slug': link.slug,
+        'short_url': get_short_link_url(link.slug) if link.slug else None,
+        'domain': domain,
+        'favicon': favicon,
+        'favicons': page.get('favicons', []),
+        'image': page.get('image'),
+        'site_name': page.get('site_name'),
+        'is_active': link.is_active,
+        'pinned': link.pinned,
+        'starred': link.starred,
+        'frequently_used': link.frequently_used,
+        'archived': link.archived_at is not None,
+        'archived_at': _iso(link.archived_at),
+        'expires_at': _iso(link.expires_at),
+        'created_at': _iso(link.created_at),
+        'updated_at': _iso(link.updated_at),
+        'relative_time': relative_time(link.created_at),
+        'click_count': link.click_count or 0,
+        'folder_id': link.folder_id,
+        'folder_name': folder_name,
+        'tags': tags,
+        'is_public': not protected,
+        'password_protected': protected,
+        'content_type': page.get('content_type'),
+        'reading_time': page.get('reading_time_minutes'),
+        'word_count': page.get('word_count'),
+        'author': page.get('author'),
+        'published_at': page.get('published_at'),
+    }
+
+
+#  Fixture
+
+def make_rows(count: int, stored: bool, seed: int = 7):
+    rnd = random.Random(seed)
+    now = datetime.utcnow()
+    rows = []
+    for i in range(count):
+        host = f"{rnd.choice(('', 'www.', 'blog.'))}site{rnd.randrange(DOMAINS)}.example.com"
+        url = f'https://{host}/articles/{i}?ref=feed'
+        created = now - timedelta(minutes=rnd.randrange(60 * 24 * 60))
+        short = rnd.random() < 0.3
+        link = {
+            'id': i + 1, 'original_url': url, 'url_hash': f'{i:064x}',
+            'domain': extract_domain(url) if stored else None,
+            'title': f'Title {i}' if rnd.random() < 0.5 else None,
+            'notes': 'note ' * rnd.randrange(0, 40) or None,
+            'link_type': 'shortened' if short else 'saved', 'slug': f's{i}' if short else None,
+            'is_active': True, 'pinned': rnd.random() < 0.1, 'starred': rnd.random() < 0.2,
+            'frequently_used': False, 'pinned_at': None, 'archived_at': None,
+            'expires_at': None, 'created_at': created, 'updated_at': created,
+            'click_count': rnd.randrange(100), 'folder_id': None,
+        }
+        page = {'title': f'Page {i}', 'description': 'A page.', 'favicons': [], 'word_count': 900}
+        if rnd.random() < 0.5:
+            page['favicon'] = f'https://{host}/favicon.ico'
+        rows.append(LinkRow(
+            tuple(link[f] for f in _LINK_FIELDS)
+            + (None, ['a', 'b'], False)
+            + tuple(page.get(f) for f in PAGE_FIELDS)
+        ))
+    return rows
+
+
+#  Timing
+
+def bench(fn, pages, rounds):
+    times = []
+    for r in range(rounds):
+        page = pages[r % len(pages)]
+        start = time.perf_counter()
+        fn(page)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.99)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Link list serialization benchmark')
+    parser.add_argument('-n', '--rounds', type=int, default=2000)
+    parser.add_argument('-p', '--page-size', type=int, default=50)
+    parser.add_argument('--no-stored', action='store_true', help='links without the stored domain column')
+    args = parser.parse_args(argv)
+
+    app = Flask(__name__)
+    app.config['BASE_URL'] = BASE_URL
+    with app.app_context():
+        rows = make_rows(args.page_size * 20, stored=not args.no_stored)
+        pages = [rows[i:i + args.page_size] for i in range(0, len(rows), args.page_size)]
+
+        mismatches = sum(a != b for a, b in zip(serialize_links(rows), map(per_link, rows)))
+
+        serializers._parsed_domain.cache_clear()
+        results = {
+            'per-link (before)': bench(lambda page: [per_link(l) for l in page], pages, args.rounds),
+            'serialize_links': bench(serialize_links, pages, args.rounds),
+        }
+        memo = serializers._parsed_domain.cache_info()
+
+    base = results['per-link (before)'][0]
+    print(f"page of {args.page_size} links x{args.rounds}, "
+          f"domain {'parsed (memoized)' if args.no_stored else 'stored'}")
+    for label, (median, p99) in results.items():
+        print(f"  {label:<18} median {median * 1e6:8.1f}us   p99 {p99 * 1e6:8.1f}us   "
+              f"{median / args.page_size * 1e6:6.2f}us/link   x{base / median:4.2f}")
+    print(f"  domain memo       hits {memo.hits}  misses {memo.misses}  size {memo.currsize}")
+    print(f"  output            {'identical' if not mismatches else f'{mismatches} links differ'}")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('BASE_URL', BASE_URL)
+    sys.exit(main())
@@ -1,6 +1,7 @@
 # server/gunicorn.conf.py
 
 import os
+import shutil
 import multiprocessing
 
 _ram_mb = int(os.environ.get('RENDER_RAM_MB', '512'))
@@ -29,30 +30,60 @@ accesslog = '-'
 errorlog = '-'
 loglevel = os.environ.get('LOG_LEVEL', 'info')
 
-preload_app = False
+# The master imports the app, runs DB init/migrations once and forks
+# workers from it, so a (re)spawned worker boots in milliseconds instead of
+# repeating imports and schema checks. post_fork re-creates connections.
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+os.environ['SAVLINK_PRELOAD'] = '1' if preload_app else '0'
+
 max_requests = 1000
 max_requests_jitter = 100
 
+# Workers write Prometheus samples to mmap files here; /metrics on any
+# worker aggregates them. Must exist before the app is imported, which
+# with preload happens in the master before on_starting.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/savlink-metrics')
+
+# This file is re-read on HUP; only wipe samples once per master
+if os.environ.get('SAVLINK_METRICS_MASTER') != str(os.getpid()):
+    os.environ['SAVLINK_METRICS_MASTER'] = str(os.getpid())
+    shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
 
 def on_starting(server):
     server.log.info(
-        "Gunicorn starting: %d workers × %d threads = %d concurrent slots",
-        workers, threads, workers * threads
+        "Gunicorn starting: %d workers × %d threads = %d concurrent slots (preload %s)",
+        workers, threads, workers * threads, "on" if preload_app else "off"
     )
 
 
 def post_fork(server, worker):
     server.log.info("Worker %d spawned (pid: %d)", worker.age, worker.pid)
+    if preload_app:
+        from app import reinit_after_fork
+        reinit_after_fork(server.app.wsgi())
 
 
 def worker_exit(server, worker):
     try:
         from app.extensions import db
-        db.engine.dispose()
+        from app.pool import pool_tuner
+        pool_tuner.stop()
+        with worker.wsgi.app_context():
+            db.engine.dispose()
         server.log.info("Worker %d: DB connections disposed", worker.pid)
     except Exception:
         pass
 
 
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+    except Exception:
+        pass
+
+
 def pre_exec(server):
     server.log.info("Forked child, re-executing")
\ No newline at end of file
@@ -1,7 +1,23 @@
+# SERVER_MODE=asgi serves redirect, metadata and search with async handlers
+# (uvicorn, asgi.py) and the rest of the API through the mounted Flask app.
+if [ "$SERVER_MODE" = "asgi" ]; then
+  export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/savlink-metrics}
+  rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+  # FORWARDED_ALLOW_IPS: the platform proxy's address(es). X-Forwarded-For
+  # from any other peer is ignored, so clients can't choose their own IP.
+  exec uvicorn asgi:app \
+    --host 0.0.0.0 \
+    --port $PORT \
+    --workers ${WEB_CONCURRENCY:-2} \
+    --proxy-headers \
+    --forwarded-allow-ips "${FORWARDED_ALLOW_IPS:-127.0.0.1}" \
+    --log-level info
+fi
+
 gunicorn run:app \
   --bind 0.0.0.0:$PORT \
   --workers 2 \
   --threads 4 \
   --access-logfile - \
   --error-logfile - \
-  --log-level info
\ No newline at end of file
+  --log-level info